@@ -0,0 +1,297 @@
+"""
+Benchmark of page object hot paths on the in-process fake WebDriver.
+
+Representative flows (page object construction, container iteration, form
+filling, waiting for a page object to disappear) are run against static
+fixtures served by :mod:`webstr.selenium.fake`, so the results do not depend
+on a browser or network. For every flow the benchmark reports:
+
+* wall time of one operation (median of the repetitions),
+* number of WebDriver commands issued by one operation,
+* estimated time of the operation with a real remote end, i.e. the wall time
+  plus the number of commands times the round trip time (``--rtt``),
+* peak memory allocated by one operation (Python 3 only).
+
+The number of commands is deterministic, so it is the primary score; wall
+times depend on the machine. Results can be stored as JSON (``--output``)
+and compared with a previous run (``--baseline``); the exit status is 1 when
+any flow issues more commands than in the baseline. Configuration options
+can be changed to measure optional features, e.g. ``--set BATCH_VALIDATION=True``.
+
+Requires the optional `lxml` and `cssselect` packages (``pip install webstr[fake]``).
+
+Usage (with webstr installed or in PYTHONPATH)::
+    python benchmarks/bench_pages.py --output before.json
+    python benchmarks/bench_pages.py --set CONTAINER_SNAPSHOT=True --baseline before.json
+"""
+
+# Copyright 2016 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import print_function
+
+import argparse
+import ast
+import json
+import platform
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:  # python 2
+    tracemalloc = None
+
+from webstr.core import By, WebstrModel, RootPageElement, config
+from webstr.common.dialogs.pages import RemoveConfirmDlg
+from webstr.common.form import bulk
+from webstr.common.form import models as m_form
+from webstr.patternfly.contentviews.pages import ListView
+from webstr.patternfly.modal.pages import ModalWindow
+from webstr.selenium.ui.support import WaitForWebstrPage
+from webstr.selenium.webdriver import DriverFactory
+
+
+LIST_ROWS = 1000
+TEXT_FIELDS = 30
+SELECT_FIELDS = 5
+CHECKBOX_FIELDS = 5
+
+DIALOGS_HTML = """
+<html><head><title>Dialogs</title></head><body>
+<div class="modal-dialog">
+  <div class="modal-header">
+    <button class="close">x</button><h4 class="modal-title">Remove host</h4>
+  </div>
+  <div class="modal-body">Do you really want to remove the host?</div>
+  <div class="modal-footer">
+    <div id="RemoveConfirmationPopupView_OnRemove" role="button">OK</div>
+    <div id="RemoveConfirmationPopupView_Cancel" role="button">Cancel</div>
+  </div>
+</div>
+</body></html>
+"""
+
+LIST_HTML = """
+<html><head><title>Hosts</title></head><body>
+<div class="col-md-12"><div class="list-group list-view-pf">%s</div></div>
+</body></html>
+""" % ''.join(
+    '<div class="list-group-item"><span class="name">host-%d</span>'
+    '<span class="state">up</span></div>' % index
+    for index in range(1, LIST_ROWS + 1))
+
+FORM_HTML = """
+<html><head><title>Form</title></head><body>
+<form id="bench-form">%s%s%s</form>
+</body></html>
+""" % (
+    ''.join('<input id="text-%d" type="text" value=""/>' % index
+            for index in range(TEXT_FIELDS)),
+    ''.join('<select id="select-%d"><option value="a">A</option>'
+            '<option value="b">B</option></select>' % index
+            for index in range(SELECT_FIELDS)),
+    ''.join('<input id="checkbox-%d" type="checkbox"/>' % index
+            for index in range(CHECKBOX_FIELDS)))
+
+FIXTURES = {
+    'fake://dialogs': DIALOGS_HTML,
+    'fake://list': LIST_HTML,
+    'fake://form': FORM_HTML,
+    }
+
+
+def _form_model():
+    """
+    Return page model class of the form with all its fields and values
+    to fill in.
+    """
+    attributes = {'_root': RootPageElement(By.ID, 'bench-form')}
+    values = {}
+    for index in range(TEXT_FIELDS):
+        attributes['text_%d' % index] = m_form.TextInput(By.ID, 'text-%d' % index)
+        values['text_%d' % index] = 'value %d' % index
+    for index in range(SELECT_FIELDS):
+        attributes['select_%d' % index] = m_form.Select(By.ID, 'select-%d' % index)
+        values['select_%d' % index] = 'b'
+    for index in range(CHECKBOX_FIELDS):
+        attributes['checkbox_%d' % index] = m_form.Checkbox(By.ID, 'checkbox-%d' % index)
+        values['checkbox_%d' % index] = True
+    return type('BenchFormModel', (WebstrModel,), attributes), values
+
+
+FormModel, FORM_VALUES = _form_model()
+
+
+class SnapshotListView(ListView):
+    """List view iterated over row snapshots."""
+    _snapshot_iteration = True
+
+
+def fill_via_helpers(model):
+    for name, value in sorted(FORM_VALUES.items()):
+        getattr(model, name).value = value
+
+
+def prepare_disappeared(driver):
+    page = ModalWindow(driver)
+    driver.fake.remove(By.XPATH, '//div[contains(@class, "modal-dialog")]')
+    return lambda: WaitForWebstrPage(page, 5).to_disappear()
+
+
+# (name, fixture URL, function accepting the driver and returning the operation)
+SCENARIOS = [
+    ('modal_window', 'fake://dialogs',
+     lambda driver: lambda: ModalWindow(driver)),
+    ('ok_cancel_dlg', 'fake://dialogs',
+     lambda driver: lambda: RemoveConfirmDlg(driver)),
+    ('list_view_iteration', 'fake://list',
+     lambda driver: lambda: [row for row in ListView(driver)]),
+    ('list_view_snapshot', 'fake://list',
+     lambda driver: lambda: [row.text for row in SnapshotListView(driver)]),
+    ('form_fill_helpers', 'fake://form',
+     lambda driver: lambda: fill_via_helpers(FormModel(driver))),
+    ('form_fill_bulk', 'fake://form',
+     lambda driver: lambda: bulk.fill(FormModel(driver), FORM_VALUES)),
+    ('wait_to_disappear', 'fake://dialogs', prepare_disappeared),
+    ]
+
+
+def run_scenario(driver, url, prepare, repeat):
+    """
+    Run the operation `repeat` times, each time on a freshly loaded fixture;
+    an extra first run warms up caches of the driver and is not measured.
+
+    Returns:
+        dictionary with the results of the scenario
+    """
+    durations = []
+    commands = None
+    for iteration in range(repeat + 1):
+        driver.get(url)
+        operation = prepare(driver)
+        before = driver.fake.commands.copy()
+        start = time.time()
+        operation()
+        duration = time.time() - start
+        if not iteration:
+            continue
+        durations.append(duration)
+        issued = driver.fake.commands - before
+        if commands is not None and issued != commands:
+            print("warning: number of commands differs between repetitions",
+                  file=sys.stderr)
+        commands = issued
+    peak = None
+    if tracemalloc is not None:
+        driver.get(url)
+        operation = prepare(driver)
+        tracemalloc.start()
+        try:
+            operation()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    durations.sort()
+    return {
+        'wall': durations[len(durations) // 2],
+        'wall_min': durations[0],
+        'commands': sum(commands.values()),
+        'commands_by_name': dict(commands),
+        'peak_alloc': peak,
+        }
+
+
+def compare(results, baseline):
+    """
+    Print comparison with the baseline results.
+
+    Returns:
+        list of names of scenarios issuing more commands than in the baseline
+    """
+    regressions = []
+    print("\n%-22s %16s %20s" % ('compared to baseline', 'commands', 'wall [ms]'))
+    for name, current in sorted(results['scenarios'].items()):
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            print("%-22s %16s" % (name, 'new'))
+            continue
+        print("%-22s %7d -> %6d %9.1f -> %8.1f" % (
+            name, previous['commands'], current['commands'],
+            previous['wall'] * 1000, current['wall'] * 1000))
+        if current['commands'] > previous['commands']:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-n', '--repeat', type=int, default=5,
+                        help='repetitions of every scenario (default: 5)')
+    parser.add_argument('-k', '--scenario', action='append',
+                        help='run only the scenario (may be repeated)')
+    parser.add_argument('--rtt', type=float, default=5.0,
+                        help='round trip time of a command in [ms] used for the '
+                             'estimated time (default: 5)')
+    parser.add_argument('--set', action='append', default=[], metavar='OPTION=VALUE',
+                        help='change a webstr.core.config option (python literal)')
+    parser.add_argument('--output', help='store the results into a JSON file')
+    parser.add_argument('--baseline', help='compare with results of a previous run')
+    args = parser.parse_args(argv)
+
+    options = {}
+    for item in args.set:
+        option, value = item.split('=', 1)
+        options[option.upper()] = ast.literal_eval(value)
+        config.update_value(option, options[option.upper()])
+
+    driver = DriverFactory('Fake', fixtures=FIXTURES)
+    results = {
+        'python': platform.python_version(),
+        'rtt': args.rtt / 1000.0,
+        'config': options,
+        'scenarios': {},
+        }
+    print("%-22s %10s %9s %12s %12s" % (
+        'scenario', 'wall [ms]', 'commands', 'est. [ms]', 'peak [KiB]'))
+    try:
+        for name, url, prepare in SCENARIOS:
+            if args.scenario and name not in args.scenario:
+                continue
+            result = run_scenario(driver, url, prepare, args.repeat)
+            result['estimated'] = result['wall'] + result['commands'] * results['rtt']
+            results['scenarios'][name] = result
+            print("%-22s %10.1f %9d %12.1f %12s" % (
+                name, result['wall'] * 1000, result['commands'],
+                result['estimated'] * 1000,
+                '-' if result['peak_alloc'] is None
+                else '%.0f' % (result['peak_alloc'] / 1024.0)))
+    finally:
+        driver.quit()
+
+    if args.output:
+        with open(args.output, 'w') as fileh:
+            json.dump(results, fileh, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as fileh:
+            regressions = compare(results, json.load(fileh))
+        if regressions:
+            print("\nMore commands than in the baseline: %s" % ', '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
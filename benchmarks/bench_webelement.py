@@ -0,0 +1,74 @@
+"""
+Micro-benchmark of the FreshWebElement proxy overhead.
+
+Compares attribute access and method calls on a bare selenium WebElement
+with the same operations via :class:`webstr.selenium.webelement.FreshWebElement`.
+The remote end is replaced by a stub returning immediately, so only
+the client side overhead is measured.
+
+Usage (with webstr installed or in PYTHONPATH)::
+    python benchmarks/bench_webelement.py [number of iterations]
+"""
+
+# Copyright 2016 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import print_function
+
+import sys
+import timeit
+
+from selenium.webdriver.remote.webelement import WebElement
+
+from webstr.selenium.webelement import FreshWebElement
+
+
+class StubWebElement(WebElement):
+    """WebElement answering all commands without any remote end."""
+
+    def _execute(self, command, params=None):
+        return {'value': 'text'}
+
+
+OPERATIONS = [
+    ('.text', lambda elem: elem.text),
+    ('.click()', lambda elem: elem.click()),
+    ('.is_enabled()', lambda elem: elem.is_enabled()),
+    ('.get_dom_attribute("id")', lambda elem: elem.get_dom_attribute('id')),
+    ]
+
+
+def measure(operation, element, number):
+    """
+    Return duration of one execution of the operation in [ns]
+    (best of three repetitions).
+    """
+    timer = timeit.Timer(lambda: operation(element))
+    return min(timer.repeat(3, number)) / number * 1e9
+
+
+def main(number=100000):
+    bare = StubWebElement(None, 'element-1')
+    fresh = FreshWebElement(bare, 'xpath', '//tr[1]')
+    print("%-26s %12s %12s %10s" % ('operation', 'bare [ns]', 'fresh [ns]', 'overhead'))
+    for name, operation in OPERATIONS:
+        bare_ns = measure(operation, bare, number)
+        fresh_ns = measure(operation, fresh, number)
+        print("%-26s %12.0f %12.0f %9.0f%%" % (
+            name, bare_ns, fresh_ns, (fresh_ns / bare_ns - 1) * 100))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -40,6 +40,8 @@ setup(
     packages=find_packages(exclude=['doc', 'tests']),
     include_package_data=True,
     install_requires=['selenium'],
+    # in-process fake WebDriver backend (webstr.selenium.fake)
+    extras_require={'fake': ['lxml', 'cssselect']},
     # http://docs.pytest.org/en/latest/goodpractices.html
     setup_requires=['pytest-runner'],
     tests_require=['pytest'],
@@ -0,0 +1,65 @@
+"""
+Unit tests of the round trip budget report (see webstr.core.budget).
+"""
+
+import json
+
+from webstr.core import budget
+from webstr.core.test import UITestCase
+from webstr.selenium import instrumentation
+
+
+def stats(round_trips):
+    return {'round_trips': round_trips, 'wire_time': 0.5,
+            'stale_refreshes': 0, 'implicit_wait_time': 0.0}
+
+
+def test_regressions_against_baseline(tmpdir):
+    baseline = tmpdir.join('baseline.json')
+    baseline.write(json.dumps({'test_login': stats(10), 'test_logout': stats(10)}))
+    report = budget.BudgetReport(str(baseline), threshold=0.2)
+    report.record('test_login', stats(25))
+    report.record('test_logout', stats(12))
+    report.record('test_new', stats(100))
+    assert report.regressions() == [budget.Regression('test_login', 10, 25, 2.5)]
+    assert 'test_login: 10 -> 25 (x2.50)' in report.format()
+
+
+def test_report_saved_as_baseline(tmpdir):
+    path = str(tmpdir.join('report.json'))
+    report = budget.BudgetReport()
+    report.record('test_login', stats(10))
+    report.save(path)
+    assert budget.BudgetReport(path).baseline == {'test_login': stats(10)}
+
+
+def test_thread_stats_sink():
+    sink = instrumentation.ThreadStatsSink()
+    instrumentation.enable(sink)
+    try:
+        instrumentation.RECORDER.record('findElement', 0.1, 0)
+        sink.start()
+        instrumentation.RECORDER.record('findElement', 0.25, 0)
+        instrumentation.RECORDER.increment('implicit_wait', 0.25)
+        instrumentation.RECORDER.increment('stale_refresh')
+        result = sink.stop()
+    finally:
+        instrumentation.disable()
+    assert result == {'round_trips': 1, 'wire_time': 0.25,
+                      'stale_refreshes': 1, 'implicit_wait_time': 0.25}
+
+
+class HostsTest(UITestCase):
+
+    def test_add(self):
+        pass
+
+
+def test_test_id_includes_method(monkeypatch):
+    test = HostsTest()
+    test._test_method = 'test_add'
+    assert test.test_id == '%s.HostsTest.test_add' % __name__
+    test._test_method = None
+    monkeypatch.setenv(
+        'PYTEST_CURRENT_TEST', 'tests/test_budget.py::HostsTest::test_remove[2] (call)')
+    assert test.test_id == '%s.HostsTest.test_remove[2]' % __name__
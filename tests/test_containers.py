@@ -0,0 +1,219 @@
+"""
+Unit tests of container page objects (see webstr.common.containers.pages).
+"""
+
+import pytest
+
+from webstr.core import By, DynamicWebstrModel, NameRootPageElement, PageElement
+from webstr.common.containers import models as m_containers
+from webstr.common.containers import pages as containers
+from webstr.selenium import scripts
+from webstr.selenium.ui import exceptions as ui_exceptions
+
+
+class SnapshotDriver(object):
+    """Webdriver stand-in answering container snapshot scripts."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+        self.mutations = 0
+
+    def implicitly_wait(self, timeout):
+        pass
+
+    def execute_script(self, script, *args):
+        if script == scripts.MUTATION_COUNTER:
+            return ['page', self.mutations]
+        if script == scripts.CONTAINER_COUNT:
+            self.calls.append(args)
+            chain, criteria = args
+            return len([row for row in self.rows if all(
+                row[COLUMNS[locator]] == expected
+                for _, locator, expected in criteria)])
+        assert script == scripts.CONTAINER_SNAPSHOT
+        self.calls.append(args)
+        chain, fields, offset, limit = args
+        end = len(self.rows) if limit is None else offset + limit
+        records = [
+            {'index': index + 1, 'text': row['name'],
+             'fields': dict((field[0], row.get(field[0])) for field in fields)}
+            for index, row in enumerate(self.rows) if offset <= index < end]
+        return {'count': len(self.rows), 'rows': records}
+
+
+class HostsModel(m_containers.ContainerBaseModel):
+    rows = PageElement(By.XPATH, '//table/tbody/tr', as_list=True)
+
+
+class HostRowModel(DynamicWebstrModel):
+    _root = NameRootPageElement(By.XPATH, '//table/tbody/tr[%d]')
+    name = PageElement(By.XPATH, './td[1]')
+    state = PageElement(By.XPATH, './td[2]')
+    actions = PageElement(By.XPATH, './/button', as_list=True)
+
+
+class HostRow(containers.ContainerRowBase):
+    _model = HostRowModel
+    _required_elems = []
+
+
+class Hosts(containers.ContainerBase):
+    _model = HostsModel
+    _row_class = HostRow
+    _snapshot_iteration = True
+    _required_elems = []
+
+
+COLUMNS = {'./td[1]': 'name', './td[2]': 'state'}
+ROWS = [{'name': 'alpha', 'state': 'up'}, {'name': 'beta', 'state': 'down'}]
+
+
+def test_snapshot_single_call():
+    driver = SnapshotDriver(ROWS)
+    rows = [row for row in Hosts(driver)]
+    assert [(row.index, row.name, row.state) for row in rows] == \
+        [(1, 'alpha', 'up'), (2, 'beta', 'down')]
+    chain, fields, offset, limit = driver.calls[0]
+    assert chain == [(By.XPATH, '//table/tbody/tr')]
+    # list page elements are not part of the snapshot
+    assert fields == [['name', By.XPATH, './td[1]'], ['state', By.XPATH, './td[2]']]
+    assert len(driver.calls) == 1
+
+
+def test_snapshot_live_row_created_lazily():
+    driver = SnapshotDriver(ROWS)
+    record = Hosts(driver).snapshot()[1]
+    assert record._live is None
+    assert isinstance(record.live, HostRow)
+    assert record.live._name == 2
+
+
+def test_snapshot_scope_shared():
+    driver = SnapshotDriver(ROWS)
+    hosts = Hosts(driver)
+    with hosts.snapshot_scope():
+        names = [row.name for row in hosts]
+        states = [row.state for row in hosts]
+        assert len(hosts) == 2
+    assert names == ['alpha', 'beta']
+    assert states == ['up', 'down']
+    assert len(driver.calls) == 1
+    [row for row in hosts]
+    assert len(driver.calls) == 2
+
+
+class KeyedHosts(Hosts):
+    _key_field = 'name'
+    _snapshot_fields = ['state']
+
+
+def test_keyed_index():
+    driver = SnapshotDriver(ROWS)
+    hosts = KeyedHosts(driver)
+    assert hosts['beta'].state == 'down'
+    assert 'alpha' in hosts
+    assert hosts.get('gamma') is None
+    with pytest.raises(ui_exceptions.NoSuchRowException):
+        hosts['gamma']
+    # the index is built only once while the page doesn't change
+    assert len(driver.calls) == 1
+
+
+def test_keyed_index_invalidated_by_mutation():
+    driver = SnapshotDriver(list(ROWS))
+    hosts = KeyedHosts(driver)
+    assert 'gamma' not in hosts
+    driver.rows.append({'name': 'gamma', 'state': 'up'})
+    driver.mutations += 1
+    assert hosts['gamma'].index == 3
+    assert len(driver.calls) == 2
+
+
+def test_count_single_call():
+    driver = SnapshotDriver(ROWS)
+    hosts = Hosts(driver)
+    assert len(hosts) == 2
+    assert hosts.count(state='up') == 1
+    assert not hosts.is_empty()
+    assert driver.calls[1][1] == [[By.XPATH, './td[2]', 'up']]
+    assert len(driver.calls) == 3
+
+
+def test_count_shared_with_snapshot_scope():
+    driver = SnapshotDriver(ROWS)
+    hosts = Hosts(driver)
+    with hosts.snapshot_scope():
+        assert [row.name for row in hosts] == ['alpha', 'beta']
+        assert len(hosts) == 2
+        assert hosts.count(state='down') == 1
+    assert len(driver.calls) == 1
+
+
+class RowsElement(object):
+    """Stand-in of a model root element with three rows."""
+
+    def find_element(self, by, value):
+        return 'row'
+
+    def find_elements(self, by, value):
+        return ['row'] * 3
+
+
+class CustomRootHostsModel(m_containers.ContainerBaseModel):
+    rows = PageElement(By.XPATH, './tbody/tr', as_list=True)
+
+    @property
+    def _root(self):
+        return RowsElement()
+
+
+class CustomRootHosts(Hosts):
+    _model = CustomRootHostsModel
+    _snapshot_iteration = False
+
+
+def test_count_under_custom_root():
+    driver = SnapshotDriver(ROWS)
+    hosts = CustomRootHosts(driver)
+    assert len(hosts) == 3
+    assert driver.calls == []
+    # the rows can't be read relatively to the document instead
+    with pytest.raises(TypeError):
+        hosts.snapshot()
+
+
+class LoadingDriver(SnapshotDriver):
+    """Webdriver stand-in rendering the rows after the first count."""
+
+    def execute_script(self, script, *args):
+        count = super(LoadingDriver, self).execute_script(script, *args)
+        if script == scripts.CONTAINER_COUNT:
+            self.rows = ROWS
+        return count
+
+
+class RowHosts(Hosts):
+    _snapshot_iteration = False
+
+
+def test_len_waits_for_first_row():
+    driver = LoadingDriver([])
+    assert len(Hosts(driver)) == 2
+    assert len(driver.calls) == 2
+
+
+def test_iteration_waits_for_first_row():
+    driver = LoadingDriver([])
+    assert len(list(RowHosts(driver))) == 2
+
+
+class EmptyHosts(Hosts):
+    _may_be_empty = True
+    _timeout = 5
+
+
+def test_len_of_container_which_may_be_empty():
+    driver = LoadingDriver([])
+    assert len(EmptyHosts(driver)) == 0
+    assert len(driver.calls) == 1
@@ -0,0 +1,123 @@
+"""
+Unit tests of patternfly content views (see webstr.patternfly.contentviews).
+"""
+
+import pytest
+from selenium.common import exceptions as selenium_ex
+
+from webstr.patternfly.contentviews import pages as contentviews
+from webstr.selenium import scripts
+
+
+class PagedDriver(object):
+    """
+    Webdriver stand-in serving rows of a paginated or virtually
+    scrolled view.
+    """
+
+    def __init__(self, rows, page_size, scroll_step=None):
+        self.rows = rows
+        self.page_size = page_size
+        self.scroll_step = scroll_step
+        self.start = 0
+        self.clicks = 0
+        self.first_rows = []
+
+    def implicitly_wait(self, timeout):
+        pass
+
+    def execute_async_script(self, script, *args):
+        return True
+
+    def find_element(self, by, value, auto_refresh=True):
+        row = RowElement(self)
+        self.first_rows.append(row)
+        return row
+
+    def visible(self):
+        return self.rows[self.start:self.start + self.page_size]
+
+    def execute_script(self, script, *args):
+        if script == scripts.CONTAINER_SNAPSHOT:
+            chain, fields, offset, limit = args
+            visible = self.visible()
+            end = len(visible) if limit is None else offset + limit
+            records = [{'index': index + 1, 'text': text, 'fields': {'name': text}}
+                       for index, text in enumerate(visible) if offset <= index < end]
+            return {'count': len(visible), 'rows': records}
+        if script == scripts.CLICK_IF_PRESENT:
+            if self.start + self.page_size >= len(self.rows):
+                return False
+            self.clicks += 1
+            self.start += self.page_size
+            return True
+        if script == scripts.SCROLL_TO_LAST_ROW:
+            visible = self.visible()
+            last = visible[-1] if visible else None
+            if self.start + self.page_size < len(self.rows):
+                self.start = min(self.start + self.scroll_step,
+                                 len(self.rows) - self.page_size)
+            return last
+        raise AssertionError("unexpected script")
+
+
+class RowElement(object):
+    """Row element detached from the page when the page changes."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.start = driver.start
+
+    def find_element(self, by, value):
+        return self
+
+    def is_enabled(self):
+        if self.driver.start != self.start:
+            raise selenium_ex.StaleElementReferenceException("stale")
+        return True
+
+
+class PagedTable(contentviews.TableView):
+    _required_elems = []
+    _page_timeout = 0.5
+
+
+class ScrolledList(contentviews.ListView):
+    _required_elems = []
+    _virtual_scroll = True
+    _scroll_timeout = 0.1
+    _key_field = 'name'
+
+
+ROWS = ['host-%02d' % index for index in range(23)]
+
+
+def test_stream_paginated():
+    driver = PagedDriver(ROWS, page_size=10)
+    rows = [record.text for record in PagedTable(driver).stream(batch_size=4)]
+    assert rows == ROWS
+    assert driver.clicks == 2
+
+
+def test_stream_virtual_scroll_deduplicates():
+    driver = PagedDriver(ROWS, page_size=10, scroll_step=3)
+    rows = [record.text for record in ScrolledList(driver).stream(batch_size=4)]
+    assert rows == ROWS
+
+
+def test_stream_paginated_keeps_rows_with_same_text():
+    rows = ['host'] * 12
+    driver = PagedDriver(rows, page_size=5)
+    assert [record.text for record in PagedTable(driver).stream(batch_size=4)] == rows
+    # the next pages were detected by the detached first rows
+    assert driver.clicks == 2
+    assert len(driver.first_rows) == 3
+
+
+def test_stream_virtual_scroll_requires_key():
+    class UnkeyedList(ScrolledList):
+        _key_field = None
+
+    driver = PagedDriver(ROWS, page_size=10, scroll_step=3)
+    with pytest.raises(TypeError):
+        next(UnkeyedList(driver).stream())
@@ -0,0 +1,115 @@
+"""
+Unit tests of the driver session pool (see webstr.selenium.driver).
+"""
+
+import pytest
+from selenium.common import exceptions as selenium_ex
+
+from webstr.selenium.driver import DriverPool, SessionKey
+from webstr.selenium.webdriver import DriverPrespawner
+
+
+KEY = SessionKey('Firefox', '', 'ANY', 1280, 1024)
+OTHER_KEY = SessionKey('Chrome', '', 'ANY', 1280, 1024)
+
+
+class StubDriver(object):
+    """Webdriver stand-in recording session commands."""
+
+    def __init__(self, key):
+        self.key = key
+        self.commands = []
+        self.healthy = True
+        self.quit_called = False
+
+    def execute_script(self, script, *args):
+        if not self.healthy:
+            raise selenium_ex.WebDriverException("session deleted")
+        self.commands.append('script')
+
+    def delete_all_cookies(self):
+        self.commands.append('delete_all_cookies')
+
+    def get(self, url):
+        self.commands.append(url)
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_checkin_reuses_session():
+    pool = DriverPool(size=1, factory=StubDriver)
+    driver = pool.checkout(KEY)
+    pool.checkin(driver)
+    assert 'about:blank' in driver.commands
+    assert pool.checkout(KEY) is driver
+    assert pool.checkout(KEY) is not driver
+
+
+def test_sessions_keyed_by_capabilities():
+    pool = DriverPool(size=1, factory=StubDriver)
+    driver = pool.checkout(KEY)
+    pool.checkin(driver)
+    assert pool.checkout(OTHER_KEY).key == OTHER_KEY
+
+
+def test_max_uses_recycling():
+    pool = DriverPool(size=1, max_uses=1, factory=StubDriver)
+    driver = pool.checkout(KEY)
+    pool.checkin(driver)
+    assert driver.quit_called
+    assert len(pool) == 0
+
+
+def test_unhealthy_session_discarded():
+    pool = DriverPool(size=1, factory=StubDriver)
+    driver = pool.checkout(KEY)
+    pool.checkin(driver)
+    driver.healthy = False
+    assert pool.checkout(KEY) is not driver
+    assert driver.quit_called
+
+
+def test_pool_size_limit():
+    pool = DriverPool(size=1, factory=StubDriver)
+    first = pool.checkout(KEY)
+    second = pool.checkout(KEY)
+    pool.checkin(first)
+    pool.checkin(second)
+    assert second.quit_called
+    assert len(pool) == 1
+
+
+def test_checkin_unknown_driver():
+    pool = DriverPool(factory=StubDriver)
+    with pytest.raises(ValueError):
+        pool.checkin(StubDriver(KEY))
+
+
+def test_prespawner_boots_next_session():
+    created = []
+
+    def factory():
+        created.append(StubDriver(KEY))
+        return created[-1]
+
+    prespawner = DriverPrespawner(factory, count=1)
+    prespawner.prespawn()
+    first = prespawner.acquire()
+    second = prespawner.acquire()
+    assert first is created[0]
+    assert second is created[1]
+    # the third session is booting (or already booted) in background
+    prespawner.close()
+    stats = prespawner.stats()
+    assert stats['sessions'] >= 2
+    assert stats['boot_time_max'] >= stats['boot_time_mean']
+
+
+def test_prespawner_propagates_errors():
+    def factory():
+        raise selenium_ex.WebDriverException("no browser")
+
+    prespawner = DriverPrespawner(factory, count=0)
+    with pytest.raises(selenium_ex.WebDriverException):
+        prespawner.acquire()
@@ -0,0 +1,171 @@
+"""
+Unit tests of the page model element cache (see webstr.core.cache).
+"""
+
+from webstr.core import By, WebstrModel, PageElement, RootPageElement
+from webstr.core.cache import ElementCache
+
+
+class StubElement(object):
+    """Minimal stand-in of a WebElement, records lookups done from it."""
+
+    def __init__(self, driver, locator):
+        self.driver = driver
+        self.locator = locator
+
+    def find_element(self, by, value):
+        return self.driver.find_element(by, value)
+
+
+class StubDriver(object):
+    """
+    Minimal stand-in of a webdriver counting element lookups and script
+    calls, i.e. all round trips issued by the cache.
+    """
+    cache_epoch = 0
+
+    def __init__(self):
+        self.lookups = 0
+        self.scripts = 0
+        self.mutations = 0
+
+    @property
+    def round_trips(self):
+        return self.lookups + self.scripts
+
+    def find_element(self, by, value):
+        self.lookups += 1
+        return StubElement(self, value)
+
+    def execute_script(self, script, *args):
+        self.scripts += 1
+        return ['page-1', self.mutations]
+
+    def click(self):
+        """Emulate a click changing the page."""
+        self.mutations += 1
+
+    def invalidate_element_caches(self):
+        self.cache_epoch += 1
+
+
+class CachedModel(WebstrModel):
+    _cache_elements = True
+    _root = RootPageElement(By.ID, 'root')
+    ok_btn = PageElement(By.ID, 'ok')
+
+
+class FlatCachedModel(WebstrModel):
+    _cache_elements = True
+    ok_btn = PageElement(By.ID, 'ok')
+
+
+class UncachedModel(WebstrModel):
+    _root = RootPageElement(By.ID, 'root')
+    ok_btn = PageElement(By.ID, 'ok')
+
+
+def test_cache_disabled_by_default():
+    driver = StubDriver()
+    model = UncachedModel(driver)
+    assert model.element_cache is None
+    model.ok_btn
+    model.ok_btn
+    # root + element for each access
+    assert driver.lookups == 4
+
+
+def test_cache_hit():
+    driver = StubDriver()
+    model = CachedModel(driver)
+    first = model.ok_btn
+    assert model.ok_btn is first
+    assert driver.lookups == 2
+    # the page state is checked before each access
+    assert driver.scripts == 2
+    assert model.element_cache.misses == 2
+    assert model.element_cache.hits == 1
+
+
+def test_cache_invalidated_by_mutation():
+    driver = StubDriver()
+    model = CachedModel(driver)
+    model.ok_btn
+    driver.click()
+    model.ok_btn
+    assert driver.lookups == 4
+    assert driver.scripts == 2
+
+
+def test_cache_invalidated_by_epoch():
+    driver = StubDriver()
+    model = CachedModel(driver)
+    model.ok_btn
+    driver.invalidate_element_caches()
+    model.ok_btn
+    assert driver.lookups == 4
+    assert driver.scripts == 2
+
+
+def test_cache_without_page_state():
+    driver = StubDriver()
+    driver.execute_script = lambda script, *args: None
+    cache = ElementCache(driver)
+    cache.get('key', lambda: 1)
+    cache.get('key', lambda: 1)
+    assert cache.misses == 2
+    assert len(cache) == 0
+
+
+def test_lookup_scope_resolves_root_once():
+    driver = StubDriver()
+    model = UncachedModel(driver)
+    with model.lookup_scope():
+        model.ok_btn
+        model.ok_btn
+    # root once + element twice
+    assert driver.lookups == 3
+    model.ok_btn
+    assert driver.lookups == 5
+
+
+def test_cache_flat_element_round_trips():
+    driver = StubDriver()
+    model = FlatCachedModel(driver)
+    with model.lookup_scope():
+        for _ in range(10):
+            model.ok_btn
+    assert driver.round_trips == 2
+
+
+def test_cache_checked_once_per_scope():
+    driver = StubDriver()
+    model = CachedModel(driver)
+    with model.lookup_scope():
+        model.ok_btn
+        driver.click()
+        model.ok_btn
+    assert driver.round_trips == 3
+    model.ok_btn
+    # page changed since the check of the scope
+    assert driver.scripts == 2
+    assert driver.lookups == 4
+
+
+def test_cache_sees_changes_outside_of_actions():
+    driver = StubDriver()
+    model = FlatCachedModel(driver)
+    first = model.ok_btn
+    # e.g. a timer of the application changed the page
+    driver.mutations += 1
+    assert model.ok_btn is not first
+    assert driver.lookups == 2
+    assert driver.scripts == 2
+
+
+def test_empty_list_not_cached():
+    driver = StubDriver()
+    cache = ElementCache(driver)
+    assert cache.get('rows', lambda: []) == []
+    assert cache.get('rows', lambda: ['row']) == ['row']
+    assert cache.get('rows', lambda: []) == ['row']
@@ -0,0 +1,246 @@
+"""
+Unit tests of the in-process fake WebDriver backend (see webstr.selenium.fake).
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip('lxml')
+pytest.importorskip('cssselect')
+
+from selenium.common import exceptions as selenium_ex
+
+from webstr.core import config
+from webstr.core import (
+    By, WebstrModel, DynamicWebstrModel, PageElement, RootPageElement,
+    NameRootPageElement)
+from webstr.common.dialogs import models as m_dialogs
+from webstr.common.dialogs.pages import ModalDlg
+from webstr.common.form import bulk
+from webstr.common.form import models as m_form
+from webstr.selenium.ui.support import WebDriverWait
+from webstr.selenium.webdriver import DriverFactory
+
+
+HOSTS = """
+<html><head><title>Hosts</title></head><body>
+<div id="hosts">
+  <table>
+    <tr class="row"><td class="name">host-1</td><td class="state">up</td></tr>
+    <tr class="row"><td class="name">host-2</td><td class="state">down</td></tr>
+  </table>
+  <div id="spinner">Loading</div>
+  <form id="wizard">
+    <input id="name" type="text" value=""/>
+    <select id="os"><option value="rhel">RHEL</option><option value="fedora">Fedora</option>
+      <option value="centos" disabled="disabled">CentOS</option></select>
+    <input id="start" type="checkbox"/>
+  </form>
+</div>
+</body></html>
+"""
+
+MENUS = """
+<html><head><title>Menus</title></head><body>
+<ul class="menu"><li>a1</li><li>a2</li></ul>
+<ul class="menu"><li>b1</li><li>b2</li><li>b3</li></ul>
+</body></html>
+"""
+
+DIALOG = """
+<html><head><title>Dialog</title></head><body>
+<div class="gwt-PopupPanelGlass"></div>
+<div id="dialog"><button id="close">Close</button></div>
+</body></html>
+"""
+
+FORMS = """
+<html><head><title>Forms</title></head><body>
+<form id="first"><input name="n" type="text" value="a"/></form>
+<form id="second"><input name="n" type="text" value="b"/></form>
+</body></html>
+"""
+
+
+class WizardModel(WebstrModel):
+    _root = RootPageElement(By.ID, 'wizard')
+    name = m_form.TextInput(By.ID, 'name')
+    os = m_form.Select(By.ID, 'os')
+    start = m_form.Checkbox(By.ID, 'start')
+
+
+class MenuModel(WebstrModel):
+    _root = RootPageElement(By.XPATH, '//ul[@class="menu"]')
+
+
+class MenuRowModel(DynamicWebstrModel):
+    _root = NameRootPageElement(By.XPATH, './li[%d]', parent=MenuModel._root)
+
+
+@pytest.fixture
+def driver():
+    driver = DriverFactory(
+        'Fake', fixtures={'fake://hosts': HOSTS, 'fake://menus': MENUS,
+                          'fake://dialog': DIALOG, 'fake://forms': FORMS})
+    driver.get('fake://hosts')
+    yield driver
+    driver.quit()
+
+
+def test_locators(driver):
+    assert driver.title == 'Hosts'
+    assert [row.text for row in driver.find_elements(By.CSS_SELECTOR, 'tr.row')] \
+        == ['host-1 up', 'host-2 down']
+    row = driver.find_element(By.XPATH, '//tr[2]')
+    assert row.find_element(By.CLASS_NAME, 'name').text == 'host-2'
+    assert driver.find_element(By.ID, 'name').tag_name == 'input'
+    with pytest.raises(selenium_ex.NoSuchElementException):
+        driver.find_element(By.ID, 'missing')
+
+
+def test_stale_element_is_refreshed(driver):
+    name = driver.find_element(By.XPATH, '//tr[1]').find_element(By.CLASS_NAME, 'name')
+    driver.fake.rerender(By.ID, 'hosts')
+    assert name.text == 'host-1'
+    driver.fake.invalidate_references()
+    assert name.text == 'host-1'
+
+
+def test_implicit_wait_sees_scheduled_changes(driver):
+    def show_dialog(fake):
+        body = fake.find(By.TAG_NAME, 'body')[0]
+        body.append(body.makeelement('div', {'id': 'dialog'}))
+
+    driver.implicitly_wait(2)
+    driver.fake.schedule(0.05, show_dialog)
+    assert driver.find_element(By.ID, 'dialog').tag_name == 'div'
+    driver.implicitly_wait(0.05)
+    with pytest.raises(selenium_ex.NoSuchElementException):
+        driver.find_element(By.ID, 'missing')
+
+
+class CachedHostsModel(WebstrModel):
+    _cache_elements = True
+    _root = RootPageElement(By.ID, 'hosts')
+    spinner = PageElement(By.ID, 'spinner')
+    notes = PageElement(By.TAG_NAME, 'li', as_list=True)
+
+
+def test_cache_sees_scheduled_changes(driver):
+    def add_note(fake):
+        hosts = fake.find(By.ID, 'hosts')[0]
+        hosts.append(hosts.makeelement('li', {}))
+
+    driver.implicitly_wait(0)
+    model = CachedHostsModel(driver)
+    assert model.notes == []
+    driver.fake.schedule(0.05, add_note)
+    assert len(WebDriverWait(None, 2, poll_frequency=0.01).until(
+        lambda _: model.notes)) == 1
+    assert model.spinner.text == 'Loading'
+    driver.fake.schedule(0.05, lambda fake: fake.remove(By.ID, 'spinner'))
+    WebDriverWait(None, 2, poll_frequency=0.01).until_not(lambda _: model.spinner)
+
+
+class DialogModel(m_dialogs.ModalDlgModel):
+    close_btn = PageElement(By.ID, 'close')
+
+
+class Dialog(ModalDlg):
+    _model = DialogModel
+    _required_elems = ['close_btn']
+    _explicit_wait = True
+    _timeout = 3
+
+
+def test_dialog_disappearance_polled_with_explicit_wait(driver, monkeypatch):
+    def no_async_scripts(script, *args):
+        raise selenium_ex.WebDriverException("async scripts not supported")
+
+    driver.get('fake://dialog')
+    dialog = Dialog(driver)
+    monkeypatch.setattr(driver, 'execute_async_script', no_async_scripts)
+    driver.fake.schedule(
+        0.1, lambda fake: fake.remove(By.CLASS_NAME, 'gwt-PopupPanelGlass'))
+    start = time.time()
+    dialog.wait_to_disappear(timeout=3)
+    assert time.time() - start < 2
+    assert dialog._model._lookup_timeout == 3
+
+
+def test_form_scripts(driver):
+    model = WizardModel(driver)
+    bulk.fill(model, {'name': 'vm-01', 'os': 'fedora', 'start': True})
+    assert model.snapshot_values() == {
+        'name': 'vm-01', 'os': ['Fedora'], 'start': True}
+    model.os.value = 'rhel'
+    assert model.os.value == ['RHEL']
+
+
+class SecondFormModel(WebstrModel):
+    name = m_form.TextInput(By.XPATH, './/input[@name="n"]')
+
+    @property
+    def _root(self):
+        return self._driver.find_elements(By.TAG_NAME, 'form')[1]
+
+
+def test_custom_root_not_dropped_from_chains(driver):
+    driver.get('fake://forms')
+    model = SecondFormModel(driver)
+    assert model._element_chain('name') is None
+    assert model.snapshot_values(['name']) == {'name': 'b'}
+    bulk.fill(model, {'name': 'x'})
+    assert [element.get_attribute('value') for element
+            in driver.find_elements(By.NAME, 'n')] == ['a', 'x']
+
+
+def test_scripted_select_skips_disabled_options(driver, monkeypatch):
+    monkeypatch.setattr(config, 'SCRIPTED_SELECT', True)
+    model = WizardModel(driver)
+    assert model.os.select_matching('^(centos|fedora)$', mode='regex') == ['fedora']
+    with pytest.raises(selenium_ex.NoSuchElementException):
+        model.os.select_matching('centos')
+
+
+
+def test_unknown_script(driver):
+    with pytest.raises(selenium_ex.JavascriptException):
+        driver.execute_script('return document.title')
+
+
+def test_latency_and_command_counts(driver):
+    driver.fake.latency = {'getElementText': 0.01}
+    driver.fake.commands.clear()
+    driver.find_element(By.ID, 'spinner').text
+    assert driver.fake.commands == {'findElement': 1, 'getElementText': 1}
+
+
+def test_parented_root_inside_first_parent(driver):
+    driver.get('fake://menus')
+    assert MenuRowModel(driver, 2)._root.text == 'a2'
+    # the first menu has no third item, like when resolved level by level
+    with pytest.raises(selenium_ex.NoSuchElementException):
+        MenuRowModel(driver, 3)._root
+
+
+class MenuItemsModel(MenuModel):
+    _compile_locators = False
+    items = PageElement(By.XPATH, './li', as_list=True)
+    third = PageElement(By.XPATH, './li[3]')
+    first_item = PageElement(By.TAG_NAME, 'li')
+
+
+class CompiledMenuItemsModel(MenuItemsModel):
+    _compile_locators = True
+
+
+@pytest.mark.parametrize("model_cls", [MenuItemsModel, CompiledMenuItemsModel])
+def test_compiled_lookup_equivalent(driver, model_cls):
+    driver.get('fake://menus')
+    model = model_cls(driver)
+    assert [item.text for item in model.items] == ['a1', 'a2']
+    assert model.first_item.text == 'a1'
+    with pytest.raises(selenium_ex.NoSuchElementException):
+        model.third
@@ -0,0 +1,101 @@
+"""
+Unit tests of bulk form operations (see webstr.common.form.bulk).
+"""
+
+import pytest
+from selenium.common import exceptions as selenium_ex
+
+from webstr.core import By, WebstrModel, PageElement, RootPageElement
+from webstr.common.form import bulk
+from webstr.common.form import models as m_form
+from webstr.selenium import scripts
+from webstr.selenium.ui import exceptions as ui_exceptions
+
+
+class FillDriver(object):
+    """Webdriver stand-in answering the form fill script."""
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.entries = None
+        self.keystrokes = []
+
+    def execute_script(self, script, *args):
+        if script == scripts.FORM_VALUES:
+            self.entries = args[0]
+            return {'name': 'vm-01', 'os': ('RHEL 7',), 'start': True,
+                    'description': None}
+        assert script == scripts.FORM_FILL
+        self.entries = args[0]
+        return self.errors
+
+    def find_element(self, by, value):
+        return KeystrokeElement(self, value)
+
+
+class KeystrokeElement(object):
+    """Web element stand-in recording keystrokes."""
+
+    def __init__(self, driver, locator):
+        self.driver = driver
+        self.locator = locator
+
+    def clear(self):
+        pass
+
+    def send_keys(self, value):
+        self.driver.keystrokes.append((self.locator, value))
+
+    def find_element(self, by, value):
+        return KeystrokeElement(self.driver, value)
+
+
+class WizardModel(WebstrModel):
+    _root = RootPageElement(By.ID, 'wizard')
+    name = m_form.TextInput(By.ID, 'name')
+    description = m_form.TextArea(By.ID, 'description')
+    os = m_form.Select(By.ID, 'os')
+    start = m_form.Checkbox(By.ID, 'start')
+    label = PageElement(By.ID, 'label')
+
+
+def test_fill_single_script_grouped_by_kind():
+    driver = FillDriver()
+    bulk.fill(WizardModel(driver), {'start': True, 'os': 'rhel', 'name': 'vm-01'})
+    assert driver.entries == [
+        ['name', [(By.ID, 'wizard'), (By.ID, 'name')], 'text', 'vm-01'],
+        ['os', [(By.ID, 'wizard'), (By.ID, 'os')], 'select', 'rhel'],
+        ['start', [(By.ID, 'wizard'), (By.ID, 'start')], 'checkbox', True],
+        ]
+
+
+def test_fill_keystroke_fallback():
+    driver = FillDriver()
+    bulk.fill(WizardModel(driver), {'name': 'vm-01', 'description': 'test vm'},
+              keystrokes=['description'])
+    assert [entry[0] for entry in driver.entries] == ['name']
+    assert driver.keystrokes == [('description', 'test vm')]
+
+
+@pytest.mark.parametrize("errors, exception", [
+    ({'name': 'missing'}, ui_exceptions.ElementDoesNotExistError),
+    ({'os': 'no option'}, selenium_ex.NoSuchElementException),
+    ])
+def test_fill_errors(errors, exception):
+    with pytest.raises(exception):
+        bulk.fill(WizardModel(FillDriver(errors)), {'name': 'vm-01', 'os': 'rhel'})
+
+
+def test_fill_unknown_field():
+    with pytest.raises(AttributeError):
+        bulk.fill(WizardModel(FillDriver()), {'memory': 2048})
+
+
+def test_snapshot_values_single_script():
+    driver = FillDriver()
+    values = WizardModel(driver).snapshot_values()
+    # page elements without form kind are not read
+    assert [entry[0] for entry in driver.entries] == \
+        ['description', 'name', 'os', 'start']
+    assert values == {'name': 'vm-01', 'os': ['RHEL 7'], 'start': True,
+                      'description': None}
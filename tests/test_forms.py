@@ -0,0 +1,81 @@
+"""
+Unit tests of form widget helpers (see webstr.selenium.ui.forms).
+"""
+
+import re
+
+import pytest
+from selenium.common import exceptions as selenium_ex
+
+from webstr.core import config
+from webstr.selenium import scripts
+from webstr.selenium.ui import forms
+
+
+class ScriptDriver(object):
+    """Webdriver stand-in answering select box scripts."""
+
+    def __init__(self, options):
+        self.options = options
+        self.calls = []
+
+    def execute_script(self, script, element, *args):
+        self.calls.append(args)
+        if script == scripts.ELEMENT_VALUE:
+            return ['Host 1']
+        assert script == scripts.SELECT_OPTIONS
+        attribute, mode, pattern, flags = args
+        matched = [option for option in self.options
+                   if mode == 'prefix' and option.startswith(pattern)]
+        return [len(matched), matched]
+
+
+class SelectElement(object):
+    """Select web element stand-in."""
+    tag_name = 'select'
+
+    def __init__(self, driver):
+        self.parent = driver
+
+    def get_dom_attribute(self, name):
+        return 'multiple'
+
+
+@pytest.fixture
+def scripted(monkeypatch):
+    monkeypatch.setattr(config, 'SCRIPTED_SELECT', True)
+
+
+def test_select_not_scripted_by_default():
+    assert forms.Select(SelectElement(ScriptDriver([])))._scripted is False
+
+
+def test_select_matching_single_call(scripted):
+    driver = ScriptDriver(['node-1', 'node-2', 'other'])
+    select = forms.Select(SelectElement(driver))
+    assert select.select_matching('node-', mode='prefix') == ['node-1', 'node-2']
+    select.select_by_visible_text_starting_with('node-')
+    assert driver.calls == [
+        ('value', 'prefix', 'node-', ''), ('text', 'prefix', 'node-', '')]
+    assert select.value == ['Host 1']
+
+
+def test_select_matching_no_option(scripted):
+    select = forms.Select(SelectElement(ScriptDriver([])))
+    with pytest.raises(selenium_ex.NoSuchElementException):
+        select.select_by_value_starting_with('node-')
+
+
+def test_select_matching_python_pattern():
+    driver = ScriptDriver([])
+    driver.execute_script = lambda script, element, *args: \
+        driver.calls.append(args) or [1, ['node-1']]
+    select = forms.Select(SelectElement(driver))
+    select.select_matching(re.compile('^NODE-', re.I), attribute='text', mode='regex')
+    assert driver.calls == [('text', 'regex', '^NODE-', 'i')]
+    with pytest.raises(ValueError):
+        select.select_matching(re.compile(r'(?P<id>\d+)'), mode='regex')
+    with pytest.raises(ValueError):
+        select.select_matching(re.compile('node', re.X), mode='regex')
+    with pytest.raises(TypeError):
+        select.select_matching(re.compile('node'), mode='prefix')
@@ -12,6 +12,7 @@ import sys
 import pytest
 
 import webstr.core.model
+import webstr.core.page
 
 
 def list_submodules(module_path, module_prefix):
@@ -57,3 +58,31 @@ def test_models_module_naming_scheme(module):
             continue
         # actuall check: model class name should end with "Model" suffix
         assert class_name.endswith("Model")
+
+
+def list_page_submodules(module_path, module_prefix):
+    """
+    For given module, return list of full module path names for all page object submodules recursively.
+    """
+    return [name for name in list_submodules(module_path, module_prefix) if name.endswith("pages")]
+
+
+@pytest.mark.parametrize("module", list_page_submodules("webstr", "webstr."))
+def test_required_elements_defined(module):
+    """
+    Check that required elements of all page objects from pages modules
+    are defined in their page models (see the model element registry).
+    """
+    importlib.import_module(module)
+    for _, class_type in inspect.getmembers(sys.modules[module], inspect.isclass):
+        if class_type.__module__ != module or \
+           not issubclass(class_type, webstr.core.page.WebstrPageBase):
+            continue
+        # abstract page objects leave the required elements to subclasses
+        if class_type.__subclasses__():
+            continue
+        model = class_type._model
+        for elem in class_type._required_elems or []:
+            assert elem in model._element_index or hasattr(model, elem), \
+                "%s: required element %s is not defined in %s" % (
+                    class_type.__name__, elem, model.__name__)
@@ -0,0 +1,89 @@
+"""
+Unit tests of WebDriver command instrumentation
+(see webstr.selenium.instrumentation).
+"""
+
+import json
+
+import pytest
+
+from webstr.selenium import instrumentation
+from webstr.selenium.webdriver import WebDriverExtension
+
+
+class RemoteDriver(object):
+    """Remote end stand-in."""
+
+    def execute(self, driver_command, params=None):
+        if driver_command == 'fail':
+            raise ValueError("command failed")
+        return {'value': None}
+
+
+class Driver(WebDriverExtension, RemoteDriver):
+    pass
+
+
+@pytest.fixture
+def sink():
+    sink = instrumentation.MemorySink()
+    instrumentation.enable(sink)
+    yield sink
+    instrumentation.disable()
+
+
+def test_disabled_by_default():
+    assert not instrumentation.RECORDER.enabled
+    Driver().execute('findElement')
+
+
+def test_commands_recorded_and_attributed(sink):
+    driver = Driver()
+    with instrumentation.attribute('LoginPage'):
+        with instrumentation.attribute('LoginModel(id=user)'):
+            driver.execute('findElement')
+        driver.execute('clickElement')
+    with pytest.raises(ValueError):
+        driver.execute('fail')
+    assert sink.histograms['findElement'].count == 1
+    assert sink.histograms['fail'].count == 1
+    assert sink.origins['LoginModel(id=user)'].count == 1
+    assert sink.origins['LoginPage'].count == 1
+    assert sink.origins[None].count == 1
+    summary = sink.to_dict()
+    assert summary['commands']['clickElement']['count'] == 1
+
+
+def test_json_lines_sink(tmpdir):
+    path = str(tmpdir.join('commands.jsonl'))
+    instrumentation.enable(instrumentation.JsonLinesSink(path))
+    try:
+        with instrumentation.attribute('LoginPage'):
+            Driver().execute('findElement')
+            instrumentation.RECORDER.increment('stale_refresh')
+    finally:
+        instrumentation.disable()
+    with open(path) as fileh:
+        records = [json.loads(line) for line in fileh]
+    assert records[0]['command'] == 'findElement'
+    assert records[0]['origin'] == ['LoginPage']
+    assert records[0]['error'] is None
+    assert records[1]['counter'] == 'stale_refresh'
+
+
+def test_histogram_percentiles():
+    histogram = instrumentation.Histogram()
+    for value in (0.003, 0.004, 0.03, 3):
+        histogram.record(value)
+    assert histogram.percentile(50) == 0.005
+    assert histogram.percentile(100) == 3
+    assert histogram.to_dict()['buckets'] == {'<=0.005s': 2, '<=0.05s': 1, '<=5s': 1}
+
+
+def test_implicit_wait_for_missing_elements(sink):
+    driver = Driver()
+    driver.implicit_wait = 5
+    driver.execute('findElements')
+    driver.execute('clickElement')
+    assert sink.counters['implicit_wait'] > 0
+    assert list(sink.counters) == ['implicit_wait']
@@ -0,0 +1,191 @@
+"""
+Unit tests of locator composition helpers (see webstr.core.locators).
+"""
+
+import pytest
+
+from webstr.core import (
+    By, WebstrModel, DynamicWebstrModel, PageElement, DynamicPageElement,
+    RootPageElement, NameRootPageElement)
+from webstr.core import locators
+from webstr.core.locators import (
+    compile_chain, compose_chain, join_locators, LocatorTemplate)
+
+
+@pytest.mark.parametrize("parent, child, expected", [
+    ('//ul', './li', '(//ul)[1]/li'),
+    ('//ul', './/li', '(//ul)[1]//li'),
+    ('//ul', '.', '(//ul)[1]'),
+    ('//ul', 'li[1]', '(//ul)[1]/li[1]'),
+    ('//ul', '(.//li)[2]', '((//ul)[1]//li)[2]'),
+    ('//ul | //ol', './li', '(//ul | //ol)[1]/li'),
+    ('(//ul)[1]', './li', '(//ul)[1]/li'),
+    ('(//ul)[2]/li', './a', '((//ul)[2]/li)[1]/a'),
+    ])
+def test_join_xpath(parent, child, expected):
+    assert join_locators((By.XPATH, parent), (By.XPATH, child)) \
+        == (By.XPATH, expected)
+
+
+@pytest.mark.parametrize("child", ['//li', '(//li)[1]', './a | ./b'])
+def test_join_xpath_not_relative(child):
+    assert join_locators((By.XPATH, '//ul'), (By.XPATH, child)) is None
+
+
+def test_join_css():
+    assert join_locators((By.CSS_SELECTOR, '#menu'), (By.CSS_SELECTOR, 'li')) \
+        == (By.CSS_SELECTOR, '#menu li')
+    assert join_locators((By.CSS_SELECTOR, '[id="menu"]'), (By.CSS_SELECTOR, 'li')) \
+        == (By.CSS_SELECTOR, '[id="menu"] li')
+    # the parent may match more elements, but CSS can't select the first one
+    assert join_locators((By.CSS_SELECTOR, 'ul.menu'), (By.CSS_SELECTOR, 'li')) is None
+    assert join_locators((By.CSS_SELECTOR, '#menu'), (By.CSS_SELECTOR, 'a, b')) is None
+
+
+def test_join_different_types():
+    assert join_locators((By.ID, 'menu'), (By.XPATH, './li')) is None
+
+
+def test_compose_chain():
+    chain = [(By.ID, 'menu'), (By.XPATH, '//ul'), (By.XPATH, './li[1]'),
+             (By.XPATH, './a')]
+    assert compose_chain(chain) == [
+        (By.ID, 'menu'), (By.XPATH, '((//ul)[1]/li[1])[1]/a')]
+
+
+@pytest.mark.parametrize("chain, expected", [
+    ([(By.XPATH, '//div[contains(@class, "modal-dialog")]'),
+      (By.XPATH, ".//button[@class='close']")],
+     [(By.XPATH, '(//div[contains(@class, "modal-dialog")])[1]//button[@class=\'close\']')]),
+    ([(By.XPATH, '//*[contains(concat(" ", @class, " "), " list-view-pf ")]')],
+     [(By.CSS_SELECTOR, '.list-view-pf')]),
+    ([(By.XPATH, '//*[@id="dialog"]'), (By.XPATH, './div[@data-id]/span')],
+     [(By.CSS_SELECTOR, '[id="dialog"] > div[data-id] > span')]),
+    ([(By.ID, 'menu'), (By.CSS_SELECTOR, 'li.active')],
+     [(By.CSS_SELECTOR, '[id="menu"] li.active')]),
+    ([(By.ID, 'menu'), (By.XPATH, './li[1]')],
+     [(By.XPATH, '(//*[@id="menu"])[1]/li[1]')]),
+    ([(By.XPATH, '//ul'), (By.XPATH, '//li[text()="x"]')],
+     [(By.XPATH, '//ul'), (By.XPATH, '//li[text()="x"]')]),
+    ([(By.CSS_SELECTOR, 'ul'), (By.XPATH, './li[1]')],
+     [(By.CSS_SELECTOR, 'ul'), (By.XPATH, './li[1]')]),
+    ([(By.ID, 'menu'), (By.CLASS_NAME, 'item'), (By.TAG_NAME, 'a')],
+     [(By.XPATH, '((//*[@id="menu"])[1]//*[contains(concat(" ", @class, " "), " item ")])[1]//a')]),
+    ])
+def test_compile_chain(chain, expected):
+    assert compile_chain(chain) == expected
+
+
+class LookupDriver(object):
+    """Webdriver stand-in recording element lookups."""
+
+    def __init__(self):
+        self.lookups = []
+
+    def find_element(self, by, value):
+        self.lookups.append((by, value))
+        return LookupElement(self)
+
+
+class LookupElement(object):
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def find_element(self, by, value):
+        return self.driver.find_element(by, value)
+
+
+class DialogModel(WebstrModel):
+    _compile_locators = True
+    _root = RootPageElement(By.XPATH, '//div[@role="dialog"]')
+    title = PageElement(By.XPATH, './/h4')
+    item = PageElement(By.XPATH, './/li[2]')
+
+
+class RowModel(DynamicWebstrModel):
+    _compile_locators = True
+    _root = NameRootPageElement(By.XPATH, '//tr[%d]')
+    name = PageElement(By.XPATH, './td[1]')
+
+
+def test_compiled_model_lookup():
+    driver = LookupDriver()
+    model = DialogModel(driver)
+    model.title
+    model.item
+    assert driver.lookups == [
+        (By.XPATH, '(//div[@role="dialog"])[1]//h4'),
+        (By.XPATH, '(//div[@role="dialog"])[1]//li[2]')]
+
+
+def test_compiled_chains_follow_root_changes():
+    class BaseModel(WebstrModel):
+        _compile_locators = True
+        title = PageElement(By.ID, 'title')
+
+    class SubModel(BaseModel):
+        pass
+
+    BaseModel._root = RootPageElement(By.ID, 'dialog')
+    driver = LookupDriver()
+    SubModel(driver).title
+    assert driver.lookups == [(By.CSS_SELECTOR, '[id="dialog"] [id="title"]')]
+
+
+def test_dynamic_chain_not_compiled():
+    assert RowModel._compiled_chains == {}
+    driver = LookupDriver()
+    RowModel(driver, 2).name
+    assert driver.lookups == [(By.XPATH, '//tr[2]'), (By.XPATH, './td[1]')]
+
+
+@pytest.mark.parametrize("by, template, values, expected", [
+    (By.XPATH, '(//tr)[%d]', 3, '(//tr)[3]'),
+    (By.XPATH, '//a[contains(text(),%s)]', 'Overview', '//a[contains(text(),"Overview")]'),
+    (By.XPATH, '//a[contains(text(),%s)]', 2, '//a[contains(text(),2)]'),
+    (By.XPATH, '//a[contains(text(),%s)]', 'Bob\'s "VM"',
+     '//a[contains(text(),concat("Bob\'s ", \'"\', "VM", \'"\'))]'),
+    (By.XPATH, '//div[@id="vm_%s"]', 'a"b', "//div[@id='vm_a\"b']"),
+    (By.XPATH, '//div[@id="vm_%s"][%d]', ('x', 2), '//div[@id="vm_x"][2]'),
+    (By.XPATH, '//div[@style="width: 100%%"][%d]', 1, '//div[@style="width: 100%"][1]'),
+    (By.CSS_SELECTOR, 'tr[data-name="%s"]', 'a"b', 'tr[data-name="a\\"b"]'),
+    (By.ID, 'VMList_name_%s', 'vm-01', 'VMList_name_vm-01'),
+    ])
+def test_locator_template(by, template, values, expected):
+    assert LocatorTemplate(by, template).render(values) == expected
+
+
+def test_locator_template_invalid():
+    with pytest.raises(ValueError):
+        LocatorTemplate(By.XPATH, '//tr[%r]')
+    with pytest.raises(ValueError):
+        LocatorTemplate(By.XPATH, '//tr[@id="%s]')
+    with pytest.raises(TypeError):
+        LocatorTemplate(By.XPATH, '//tr[%d]/td[%d]').render(1)
+
+
+def test_locator_template_cache_bounded(monkeypatch):
+    monkeypatch.setattr(locators, 'TEMPLATE_CACHE_SIZE', 2)
+    template = LocatorTemplate(By.XPATH, '//tr[%d]')
+    for index in (1, 2, 1, 3):
+        template.render(index)
+    assert list(template._cache) == [(1,), (3,)]
+
+
+def test_template_arity_checked_at_definition():
+    with pytest.raises(TypeError):
+        class BrokenRowModel(DynamicWebstrModel):
+            _root = NameRootPageElement(By.XPATH, '//tr[%d]/td[%d]')
+
+    with pytest.raises(TypeError):
+        class BrokenVmModel(DynamicWebstrModel):
+            name = DynamicPageElement(By.ID, 'VMList_name')
+
+    class CellModel(DynamicWebstrModel):
+        _name_arity = 2
+        _root = NameRootPageElement(By.XPATH, '//tr[%d]/td[%d]')
+
+    driver = LookupDriver()
+    CellModel(driver, (2, 3))._root
+    assert driver.lookups == [(By.XPATH, '//tr[2]/td[3]')]
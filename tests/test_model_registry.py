@@ -0,0 +1,94 @@
+"""
+Unit tests of the page element registry of page models
+(see webstr.core.model.WebstrModelMeta).
+"""
+
+import pytest
+
+from webstr.core import (
+    By, WebstrModel, DynamicWebstrModel, WebstrPage, PageElement,
+    DynamicPageElement, RootPageElement, NameRootPageElement)
+from webstr.core.model import ElementSpec, ROOT_KIND, ELEMENT_KIND
+from webstr.common.form import models as m_form
+
+
+class BaseFormModel(WebstrModel):
+    _root = RootPageElement(By.ID, 'form')
+    name = m_form.TextInput(By.ID, 'name')
+    rows = PageElement(By.XPATH, './/tr', as_list=True)
+    legacy = PageElement(By.ID, 'legacy')
+
+
+class FormModel(BaseFormModel):
+    legacy = None
+    start = m_form.Checkbox(By.ID, 'start')
+    TITLE = 'Form'
+
+
+class VmModel(DynamicWebstrModel):
+    _root = NameRootPageElement(By.XPATH, '//tr[%d]')
+    status = DynamicPageElement(By.ID, 'status_%s')
+
+
+def test_registry_merges_inheritance():
+    assert [spec.name for spec in FormModel._elements] \
+        == ['_root', 'name', 'rows', 'start']
+    assert 'legacy' in BaseFormModel._element_index
+    assert FormModel._element_index['name'] == ElementSpec(
+        name='name', kind='text', by=By.ID, locator='name', dynamic=False,
+        helper=m_form.TextInput._helper, as_list=False,
+        descriptor=BaseFormModel.__dict__['name'])
+
+
+def test_registry_entries():
+    index = FormModel._element_index
+    assert index['_root'].kind == ROOT_KIND
+    assert index['rows'].kind == ELEMENT_KIND and index['rows'].as_list
+    assert index['start'].kind == 'checkbox'
+    assert VmModel._element_index['_root'].dynamic
+    assert VmModel._element_index['status'].dynamic
+    assert VmModel._element_index['status'].locator == 'status_%s'
+
+
+def test_registry_follows_class_changes():
+    class PatchedModel(BaseFormModel):
+        pass
+
+    PatchedModel.extra = PageElement(By.ID, 'extra')
+    assert 'extra' in PatchedModel._element_index
+    PatchedModel.extra = None
+    assert 'extra' not in PatchedModel._element_index
+
+
+class FormDriver(object):
+    """Webdriver stand-in finding every element."""
+
+    def __init__(self):
+        self.lookups = []
+
+    def implicitly_wait(self, timeout):
+        pass
+
+    def find_element(self, by, value):
+        self.lookups.append(value)
+        return self
+
+
+class FormPage(WebstrPage):
+    _model = FormModel
+    _required_elems = ['name', 'TITLE']
+
+
+def test_validation_via_registry():
+    driver = FormDriver()
+    FormPage(driver)
+    assert driver.lookups == ['form', 'name']
+
+
+def test_validation_of_unknown_element():
+    class BrokenPage(WebstrPage):
+        _model = FormModel
+        _required_elems = ['missing']
+
+    with pytest.raises(AttributeError):
+        BrokenPage(FormDriver())
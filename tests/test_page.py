@@ -0,0 +1,84 @@
+"""
+Unit tests of page object base classes (see webstr.core.page).
+"""
+
+import pytest
+from selenium.common import exceptions as selenium_ex
+
+from webstr.core import By, WebstrModel, WebstrPage, PageElement, RootPageElement
+from webstr.selenium import scripts
+from webstr.selenium.ui import exceptions as ui_exceptions
+
+
+class ProbeDriver(object):
+    """Webdriver stand-in answering presence probes."""
+
+    def __init__(self, present):
+        self.present = present
+        self.probes = []
+
+    def implicitly_wait(self, timeout):
+        pass
+
+    def execute_script(self, script, *args):
+        assert script == scripts.PRESENCE_PROBE
+        self.probes.append(args[0])
+        return [self.present] * len(args[0])
+
+
+class DialogModel(WebstrModel):
+    _root = RootPageElement(By.XPATH, '//div[@role="dialog"]')
+    ok_btn = PageElement(By.XPATH, './/button[1]')
+    cancel_btn = PageElement(By.XPATH, './/button[2]')
+
+
+class Dialog(WebstrPage):
+    _model = DialogModel
+    _required_elems = ['ok_btn', 'cancel_btn']
+    _batch_validation = True
+    _timeout = 0
+
+
+def test_batch_validation_single_probe():
+    driver = ProbeDriver(present=True)
+    Dialog(driver)
+    assert driver.probes == [[
+        ([(By.XPATH, '(//div[@role="dialog"])[1]//button[1]')], False),
+        ([(By.XPATH, '(//div[@role="dialog"])[1]//button[2]')], False),
+        ]]
+
+
+def test_batch_validation_missing_elements():
+    driver = ProbeDriver(present=False)
+    with pytest.raises(ui_exceptions.InitPageValidationError):
+        Dialog(driver)
+
+
+class MissingElementDriver(object):
+    """Webdriver stand-in without any elements on the page."""
+
+    def __init__(self):
+        self.implicit_waits = []
+        self.lookups = 0
+
+    def implicitly_wait(self, timeout):
+        self.implicit_waits.append(timeout)
+
+    def find_element(self, by, value):
+        self.lookups += 1
+        raise selenium_ex.NoSuchElementException("no such element: %s" % value)
+
+
+class ExplicitWaitDialog(Dialog):
+    _batch_validation = False
+    _explicit_wait = True
+    _timeout = 0.3
+
+
+def test_explicit_wait_fails_with_element_does_not_exist():
+    driver = MissingElementDriver()
+    with pytest.raises(ui_exceptions.InitPageValidationError) as exc_info:
+        ExplicitWaitDialog(driver)
+    assert driver.implicit_waits == [0]
+    assert driver.lookups > 1
+    assert 'element does not exist' in str(exc_info.value)
@@ -0,0 +1,49 @@
+"""
+Unit tests of parallel test execution helpers (see webstr.core.parallel).
+"""
+
+import threading
+
+from webstr.core.parallel import DurationHistory, ParallelRunner, schedule
+
+
+def make_history(durations, path=None):
+    history = DurationHistory(path)
+    for test_id, duration in durations.items():
+        history.record(test_id, duration)
+    return history
+
+
+def test_schedule_balances_load():
+    history = make_history({'a': 8, 'b': 5, 'c': 4, 'd': 3, 'e': 2})
+    shards = schedule(['a', 'b', 'c', 'd', 'e'], 2, history)
+    loads = sorted(sum(history.get(test) for test in shard) for shard in shards)
+    assert loads == [11, 11]
+
+
+def test_unknown_duration_is_median():
+    history = make_history({'a': 1, 'b': 2, 'c': 9})
+    assert history.get('unknown') == 2
+
+
+def test_history_roundtrip(tmpdir):
+    path = str(tmpdir.join('durations.json'))
+    history = make_history({'a': 1.5}, path)
+    history.save()
+    assert DurationHistory(path).get('a') == 1.5
+
+
+def test_runner_uses_workers():
+    threads = set()
+    lock = threading.Lock()
+
+    def test_func():
+        with lock:
+            threads.add(threading.current_thread().name)
+
+    runner = ParallelRunner(workers=2, history=DurationHistory())
+    results = runner.run([('test_%d' % index, test_func) for index in range(6)])
+    assert len(results) == 6
+    assert all(result.error is None for result in results)
+    assert threads <= set(['webstr-worker-0', 'webstr-worker-1'])
+    assert 'test_0' in runner.history
@@ -0,0 +1,178 @@
+"""
+Parity of the scripts of webstr.selenium.scripts and their Python handlers
+in the fake WebDriver backend (see webstr.selenium.fake).
+
+The fake backend doesn't execute JavaScript, so every script is tied
+to its handler by a digest of its source (see SCRIPT_DIGESTS of the fake
+backend). Tests marked `browser` run the scripts in a real headless browser
+and compare the results with the fake backend; they are skipped unless
+the WEBSTR_TEST_BROWSER environment variable names the browser ('Chrome'
+or 'Firefox'), e.g.::
+
+    WEBSTR_TEST_BROWSER=Firefox py.test -m browser tests/test_script_parity.py
+"""
+
+import hashlib
+import os
+
+import pytest
+
+pytest.importorskip('lxml')
+pytest.importorskip('cssselect')
+
+from selenium import webdriver
+
+from webstr.core import By
+from webstr.selenium import fake
+from webstr.selenium import scripts
+from webstr.selenium.webdriver import DriverFactory
+
+
+BROWSER = os.environ.get('WEBSTR_TEST_BROWSER')
+
+PAGE = """
+<html><head><title>Parity</title></head><body>
+<ul class="menu"><li>a1</li><li>a2</li></ul>
+<ul class="menu"><li>b1</li><li>b2</li><li>b3</li></ul>
+<div id="hosts">
+  <div class="row"><span class="name">host-1</span> <span class="state">up</span></div>
+  <div class="row"><span class="name">host-2</span> <span class="state">down</span></div>
+</div>
+<div id="spinner" style="display: none">Loading</div>
+<button id="next" type="button">Next</button>
+<form id="wizard">
+  <input id="name" type="text" value="vm"/>
+  <select id="os"><option value="rhel">RHEL</option><option value="fedora">Fedora</option></select>
+  <select id="nodes" multiple="multiple">
+    <option value="n1">Node 1</option>
+    <option value="n2" disabled="disabled">Node 2</option>
+    <option value="n3">node 3</option>
+  </select>
+  <input id="start" type="checkbox"/>
+  <span id="label">Wizard</span>
+</form>
+</body></html>
+"""
+
+ROWS = [['xpath', '//div[@id="hosts"]'], ['class name', 'row']]
+VALUES = [['name', [['id', 'name']]], ['os', [['id', 'os']]],
+          ['nodes', [['id', 'nodes']]], ['start', [['id', 'start']]],
+          ['label', [['id', 'label']]], ['missing', [['id', 'missing']]]]
+
+# (case name, script, function returning the arguments for the driver,
+#  asynchronous script)
+CASES = [
+    ('mutation_counter', scripts.MUTATION_COUNTER, lambda driver: [], False),
+    ('presence_probe', scripts.PRESENCE_PROBE, lambda driver: [[
+        [[['xpath', '//ul[@class="menu"]'], ['xpath', './li[2]']], False],
+        [[['xpath', '//ul[@class="menu"]'], ['xpath', './li[3]']], False],
+        [ROWS, True],
+        [[['id', 'missing'], ['tag name', 'li']], True],
+        ]], False),
+    ('container_snapshot', scripts.CONTAINER_SNAPSHOT, lambda driver: [
+        ROWS, [['name', 'class name', 'name'], ['state', 'class name', 'state']],
+        1, None], False),
+    ('container_count', scripts.CONTAINER_COUNT, lambda driver: [
+        ROWS, [['class name', 'state', 'up']]], False),
+    ('click_if_present', scripts.CLICK_IF_PRESENT,
+     lambda driver: [[['id', 'next']]], False),
+    ('scroll_to_last_row', scripts.SCROLL_TO_LAST_ROW, lambda driver: [ROWS], False),
+    ('form_fill', scripts.FORM_FILL, lambda driver: [[
+        ['name', [['id', 'name']], 'text', 'vm-01'],
+        ['os', [['id', 'os']], 'select', 'fedora'],
+        ['start', [['id', 'start']], 'checkbox', True],
+        ['missing', [['id', 'missing']], 'text', 'x'],
+        ]], False),
+    ('form_values', scripts.FORM_VALUES, lambda driver: [VALUES], False),
+    ('element_value', scripts.ELEMENT_VALUE,
+     lambda driver: [driver.find_element(By.ID, 'os')], False),
+    ('select_options', scripts.SELECT_OPTIONS, lambda driver: [
+        driver.find_element(By.ID, 'nodes'), 'text', 'regex', '^node', 'i'], False),
+    ('wait_for_mutation', scripts.WAIT_FOR_MUTATION, lambda driver: [50], True),
+    ('wait_for_disappearance', scripts.WAIT_FOR_DISAPPEARANCE, lambda driver: [
+        [[[['id', 'spinner']], False], [[['id', 'missing'], ['tag name', 'li']], True]],
+        'all', 1000],
+     True),
+    ]
+
+
+def script_names():
+    """Return names of the scripts (not of shared functions) of the module."""
+    return sorted(name for name, value in vars(scripts).items()
+                  if name.isupper() and isinstance(value, str)
+                  and not name.endswith('_FUNCTIONS'))
+
+
+@pytest.mark.parametrize("name", script_names())
+def test_script_digests(name):
+    source = getattr(scripts, name)
+    digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+    assert fake.SCRIPT_DIGESTS.get(name) == digest, \
+        "script %s changed, review its handler in webstr.selenium.fake and " \
+        "update SCRIPT_DIGESTS" % name
+
+
+def test_all_scripts_handled_and_covered():
+    executor = fake.FakeCommandExecutor()
+    handled = set(executor._script_handlers) | set(executor._async_script_handlers)
+    assert [name for name in script_names()
+            if getattr(scripts, name) not in handled] == []
+    assert sorted(case[1] for case in CASES) \
+        == sorted(getattr(scripts, name) for name in script_names())
+
+
+def run(driver, url, script, args, asynchronous):
+    """Load the page and run the script; return JSON-like result."""
+    driver.get(url)
+    arguments = args(driver)
+    if asynchronous:
+        return driver.execute_async_script(script, *arguments)
+    result = driver.execute_script(script, *arguments)
+    if script == scripts.MUTATION_COUNTER:
+        # page tokens differ
+        return result[1]
+    if script in (scripts.FORM_FILL, scripts.SELECT_OPTIONS, scripts.CLICK_IF_PRESENT):
+        # compare the page state after the script as well
+        return [result, driver.execute_script(scripts.FORM_VALUES, VALUES)]
+    return result
+
+
+@pytest.fixture(scope='module')
+def page_url(tmp_path_factory):
+    path = tmp_path_factory.mktemp('parity').joinpath('page.html')
+    path.write_text(PAGE)
+    return 'file://%s' % path
+
+
+@pytest.fixture(scope='module')
+def browser():
+    if BROWSER == 'Chrome':
+        options = webdriver.ChromeOptions()
+        options.add_argument('--headless=new')
+        driver = webdriver.Chrome(options=options)
+    elif BROWSER == 'Firefox':
+        options = webdriver.FirefoxOptions()
+        options.add_argument('-headless')
+        driver = webdriver.Firefox(options=options)
+    else:
+        pytest.skip("set WEBSTR_TEST_BROWSER to Chrome or Firefox to compare "
+                    "scripts with a real browser")
+    driver.set_script_timeout(5)
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture(scope='module')
+def fake_driver():
+    driver = DriverFactory('Fake')
+    driver.set_script_timeout(5)
+    yield driver
+    driver.quit()
+
+
+@pytest.mark.browser
+@pytest.mark.parametrize("script, args, asynchronous",
+                         [case[1:] for case in CASES], ids=[case[0] for case in CASES])
+def test_script_parity(browser, fake_driver, page_url, script, args, asynchronous):
+    assert run(fake_driver, page_url, script, args, asynchronous) \
+        == run(browser, page_url, script, args, asynchronous)
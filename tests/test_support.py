@@ -0,0 +1,117 @@
+"""
+Unit tests of wait helpers (see webstr.selenium.ui.support).
+"""
+
+import itertools
+
+import pytest
+from selenium.common import exceptions as selenium_ex
+
+from webstr.core import config
+from webstr.selenium.ui.support import (
+    BackoffPollScheduler, FastFirstPollScheduler, PollScheduler, WebDriverWait,
+    WaitForWebstrPage, POLL_FREQUENCY, SCRIPT_TIMEOUT, wait_for_disappearance)
+
+
+def first(scheduler, count):
+    return list(itertools.islice(scheduler.intervals(), count))
+
+
+def test_constant_scheduler():
+    assert first(PollScheduler(0.5), 3) == [0.5, 0.5, 0.5]
+
+
+def test_backoff_scheduler():
+    assert first(BackoffPollScheduler(initial=0.1, factor=2, cap=0.5), 5) \
+        == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+
+def test_fast_first_scheduler():
+    scheduler = FastFirstPollScheduler(fast_polls=2, fast_interval=0.01, interval=1)
+    assert first(scheduler, 4) == [0.01, 0.01, 1, 1]
+
+
+class PageObject(object):
+    """Page object stand-in."""
+    driver = None
+
+
+def page_wait_intervals(**kwargs):
+    wait = WaitForWebstrPage(PageObject(), 10, **kwargs)
+    return first(wait._WaitForWebstrPage__wait._scheduler, 6)
+
+
+def test_page_wait_constant_by_default():
+    assert page_wait_intervals() == [POLL_FREQUENCY] * 6
+    assert page_wait_intervals(scheduler=PollScheduler(0.5)) == [0.5] * 6
+
+
+def test_page_wait_fast_first_opt_in(monkeypatch):
+    monkeypatch.setattr(config, 'FAST_FIRST_POLL', True)
+    assert page_wait_intervals() == [0.1] * 5 + [POLL_FREQUENCY]
+
+
+class SignalDriver(object):
+    """Webdriver stand-in reporting a DOM change immediately."""
+
+    def __init__(self, supported=True):
+        self.supported = supported
+        self.signals = 0
+
+    def execute_async_script(self, script, *args):
+        self.signals += 1
+        if not self.supported:
+            raise selenium_ex.WebDriverException("async scripts not supported")
+        return True
+
+
+def test_until_with_signal():
+    values = iter([False, False, 'done'])
+    driver = SignalDriver()
+    wait = WebDriverWait(None, 10, signal_driver=driver)
+    assert wait.until(lambda _: next(values)) == 'done'
+    assert driver.signals == 2
+
+
+def test_signal_fallback_to_sleep():
+    values = iter([False, False, True])
+    driver = SignalDriver(supported=False)
+    wait = WebDriverWait(None, 10, scheduler=PollScheduler(0.01), signal_driver=driver)
+    assert wait.until(lambda _: next(values))
+    assert driver.signals == 1
+
+
+def test_until_not_timeout():
+    wait = WebDriverWait(None, 0.05, scheduler=PollScheduler(0.01))
+    with pytest.raises(selenium_ex.TimeoutException):
+        wait.until_not(lambda _: True, "still there")
+
+
+class AsyncScriptDriver(object):
+    """Webdriver stand-in answering the disappearance script."""
+
+    def __init__(self, result):
+        self.result = result
+        self.script_timeouts = []
+
+    def set_script_timeout(self, timeout):
+        self.script_timeouts.append(timeout)
+
+    def execute_async_script(self, script, *args):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.mark.parametrize("result, expected", [
+    (True, True),
+    (False, False),
+    (selenium_ex.TimeoutException("script timeout"), False),
+    (selenium_ex.WebDriverException("not supported"), None),
+    ])
+def test_wait_for_disappearance(result, expected):
+    driver = AsyncScriptDriver(result)
+    assert wait_for_disappearance(driver, [([('xpath', '//div')], False)], 5) \
+        is expected
+    # the original script timeout is restored
+    assert driver.script_timeouts == [5 + SCRIPT_TIMEOUT, SCRIPT_TIMEOUT]
@@ -0,0 +1,153 @@
+"""
+Unit tests of the stale-safe element proxy (see webstr.selenium.webelement).
+"""
+
+import pytest
+from selenium.common import exceptions as selenium_ex
+
+from webstr.selenium import webelement
+from webstr.selenium.webelement import FreshWebElement
+
+
+class Element(object):
+    """Web element stand-in which can become stale."""
+
+    def __init__(self, driver, text):
+        self.parent = driver
+        self._text = text
+        self.stale = False
+        self.clicks = 0
+        self.lookups = []
+        self.children = []
+
+    @property
+    def text(self):
+        if self.stale:
+            raise selenium_ex.StaleElementReferenceException("stale")
+        return self._text
+
+    def click(self):
+        if self.stale:
+            raise selenium_ex.StaleElementReferenceException("stale")
+        self.clicks += 1
+
+    @property
+    def _state(self):
+        if self.stale:
+            raise selenium_ex.StaleElementReferenceException("stale")
+        return self._text
+
+    def _execute(self, command):
+        if self.stale:
+            raise selenium_ex.StaleElementReferenceException("stale")
+        return command, self._text
+
+    def find_element(self, by, value):
+        return self.find_elements(by, value)[0]
+
+    def find_elements(self, by, value):
+        if self.stale:
+            raise selenium_ex.StaleElementReferenceException("stale")
+        self.lookups.append((by, value))
+        self.children = [Element(self.parent, 'row %d' % index) for index in range(3)]
+        return self.children
+
+
+class Driver(object):
+    """Webdriver stand-in returning fresh elements."""
+
+    def __init__(self):
+        self.lookups = []
+        self.invalidations = 0
+
+    def invalidate_element_caches(self):
+        self.invalidations += 1
+
+    def find_element(self, by, value, auto_refresh=True):
+        self.lookups.append((by, value))
+        return Element(self, 'fresh')
+
+
+def test_wrappers_generated_once():
+    assert 'click' in FreshWebElement.__dict__
+    assert 'text' in FreshWebElement.__dict__
+    assert not hasattr(FreshWebElement(None, 'id', 'x'), '__dict__')
+
+
+def test_stale_element_refreshed():
+    driver = Driver()
+    element = Element(driver, 'old')
+    fresh = FreshWebElement(element, 'id', 'login')
+    assert fresh.text == 'old'
+    element.stale = True
+    assert fresh.text == 'fresh'
+    fresh.click()
+    assert fresh._elem.clicks == 1
+    assert driver.lookups == [('id', 'login')]
+    assert driver.invalidations == 1
+
+
+def test_stale_attempts_exhausted():
+    driver = Driver()
+    driver.find_element = lambda by, value, auto_refresh: stale_element
+    stale_element = Element(driver, 'old')
+    stale_element.stale = True
+    with pytest.raises(selenium_ex.StaleElementReferenceException):
+        FreshWebElement(stale_element, 'id', 'login').click()
+
+
+def test_fallback_stale_refreshed(refresh_counts):
+    driver = Driver()
+    element = Element(driver, 'old')
+    fresh = FreshWebElement(element, 'id', 'login')
+    execute = fresh._execute
+    element.stale = True
+    assert execute('click') == ('click', 'fresh')
+    fresh._elem.stale = True
+    assert fresh._state == 'fresh'
+
+
+@pytest.mark.parametrize("attempts", [1, 5])
+def test_fallback_stale_attempts_exhausted(refresh_counts, monkeypatch, attempts):
+    monkeypatch.setattr(webelement, 'STALE_ATTEMPTS', attempts)
+    driver = Driver()
+    driver.find_element = lambda by, value, auto_refresh: stale_element
+    stale_element = Element(driver, 'old')
+    fresh = FreshWebElement(stale_element, 'id', 'login')
+    execute = fresh._execute
+    stale_element.stale = True
+    with pytest.raises(selenium_ex.StaleElementReferenceException):
+        fresh._state
+    with pytest.raises(selenium_ex.StaleElementReferenceException):
+        execute('click')
+
+
+@pytest.fixture
+def refresh_counts(monkeypatch):
+    monkeypatch.setattr(webelement, 'STALE_BACKOFF', 0)
+    webelement.reset_refresh_counts()
+    yield
+    webelement.reset_refresh_counts()
+
+
+def test_stale_child_refreshed_from_its_context(refresh_counts):
+    driver = Driver()
+    table = FreshWebElement(Element(driver, 'table'), 'id', 'table')
+    rows = table.find_elements('xpath', './tr')
+    assert rows[2].text == 'row 2'
+    table._elem.children[2].stale = True
+    assert rows[2].text == 'row 2'
+    # the row was found again from the table, not from the document
+    assert table._elem.lookups == [('xpath', './tr'), ('xpath', './tr')]
+    assert driver.lookups == []
+    assert webelement.get_refresh_counts() == {('xpath', './tr'): 1}
+
+
+def test_stale_context_refreshed_first(refresh_counts):
+    driver = Driver()
+    table = FreshWebElement(Element(driver, 'table'), 'id', 'table')
+    row = table.find_element('xpath', './tr')
+    row._elem.stale = True
+    table._elem.stale = True
+    assert row.text == 'row 0'
+    assert driver.lookups == [('id', 'table')]
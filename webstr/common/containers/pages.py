@@ -17,12 +17,21 @@
 # limitations under the License.
 
 
+from contextlib import contextmanager
+
+from selenium.common import exceptions as selenium_ex
+
+from webstr.core import config
 from webstr.core import WebstrPage, DynamicWebstrPage
+from webstr.core.cache import get_page_state
+from webstr.core.model import ROOT_KIND
+from webstr.selenium import scripts
+from webstr.selenium.ui import exceptions as ui_exceptions
+from webstr.selenium.ui.support import WebDriverWait, ELEMENT_POLL_FREQUENCY
 
 import webstr.common.containers.models as m_containers
 
 
-
 class ContainerIterator(object):
     """
     Iterator class for container.
@@ -32,7 +41,8 @@ class ContainerIterator(object):
         """
         Arguments:
             driver: selenium web driver
-            row_element_list: rows class attribute of container class
+            row_element_list: rows of the container (any sized object,
+                              e.g. the container itself)
             row_class: class representing single line or item
         """
         self._driver = driver
@@ -62,6 +72,56 @@ class ContainerIterator(object):
         return iter(range(1, len(row_element_list) + 1))
 
 
+class RowRecord(object):
+    """
+    Lightweight snapshot of a single container row.
+
+    Values of the row model page elements read by the snapshot are available
+    as attributes, any other attribute is delegated to the live row page
+    object, which is created only when needed.
+
+    Attributes:
+        index: 1 based position of the row in the container
+        text: text of the row
+        fields: dictionary of field values (see :attr:`ContainerBase._snapshot_fields`)
+    """
+
+    def __init__(self, container, index, text, fields):
+        """
+        Parameters:
+            container: <ContainerBase> instance the row belongs to
+            index: 1 based position of the row
+            text: text of the row
+            fields: dictionary of field values
+        """
+        self._container = container
+        self._live = None
+        self.index = index
+        self.text = text
+        self.fields = fields
+
+    @property
+    def live(self):
+        """
+        Row page object (instance of the container `_row_class`).
+        """
+        if self._live is None:
+            self._live = self._container._row_class(
+                self._container.driver, self.index)
+        return self._live
+
+    def __getattr__(self, name):
+        fields = self.__dict__.get('fields')
+        if fields is None or name.startswith('__'):
+            raise AttributeError(name)
+        if name in fields:
+            return fields[name]
+        return getattr(self.live, name)
+
+    def __repr__(self):
+        return '<%s %d: %r>' % (type(self).__name__, self.index, self.text)
+
+
 class ContainerRowBase(DynamicWebstrPage):
     """
     A single item or line.
@@ -76,21 +136,276 @@ class ContainerBase(WebstrPage):
     Class attributes:
         _model: related WebstrModel class
         _row_class: class representing single line or item
+        _snapshot_fields: names of the row model page elements read
+                          by :meth:`snapshot`; None - all static page
+                          elements of the row model
+        _snapshot_iteration: iterate over :class:`RowRecord` snapshots
+                             instead of row page objects;
+                             None - use `config.CONTAINER_SNAPSHOT`
+        _key_field: name of the row model page element identifying rows
+                    (e.g. host name); None - rows are identified by their text
+        _may_be_empty: the container may have no rows, so `len()` and
+                       iteration don't wait up to `_timeout` for the first row
+
+    Rows can be looked up by their key via the keyed index, e.g.
+    ``hosts['node-1']``, ``'node-1' in hosts`` or ``hosts.get('node-1')``.
     """
     _model = m_containers.ContainerBaseModel
     _row_class = ContainerRowBase
     _iter_class = ContainerIterator
+    _record_class = RowRecord
+    _snapshot_fields = None
+    _snapshot_iteration = None
+    _snapshot_depth = 0
+    _snapshot_cache = None
+    _snapshot_count = None
+    _key_field = None
+    _may_be_empty = False
+    _row_index = None
+    _row_index_state = None
+
+    def _snapshot_field_locators(self):
+        """
+        Return list of [name, by, value] field locators relative to the row.
+        """
+        row_model = self._row_class._model
+        fields = []
+        for spec in row_model._elements:
+            if spec.kind == ROOT_KIND or spec.dynamic or spec.as_list:
+                continue
+            if self._snapshot_fields is not None and spec.name != self._key_field \
+                    and spec.name not in self._snapshot_fields:
+                continue
+            fields.append([spec.name, spec.by, spec.locator])
+        return fields
+
+    def snapshot(self, offset=0, limit=None):
+        """
+        Read rows of the container along with values of their fields
+        via one script call.
+
+        Within :meth:`snapshot_scope` the complete snapshot is read only
+        once and shared by all the callers.
+
+        Parameters:
+            offset: index of the first row to read (0 based)
+            limit: maximal number of rows to read; None - all rows
+
+        Returns:
+            list of :class:`RowRecord` instances
+        """
+        complete = not offset and limit is None
+        if complete and self._snapshot_cache is not None:
+            return self._snapshot_cache
+        count, records = self._read_rows(offset, limit)
+        if self._snapshot_depth:
+            self._snapshot_count = count
+            if complete:
+                self._snapshot_cache = records
+        return records
+
+    def _rows_chain(self):
+        """
+        Return locator chain of the container rows.
+
+        Throws: TypeError - the chain can't be determined (the rows are not
+                            a page element or the model root is not a root
+                            page element)
+        """
+        chain = self._model._element_chain('rows')
+        if chain is None:
+            raise TypeError("%s: locator chain of rows is not available "
+                            "(rows are not initialized or the model root is "
+                            "not a root page element)" % self)
+        return chain[0]
+
+    def _read_rows(self, offset, limit):
+        """
+        Read rows of the container via one script call.
+
+        Returns:
+            (total number of rows, list of :class:`RowRecord` instances)
+        """
+        result = self.driver.execute_script(
+            scripts.CONTAINER_SNAPSHOT, self._rows_chain(),
+            self._snapshot_field_locators(), offset, limit)
+        records = [self._record_class(self, row['index'], row['text'], row['fields'])
+                   for row in result['rows']]
+        return result['count'], records
+
+    @contextmanager
+    def snapshot_scope(self):
+        """
+        Context manager sharing one snapshot (and row count) of the container
+        rows for its lifetime. Scopes can be nested.
+
+        Usage::
+            with container.snapshot_scope():
+                names = [row.name for row in container]
+                states = [row.state for row in container]
+        """
+        self._snapshot_depth += 1
+        try:
+            yield self
+        finally:
+            self._snapshot_depth -= 1
+            if not self._snapshot_depth:
+                self._snapshot_cache = None
+                self._snapshot_count = None
+
+    def _row_key(self, record):
+        """
+        Return key of the row record (see `_key_field`).
+        """
+        if self._key_field is None:
+            return record.text
+        return record.fields.get(self._key_field)
+
+    def row_index(self):
+        """
+        Return the keyed index of the container rows.
+
+        The index is built from one snapshot of the rows and reused until
+        the DOM of the page changes (checked via the mutation counter,
+        see :func:`webstr.core.cache.get_page_state`). If several rows share
+        the same key, the first one is indexed.
+
+        Returns:
+            dictionary mapping row keys to :class:`RowRecord` instances
+        """
+        state = get_page_state(self.driver)
+        if self._row_index is None or state is None \
+                or state != self._row_index_state:
+            index = {}
+            for record in self.snapshot():
+                index.setdefault(self._row_key(record), record)
+            self._row_index = index
+            self._row_index_state = state
+        return self._row_index
+
+    def get(self, key, default=None):
+        """
+        Return row record with the given key.
+
+        Parameters:
+            key: row key (see `_key_field`)
+            default: value returned if there is no such row
+
+        Returns:
+            :class:`RowRecord` instance or `default`
+        """
+        return self.row_index().get(key, default)
+
+    def __getitem__(self, key):
+        """
+        Return row record with the given key.
+
+        Throws:
+            NoSuchRowException: there is no row with the key
+        """
+        try:
+            return self.row_index()[key]
+        except KeyError:
+            raise ui_exceptions.NoSuchRowException(key)
+
+    def __contains__(self, key):
+        return key in self.row_index()
 
     def __iter__(self):
         """
         Create new iterator object for this container.
         """
-        row_element_list =  self._model.rows
-        return self._iter_class(self.driver, row_element_list, row_class=self._row_class)
+        snapshot_iteration = self._snapshot_iteration
+        if snapshot_iteration is None:
+            snapshot_iteration = config.CONTAINER_SNAPSHOT
+        if snapshot_iteration or self._snapshot_depth:
+            return iter(self.snapshot())
+        # the iterator needs just the number of rows, which is counted
+        # in the browser, waiting for the first row (see __len__)
+        return self._iter_class(self.driver, self, row_class=self._row_class)
+
+    def count(self, **criteria):
+        """
+        Count rows of the container via one script call (no row elements
+        are transferred from the browser).
+
+        Within :meth:`snapshot_scope` the result is shared with iteration.
+
+        Usage::
+            hosts.count()
+            hosts.count(state='up')
+
+        Parameters:
+            criteria: expected values of the row model page elements
+                      (see :attr:`RowRecord.fields`); `text` matches text
+                      of the whole row
+
+        Returns:
+            number of (matching) rows
+        """
+        cached = self._snapshot_cache
+        if cached is not None and (not cached or all(
+                name == 'text' or name in cached[0].fields for name in criteria)):
+            return len([record for record in cached
+                        if self._matches(record, criteria)])
+        if not criteria and self._snapshot_count is not None:
+            return self._snapshot_count
+        if not criteria and 'rows' in type(self._model)._element_index \
+                and self._model._element_chain('rows') is None:
+            # rows under a custom model root, count the row elements
+            return len(self._model.rows)
+        row_model = self._row_class._model
+        locators = []
+        for name, expected in sorted(criteria.items()):
+            if name == 'text':
+                locators.append([None, None, expected])
+                continue
+            spec = row_model._element_index.get(name)
+            if spec is None or spec.kind == ROOT_KIND:
+                raise AttributeError(
+                    "%s has no page element %s" % (row_model.__name__, name))
+            locators.append([spec.by, spec.locator, expected])
+        count = self.driver.execute_script(
+            scripts.CONTAINER_COUNT, self._rows_chain(), locators)
+        if not criteria and self._snapshot_depth:
+            self._snapshot_count = count
+        return count
+
+    @staticmethod
+    def _matches(record, criteria):
+        """
+        Check whether the row record matches the criteria (see :meth:`count`).
+        """
+        for name, expected in criteria.items():
+            value = record.text if name == 'text' else record.fields.get(name)
+            if value != expected:
+                return False
+        return True
+
+    def is_empty(self):
+        """
+        Check for rows without waiting for them (see :meth:`__len__`).
+
+        Returns:
+            True if the container has no rows
+        """
+        return not self.count()
 
     def __len__(self):
         """
+        Count the rows (see :meth:`count`). If there are no rows, the count
+        is polled up to `_timeout` until the first row appears (like the
+        lookup of the rows via the implicit wait), unless `_may_be_empty`
+        is set or the count is shared within :meth:`snapshot_scope`.
+
         Returns:
-            number of rows
+            number of rows (also used for truth value testing)
         """
-        return len(self._model.rows)
+        count = self.count()
+        if count or self._may_be_empty or self._snapshot_depth or not self._timeout:
+            return count
+        wait = WebDriverWait(None, self._timeout, poll_frequency=ELEMENT_POLL_FREQUENCY)
+        try:
+            return wait.until(lambda _: self.count())
+        except selenium_ex.TimeoutException:
+            return 0
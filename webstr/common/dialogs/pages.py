@@ -19,10 +19,14 @@ Author: pnovotny, ltrilety, mkudlej
 # limitations under the License.
 
 
+from selenium.common.exceptions import TimeoutException
+
 from webstr.core import WebstrPage
 from webstr.common import timeouts
 from webstr.common.dialogs import models as m_dialogs
-from webstr.selenium.ui.support import WebDriverWait
+from webstr.selenium.ui.exceptions import ElementDoesNotExistError
+from webstr.selenium.ui.support import (
+    WebDriverWait, page_poll_scheduler, wait_for_disappearance)
 
 
 class ModalDlg(WebstrPage):
@@ -35,14 +39,33 @@ class ModalDlg(WebstrPage):
     def wait_to_disappear(self, timeout=timeouts.MODAL_DIALOG_CLOSE):
         """
         Wait `timeout` seconds until the dialog disappears.
+        The wait is event driven (see
+        :func:`webstr.selenium.ui.support.wait_for_disappearance`), polling
+        is used only if asynchronous scripts are not available.
 
         Parameters:
             timeout - timeout in seconds
         """
-        WebDriverWait(self, timeout).until_not(
-          lambda self: self._model.background_veil,
-          "%s: timeout (%d seconds) expired. "
-          "Dialog window is still present." % (self.__class__.__name__, timeout))
+        message = ("%s: timeout (%d seconds) expired. "
+                   "Dialog window is still present." % (self.__class__.__name__, timeout))
+        veil_chain = self._model._element_chain('background_veil')
+        if veil_chain is not None:
+            disappeared = wait_for_disappearance(self.driver, [veil_chain], timeout)
+            if disappeared:
+                return
+            if disappeared is False:
+                raise TimeoutException(message)
+        model = self._model
+        lookup_timeout = model._lookup_timeout
+        if lookup_timeout is not None:
+            # explicit waits: look the veil up once per poll
+            model._lookup_timeout = 0
+        try:
+            WebDriverWait(self, timeout, scheduler=page_poll_scheduler(),
+                          ignored_exceptions=[ElementDoesNotExistError]).until_not(
+              lambda self: self._model.background_veil, message)
+        finally:
+            model._lookup_timeout = lookup_timeout
 
 
 class CloseDlg(ModalDlg):
@@ -0,0 +1,115 @@
+"""
+Bulk operations over form widgets of a page model.
+
+Filling a form field by field costs several round trips per field (lookup,
+`clear`, `send_keys`, state checks). :func:`fill` sets values of all form
+widgets of a page model via one script call instead.
+
+Usage::
+    fill(wizard_model, {'name': 'vm-01', 'memory': '2048', 'start': True})
+
+    # fields which need real keystrokes are set via their page element helpers
+    fill(wizard_model, values, keystrokes=['description'])
+"""
+
+# Copyright 2016 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import logging
+
+from selenium.common import exceptions as selenium_ex
+
+from webstr.selenium import scripts
+from webstr.selenium.ui import exceptions as ui_exceptions
+
+
+LOGGER = logging.getLogger(__name__)
+
+# order in which groups of form widgets are filled
+FORM_KINDS = ('text', 'select', 'combobox', 'checkbox', 'radio')
+
+
+def _form_entries(model, values, keystrokes):
+    """
+    Split the values into scripted entries (grouped by the widget kind)
+    and fields set via page element helpers.
+
+    Returns:
+        (entries, fallback) tuple; entries is a list of
+        [name, locator chain, kind, value] lists, fallback is a list
+        of (name, value) pairs
+    """
+    groups = dict((kind, []) for kind in FORM_KINDS)
+    fallback = []
+    index = type(model)._element_index
+    for name, value in values.items():
+        spec = index.get(name)
+        if spec is None:
+            raise AttributeError(
+                "%s has no page element %s" % (type(model).__name__, name))
+        if name in keystrokes or spec.kind not in groups:
+            fallback.append((name, value))
+            continue
+        element_chain = model._element_chain(name)
+        if element_chain is None:
+            # e.g. the model root is a property, fill the field one by one
+            fallback.append((name, value))
+            continue
+        chain, _ = element_chain
+        groups[spec.kind].append([name, chain, spec.kind, value])
+    entries = []
+    for kind in FORM_KINDS:
+        entries.extend(sorted(groups[kind]))
+    return entries, fallback
+
+
+def fill(model, values, keystrokes=()):
+    """
+    Fill form widgets of the page model.
+
+    Text inputs, select boxes, combo boxes, checkboxes and radio buttons
+    (see `kind` of the model element registry entries,
+    :data:`webstr.core.model.ElementSpec`) are resolved
+    and filled via one script call, grouped by their kind in the order
+    given by :data:`FORM_KINDS`. The script fires the events a real user
+    interaction would fire. Other page elements, fields whose locator chain
+    can't be determined (e.g. the model root is a property) and fields listed
+    in `keystrokes` are set one by one via their page element helpers
+    (``model.field.value = value``) after the scripted ones, i.e. using
+    real keystrokes and clicks.
+
+    Parameters:
+        model: <*WebstrModel> instance
+        values: dictionary mapping page element names to values
+        keystrokes: names of fields which must be filled via real keystrokes
+
+    Throws:
+        ElementDoesNotExistError: some of the form widgets were not found
+        NoSuchElementException: select box has no option with the value
+    """
+    entries, fallback = _form_entries(model, values, keystrokes)
+    if entries:
+        LOGGER.debug("Filling %d fields of %s via script", len(entries), model)
+        errors = model._driver.execute_script(scripts.FORM_FILL, entries) or {}
+        missing = sorted(name for name, reason in errors.items()
+                         if reason == 'missing')
+        if missing:
+            raise ui_exceptions.ElementDoesNotExistError(missing)
+        if errors:
+            raise selenium_ex.NoSuchElementException(
+                "Cannot locate option with value for: %s" % ', '.join(sorted(errors)))
+    for name, value in sorted(fallback):
+        LOGGER.debug("Filling field %s of %s via keystrokes", name, model)
+        getattr(model, name).value = value
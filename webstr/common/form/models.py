@@ -28,6 +28,7 @@ class Checkbox(PageElement):
     Page element for a checkbox widget.
     """
     _helper = forms.Checkbox
+    _form_kind = 'checkbox'
 
 
 class BaseRadio(BaseWebElementHelper):
@@ -61,6 +62,7 @@ class Radio(PageElement):
     Page element for a radio widget.
     """
     _helper = BaseRadio
+    _form_kind = 'radio'
 
 
 class Button(PageElement):
@@ -74,6 +76,7 @@ class Select(PageElement):
     Page element for a select box widget.
     """
     _helper = forms.Select
+    _form_kind = 'select'
 
 
 class BaseTextInput(BaseWebElementHelper):
@@ -105,6 +108,7 @@ class TextInput(PageElement):
     Page element for a text input widget.
     """
     _helper = BaseTextInput
+    _form_kind = 'text'
 
 PasswordInput = TextInput
 
@@ -150,6 +154,7 @@ class ComboBox(PageElement):
     Page element for a combo-box widget.
     """
     _helper = BaseComboBox
+    _form_kind = 'combobox'
 
 
 class DynamicCheckbox(Checkbox):
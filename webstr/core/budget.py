@@ -0,0 +1,181 @@
+"""
+WebDriver round trip budget of test cases.
+
+When `config.TEST_BUDGET` is set, :class:`webstr.core.test.UITestCase`
+collects per test case the number of WebDriver round trips, total wire time,
+number of stale element refreshes and time spent by implicit waits for
+missing elements (see :mod:`webstr.selenium.instrumentation`). At the end
+of the run the statistics are compared to a baseline file
+(`config.TEST_BUDGET_BASELINE`) and test cases whose number of round trips
+grew by more than `config.TEST_BUDGET_THRESHOLD` are reported, so page object
+changes silently multiplying element lookups are caught early.
+
+The statistics of the run can be stored (`config.TEST_BUDGET_REPORT`)
+and used as the baseline of the next runs.
+"""
+
+# Copyright 2016 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import atexit
+import collections
+import json
+import logging
+import os
+import threading
+
+from webstr.core import config
+from webstr.selenium import instrumentation
+
+
+LOGGER = logging.getLogger(__name__)
+
+Regression = collections.namedtuple(
+    'Regression', ['test_id', 'baseline', 'current', 'ratio'])
+
+
+class BudgetReport(object):
+    """
+    Round trip statistics of test cases compared to a baseline.
+    """
+
+    def __init__(self, baseline=None, threshold=None):
+        """
+        Parameters:
+            baseline: JSON file with statistics of a previous run;
+                      None - no comparison
+            threshold: allowed relative growth of the number of round trips
+                       (e.g. 0.2 for 20 %); None - `config.TEST_BUDGET_THRESHOLD`
+        """
+        self.threshold = config.TEST_BUDGET_THRESHOLD if threshold is None \
+            else threshold
+        self.baseline = {}
+        if baseline and os.path.exists(baseline):
+            with open(baseline) as fileh:
+                self.baseline = json.load(fileh)
+        self.results = {}
+        self._lock = threading.Lock()
+
+    def record(self, test_id, stats):
+        """
+        Record statistics of a test case run.
+
+        Parameters:
+            test_id (str): test case identifier
+            stats: dictionary returned by
+                   :meth:`webstr.selenium.instrumentation.ThreadStatsSink.stop`
+        """
+        with self._lock:
+            self.results[test_id] = stats
+
+    def regressions(self):
+        """
+        Return test cases whose number of round trips exceeds the baseline
+        by more than the threshold.
+
+        Returns:
+            list of :data:`Regression` tuples, the worst first
+        """
+        found = []
+        with self._lock:
+            for test_id, stats in self.results.items():
+                known = self.baseline.get(test_id)
+                if not known:
+                    continue
+                baseline = known['round_trips']
+                current = stats['round_trips']
+                if current > baseline * (1 + self.threshold):
+                    found.append(Regression(test_id, baseline, current,
+                                            float(current) / max(baseline, 1)))
+        return sorted(found, key=lambda regression: regression.ratio, reverse=True)
+
+    def format(self):
+        """
+        Return the report as text.
+        """
+        lines = ["%-60s %8s %10s %8s %10s" % (
+            'test', 'trips', 'wire [s]', 'stale', 'wait [s]')]
+        with self._lock:
+            for test_id, stats in sorted(self.results.items()):
+                lines.append("%-60s %8d %10.2f %8d %10.2f" % (
+                    test_id, stats['round_trips'], stats['wire_time'],
+                    stats['stale_refreshes'], stats['implicit_wait_time']))
+        regressions = self.regressions()
+        if regressions:
+            lines.append("Round trip regressions (threshold %d %%):"
+                         % (self.threshold * 100))
+            for regression in regressions:
+                lines.append("  %s: %d -> %d (x%.2f)" % regression)
+        return '\n'.join(lines)
+
+    def save(self, path):
+        """
+        Store statistics of this run into a JSON file (usable as a baseline).
+        """
+        with self._lock:
+            with open(path, 'w') as fileh:
+                json.dump(self.results, fileh, indent=2, sort_keys=True)
+
+    def emit(self):
+        """
+        Log the report and store the statistics into
+        `config.TEST_BUDGET_REPORT` (if set).
+        """
+        if not self.results:
+            return
+        level = logging.WARNING if self.regressions() else logging.INFO
+        LOGGER.log(level, "WebDriver round trip budget:\n%s", self.format())
+        if config.TEST_BUDGET_REPORT:
+            self.save(config.TEST_BUDGET_REPORT)
+
+
+_SINK = None
+_REPORT = None
+_LOCK = threading.Lock()
+
+
+def get_report():
+    """
+    Return the report of the current run; the report is created (and its
+    emission at exit registered) on the first call.
+    """
+    global _SINK, _REPORT
+    with _LOCK:
+        if _REPORT is None:
+            _SINK = instrumentation.ThreadStatsSink()
+            instrumentation.enable(_SINK)
+            _REPORT = BudgetReport(config.TEST_BUDGET_BASELINE)
+            atexit.register(_REPORT.emit)
+        return _REPORT
+
+
+def start_test():
+    """
+    Start collecting statistics of a test case run in the current thread.
+    """
+    get_report()
+    _SINK.start()
+
+
+def stop_test(test_id):
+    """
+    Stop collecting statistics of a test case and record them in the report.
+
+    Parameters:
+        test_id (str): test case identifier
+    """
+    stats = _SINK.stop() if _SINK is not None else None
+    if stats is not None:
+        get_report().record(test_id, stats)
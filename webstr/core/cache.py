@@ -0,0 +1,170 @@
+"""
+Per page model cache of resolved page elements.
+
+The cache is invalidated when:
+
+* the DOM structure of the current document changes (detected via a cheap
+  in-page mutation counter, see :data:`webstr.selenium.scripts.MUTATION_COUNTER`,
+  read on every outermost lookup, or once per lookup scope),
+* the driver navigates to another page (`get`, `back`, `forward`, `refresh`),
+* a stale element is detected by :class:`FreshWebElement`.
+"""
+
+# Copyright 2016 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from contextlib import contextmanager
+import logging
+
+from selenium.common import exceptions as selenium_ex
+
+from webstr.selenium import scripts
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_page_state(driver):
+    """
+    Return current state of the page loaded in the driver.
+
+    The state is composed of the driver cache epoch (bumped on navigation
+    and on stale element detection) and of the in-page mutation counter.
+
+    Parameters:
+        driver: webdriver instance
+
+    Returns:
+        hashable state or None if the state could not be determined
+    """
+    try:
+        counter = driver.execute_script(scripts.MUTATION_COUNTER)
+    except selenium_ex.WebDriverException as ex:
+        LOGGER.debug("Unable to read mutation counter: %s", ex)
+        return None
+    if not counter:
+        return None
+    return (getattr(driver, 'cache_epoch', None), tuple(counter))
+
+
+def _empty_list(value):
+    """Return whether the value is an empty list of elements."""
+    return isinstance(value, list) and not value
+
+
+class ElementCache(object):
+    """
+    Cache of resolved page elements of a single page model instance.
+
+    The validity of the whole cache is checked via one `execute_script`
+    call before every outermost lookup, so changes of the page done by
+    the application itself (e.g. asynchronous requests or timers) are seen
+    by polling waits. Inside of a lookup scope (see :meth:`scope`), the page
+    state is read only on the first lookup of the scope.
+
+    Changes of the driver cache epoch (navigation, stale element detection)
+    always drop the cached elements. Empty lists of elements are never
+    cached, so waits for the first element of a list see it.
+
+    Attributes:
+        hits: number of lookups served from the cache
+        misses: number of lookups which had to query the driver
+    """
+
+    def __init__(self, driver):
+        """
+        Parameters:
+            driver: webdriver instance
+        """
+        self._driver = driver
+        self._elements = {}
+        self._state = None
+        self._checked = None
+        self._depth = 0
+        self._scope_depth = 0
+        self._scope_checked = False
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._elements)
+
+    def clear(self):
+        """Drop all cached elements."""
+        self._elements.clear()
+        self._state = None
+        self._checked = None
+
+    @contextmanager
+    def scope(self):
+        """
+        Context manager checking the page state only once for its lifetime.
+        Scopes can be nested.
+        """
+        self._scope_depth += 1
+        try:
+            yield self
+        finally:
+            self._scope_depth -= 1
+            if not self._scope_depth:
+                self._scope_checked = False
+
+    def _is_checked(self):
+        """
+        Return whether the page state checked in the current lookup scope
+        still applies.
+        """
+        if self._state is None or not self._scope_checked:
+            return False
+        return getattr(self._driver, 'cache_epoch', None) == self._checked
+
+    def _validate(self):
+        """Drop all cached elements if the page state has changed."""
+        if self._is_checked():
+            return
+        state = get_page_state(self._driver)
+        if state is None or state != self._state:
+            self._elements.clear()
+        self._state = state
+        self._checked = getattr(self._driver, 'cache_epoch', None)
+        self._scope_checked = self._scope_depth > 0
+
+    def get(self, key, resolver):
+        """
+        Return cached value for given key or resolve it and cache it.
+
+        Parameters:
+            key: hashable cache key
+            resolver: callable without arguments returning the value
+
+        Returns:
+            cached or freshly resolved value
+        """
+        if self._depth == 0:
+            self._validate()
+        self._depth += 1
+        try:
+            try:
+                value = self._elements[key]
+            except KeyError:
+                self.misses += 1
+                value = resolver()
+                if self._state is not None and not _empty_list(value):
+                    self._elements[key] = value
+                return value
+            self.hits += 1
+            return value
+        finally:
+            self._depth -= 1
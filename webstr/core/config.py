@@ -34,6 +34,43 @@ SELENIUM_SERVER = None
 SELENIUM_PORT = 4444
 BROWSER_WIDTH = 1280
 BROWSER_HEIGHT = 1024
+# cache resolved page elements in page model instances by default
+ELEMENT_CACHE = False
+# check required elements of page objects via one script call
+BATCH_VALIDATION = False
+# use explicit waits for page elements instead of the implicit wait
+EXPLICIT_WAIT = False
+# reuse warm browser sessions across test cases (see webstr.selenium.driver.DriverPool)
+DRIVER_POOL = False
+DRIVER_POOL_SIZE = 1
+DRIVER_MAX_AGE = None
+DRIVER_MAX_USES = None
+# number of parallel workers and file with historical test durations
+# (see webstr.core.parallel)
+PARALLEL_WORKERS = 1
+TEST_DURATIONS_FILE = None
+# number of browser sessions booted ahead of time in background
+PRESPAWN_DRIVERS = 0
+# maximize browser window at test set up (window size is set at start up)
+MAXIMIZE_WINDOW = True
+# iterate containers over rows read by one script call (see
+# webstr.common.containers.pages.ContainerBase.snapshot)
+CONTAINER_SNAPSHOT = False
+# match and select options of select boxes via one script call
+# (see webstr.selenium.ui.forms.Select)
+SCRIPTED_SELECT = False
+# collect WebDriver round trip statistics per test case and compare them
+# to a baseline at the end of the run (see webstr.core.budget)
+TEST_BUDGET = False
+TEST_BUDGET_BASELINE = None
+TEST_BUDGET_REPORT = None
+TEST_BUDGET_THRESHOLD = 0.2
+# look up page elements via locators merged with their model root at class
+# creation (see webstr.core.model.WebstrModelMeta)
+COMPILED_LOCATORS = False
+# poll waits of page objects with short intervals first (see
+# webstr.selenium.ui.support.page_poll_scheduler)
+FAST_FIRST_POLL = False
 
 
 def update_value(key_name, value, force=False):
@@ -0,0 +1,552 @@
+"""
+Helpers for composing page element locators.
+
+A locator is a `(by, value)` tuple, where `by` is a locator type
+(see :class:`selenium.webdriver.common.by.By`) and `value` is the locator
+value. Locators of nested elements (e.g. an element looked up relatively
+to a root element) can be often merged into a single locator, so that
+the element is found via one driver call instead of one call per level.
+
+:func:`compile_chain` merges whole chains at model class creation (see
+:class:`webstr.core.model.WebstrModelMeta`), preferring CSS selectors
+when the chain can be expressed by them.
+
+Locators of dynamic page elements are :class:`LocatorTemplate` instances,
+parsed once and rendered for every model instance identifier.
+"""
+
+# Copyright 2016 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import collections
+import re
+import threading
+
+from selenium.webdriver.common.by import By
+
+
+# XPath predicates expressible in CSS: (pattern, CSS format) pairs; the format
+# gets attribute name and value
+_LITERAL = r'''(?:"([^"]*)"|'([^']*)')'''
+_XPATH_PREDICATES = (
+    (re.compile(r'\[\s*@([\w-]+)\s*\]'), '[%s]'),
+    (re.compile(r'\[\s*@([\w-]+)\s*=\s*%s\s*\]' % _LITERAL), '[%s=%s]'),
+    (re.compile(r'\[\s*contains\(\s*@([\w-]+)\s*,\s*%s\s*\)\s*\]' % _LITERAL),
+     '[%s*=%s]'),
+    (re.compile(r'\[\s*starts-with\(\s*@([\w-]+)\s*,\s*%s\s*\)\s*\]' % _LITERAL),
+     '[%s^=%s]'),
+    (re.compile(r'''\[\s*contains\(\s*concat\(\s*(?:" "|' ')\s*,\s*@(class)\s*,'''
+                r'''\s*(?:" "|' ')\s*\)\s*,\s*(?:" ([^" ]+) "|' ([^' ]+) ')\s*\)\s*\]'''),
+     '[%s~=%s]'),
+    )
+_XPATH_STEP = re.compile(r'(//|/)(\*|[A-Za-z_][\w-]*)')
+_CSS_IDENTIFIER = re.compile(r'^-?[A-Za-z_][\w-]*$')
+_CSS_ID = re.compile(r'''^(?:#-?[A-Za-z_][\w-]*|\*?\[id=%s\])$''' % _LITERAL)
+
+# maximal number of rendered locators cached by a locator template
+TEMPLATE_CACHE_SIZE = 256
+# conversions supported in locator templates
+_TEMPLATE_CONVERSIONS = 'sdi'
+
+
+def _has_top_level(expression, char):
+    """
+    Return whether the character is present in the expression outside
+    of string literals, brackets and parentheses.
+
+    Parameters:
+        expression (str): XPath or CSS expression
+        char (str): single character to look for
+    """
+    depth = 0
+    quote = None
+    for current in expression:
+        if quote:
+            if current == quote:
+                quote = None
+        elif current in '"\'':
+            quote = current
+        elif current in '([':
+            depth += 1
+        elif current in ')]':
+            depth -= 1
+        elif current == char and depth == 0:
+            return True
+    return False
+
+
+def _first_xpath(expression):
+    """
+    Return XPath expression selecting only the first node matched
+    by the expression, so that nodes relative to it are looked up inside
+    of the same element as `find_element` of the expression would return.
+    """
+    if expression.startswith('(') and expression.endswith(')[1]') \
+            and _matching_parenthesis(expression) == len(expression) - 4:
+        return expression
+    return '(%s)[1]' % expression
+
+
+def _matching_parenthesis(expression):
+    """
+    Return index of the parenthesis closing the one the expression starts
+    with (string literals are skipped); None if it is not closed.
+    """
+    depth = 0
+    quote = None
+    for index, current in enumerate(expression):
+        if quote:
+            if current == quote:
+                quote = None
+        elif current in '"\'':
+            quote = current
+        elif current == '(':
+            depth += 1
+        elif current == ')':
+            depth -= 1
+            if not depth:
+                return index
+    return None
+
+
+def _unique_css(selector):
+    """
+    Return whether the CSS selector matches an element by its id only,
+    i.e. at most one element of a valid page.
+    """
+    return bool(_CSS_ID.match(selector))
+
+
+def _join_xpath(parent, child):
+    """
+    Merge parent and relative child XPath expressions. The child is looked
+    up only inside of the first element matched by the parent, like when
+    the expressions are resolved level by level.
+
+    Returns:
+        merged XPath expression or None if the child is not relative
+    """
+    if _has_top_level(child, '|'):
+        return None
+    if child.startswith('/') or (child.startswith('(') and not child.startswith('(./')):
+        # absolute expression, it doesn't depend on the parent at all
+        return None
+    parent = _first_xpath(parent)
+    if child == '.':
+        return parent
+    if child.startswith('./'):
+        return parent + child[1:]
+    if child.startswith('(./'):
+        return '(' + parent + child[2:]
+    return parent + '/' + child
+
+
+def _join_css(parent, child):
+    """
+    Merge parent and child CSS selectors. CSS can't limit the parent
+    to its first match, so the selectors are merged only when the parent
+    selects an element by its id.
+
+    Returns:
+        merged CSS selector or None if the selectors can't be merged
+    """
+    if not _unique_css(parent) or _has_top_level(child, ','):
+        return None
+    return '%s %s' % (parent, child)
+
+
+def join_locators(parent, child):
+    """
+    Merge locator of a child element with locator of its parent element,
+    so that the child can be found directly via the driver.
+
+    Parameters:
+        parent: (by, value) locator of the parent element
+        child: (by, value) locator of the child element,
+               relative to the parent element
+
+    Returns:
+        merged (by, value) locator or None if the locators can't be merged
+    """
+    parent_by, parent_value = parent
+    child_by, child_value = child
+    if parent_by != child_by:
+        return None
+    if child_by == By.XPATH:
+        value = _join_xpath(parent_value, child_value)
+    elif child_by == By.CSS_SELECTOR:
+        value = _join_css(parent_value, child_value)
+    else:
+        value = None
+    if value is None:
+        return None
+    return (child_by, value)
+
+
+def compose_chain(chain):
+    """
+    Merge a chain of nested locators into as few locators as possible.
+
+    Parameters:
+        chain: list of (by, value) locators; the first one is looked up
+               via the driver, each following one relatively
+               to the element found by the previous one
+
+    Returns:
+        list of (by, value) locators
+    """
+    composed = []
+    for locator in chain:
+        if composed:
+            joined = join_locators(composed[-1], locator)
+            if joined is not None:
+                composed[-1] = joined
+                continue
+        composed.append(locator)
+    return composed
+
+
+def _css_string(value):
+    """Return CSS string literal of the value."""
+    return '"%s"' % value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _xpath_to_css(expression):
+    """
+    Convert a simple XPath expression (steps with element names and
+    attribute predicates only) to a CSS selector.
+
+    Returns:
+        (relation, selector) tuple, where relation is 'descendant' or 'child'
+        of the context element, or 'absolute' for expressions starting
+        with '//'; None if the expression is not expressible in CSS
+    """
+    if expression.startswith('.//') or expression.startswith('./'):
+        relation = 'descendant' if expression.startswith('.//') else 'child'
+        expression = expression[1:]
+    elif expression.startswith('//'):
+        relation = 'absolute'
+    else:
+        return None
+    parts = []
+    position = 0
+    while position < len(expression):
+        step = _XPATH_STEP.match(expression, position)
+        if step is None:
+            return None
+        if parts:
+            parts.append(' > ' if step.group(1) == '/' else ' ')
+        position = step.end()
+        if step.group(2) != '*' or not expression.startswith('[', position):
+            parts.append(step.group(2))
+        while position < len(expression) and expression[position] == '[':
+            for pattern, css in _XPATH_PREDICATES:
+                predicate = pattern.match(expression, position)
+                if predicate is not None:
+                    break
+            else:
+                return None
+            groups = predicate.groups()
+            value = [group for group in groups[1:] if group is not None]
+            if not value:
+                parts.append(css % groups[0])
+            elif css == '[%s~=%s]' and _CSS_IDENTIFIER.match(value[0]):
+                parts.append('.' + value[0])
+            else:
+                parts.append(css % (groups[0], _css_string(value[0])))
+            position = predicate.end()
+    return relation, ''.join(parts)
+
+
+def _to_css(locator, first):
+    """
+    Convert a locator of a chain to a CSS selector fragment.
+
+    Parameters:
+        locator: (by, value) locator
+        first: bool; the locator is looked up via the driver
+
+    Returns:
+        CSS selector prefixed by a combinator relating it to the previous
+        locator of the chain; None if the locator can't be expressed in CSS
+    """
+    by, value = locator
+    if by == By.CSS_SELECTOR:
+        return None if _has_top_level(value, ',') else ' ' + value
+    if by == By.ID:
+        return ' [id=%s]' % _css_string(value)
+    if by == By.NAME:
+        return ' [name=%s]' % _css_string(value)
+    if by == By.CLASS_NAME:
+        return ' .' + value if _CSS_IDENTIFIER.match(value) else None
+    if by == By.TAG_NAME:
+        return ' ' + value if _CSS_IDENTIFIER.match(value) else None
+    if by != By.XPATH:
+        return None
+    converted = _xpath_to_css(value)
+    if converted is None:
+        return None
+    relation, selector = converted
+    if relation == 'child':
+        return None if first else ' > ' + selector
+    if relation == 'absolute' and not first:
+        # absolute expression, it doesn't depend on the parent at all
+        return None
+    return ' ' + selector
+
+
+def _xpath_literal(value):
+    """Return XPath string literal of the value; None if not expressible."""
+    if '"' not in value:
+        return '"%s"' % value
+    if "'" not in value:
+        return "'%s'" % value
+    return None
+
+
+def xpath_string(value, quote='"'):
+    """
+    Return XPath expression evaluating to the string value. XPath 1.0 has
+    no escaping in string literals, so a value containing both kinds
+    of quotes is expressed via `concat()`.
+
+    Parameters:
+        value (str): string value
+        quote (str): preferred quote character
+
+    Returns:
+        XPath string literal or `concat()` expression
+    """
+    if quote not in value:
+        return quote + value + quote
+    literal = _xpath_literal(value)
+    if literal is not None:
+        return literal
+    parts = ['"%s"' % part if part else None for part in value.split('"')]
+    pieces = []
+    for index, part in enumerate(parts):
+        if index:
+            pieces.append("'\"'")
+        if part:
+            pieces.append(part)
+    return 'concat(%s)' % ', '.join(pieces)
+
+
+class LocatorTemplate(object):
+    """
+    Locator value of a dynamic page element, interpolated by the identifier
+    of a page model instance (see :class:`webstr.core.model.DynamicPageElement`
+    and :class:`webstr.core.model.NameRootPageElement`).
+
+    The template uses `%s` and `%d` (or `%i`) placeholders and `%%` for
+    a literal percent sign. It is parsed once; rendered locators are cached
+    per identifier (up to :data:`TEMPLATE_CACHE_SIZE` of the recently used
+    ones).
+
+    Values of XPath templates are escaped: a `%s` placeholder inside
+    of a string literal (``'//div[@id="vm_%s"]'``) is rendered so that
+    the literal stays valid whatever quotes the value contains, a `%s`
+    placeholder outside of a literal (``'//a[contains(text(), %s)]'``)
+    is rendered as a string literal (numbers as numbers). Values of CSS
+    templates inside of string literals get quotes and backslashes
+    escaped. Values of other locator types are interpolated as they are.
+
+    Attributes:
+        by: locator type
+        locator: template string
+        arity: number of placeholders
+    """
+
+    def __init__(self, by, locator):
+        """
+        Parameters:
+            by: locator type; see selenium.webdriver.common.by.By
+            locator: template string
+
+        Throws:
+            ValueError - unsupported placeholder in the template
+        """
+        self.by = by
+        self.locator = locator
+        self._tokens = self._parse(locator)
+        self.arity = sum(1 for token in self._tokens if token[0] == 'slot') \
+            + sum(len([part for part in token[2] if isinstance(part, tuple)])
+                  for token in self._tokens if token[0] == 'literal')
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _parse(self, locator):
+        """
+        Split the template into tokens: ('text', text), ('slot', conversion)
+        and ('literal', quote, parts), where parts of a string literal are
+        texts and ('slot', conversion) tuples.
+        """
+        quotes = '"\'' if self.by in (By.XPATH, By.CSS_SELECTOR) else ''
+        tokens = []
+        text = []
+        literal = None
+        position = 0
+        while position < len(locator):
+            char = locator[position]
+            position += 1
+            if char == '%':
+                conversion = locator[position:position + 1]
+                position += 1
+                if conversion == '%':
+                    text.append('%')
+                    continue
+                if not conversion or conversion not in _TEMPLATE_CONVERSIONS:
+                    raise ValueError("unsupported placeholder %%%s in locator "
+                                     "template: %s" % (conversion, locator))
+                if literal is not None:
+                    literal[2].extend([''.join(text), ('slot', conversion)])
+                else:
+                    tokens.extend([('text', ''.join(text)), ('slot', conversion)])
+                text = []
+            elif char in quotes and (literal is None or char == literal[1]):
+                if literal is None:
+                    tokens.append(('text', ''.join(text)))
+                    literal = ('literal', char, [])
+                else:
+                    literal[2].append(''.join(text))
+                    tokens.append(literal)
+                    literal = None
+                text = []
+            else:
+                text.append(char)
+        if literal is not None:
+            raise ValueError("unterminated string literal in locator template: %s"
+                             % locator)
+        tokens.append(('text', ''.join(text)))
+        return [token for token in tokens if token != ('text', '')]
+
+    def _value(self, conversion, value, quoted):
+        """Return a value rendered for a placeholder."""
+        if conversion != 's':
+            return '%d' % value
+        if quoted or self.by != By.XPATH:
+            return '%s' % value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return '%s' % value
+        return xpath_string('%s' % value)
+
+    def _render(self, values):
+        values = iter(values)
+        rendered = []
+        for token in self._tokens:
+            if token[0] == 'text':
+                rendered.append(token[1])
+            elif token[0] == 'slot':
+                rendered.append(self._value(token[1], next(values), False))
+            else:
+                quote = token[1]
+                content = ''.join(
+                    self._value(part[1], next(values), True)
+                    if isinstance(part, tuple) else part for part in token[2])
+                if self.by == By.XPATH:
+                    rendered.append(xpath_string(content, quote))
+                else:
+                    rendered.append(quote + content.replace('\\', '\\\\').replace(
+                        quote, '\\' + quote) + quote)
+        return ''.join(rendered)
+
+    def render(self, values):
+        """
+        Return the locator value interpolated by the values.
+
+        Parameters:
+            values: value of the only placeholder or tuple of values
+                    of all the placeholders
+
+        Throws:
+            TypeError - number of values doesn't match the placeholders
+                        or a value can't be formatted
+        """
+        if not isinstance(values, tuple):
+            values = (values,)
+        try:
+            with self._lock:
+                rendered = self._cache.pop(values)
+                self._cache[values] = rendered
+            return rendered
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable values, they are not cached
+            return self._render_checked(values)
+        rendered = self._render_checked(values)
+        with self._lock:
+            self._cache[values] = rendered
+            if len(self._cache) > TEMPLATE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return rendered
+
+    def _render_checked(self, values):
+        if len(values) != self.arity:
+            raise TypeError("locator template %r expects %d value(s), got %d"
+                            % (self.locator, self.arity, len(values)))
+        return self._render(values)
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (type(self).__name__, self.by, self.locator)
+
+
+def _to_xpath(locator, first):
+    """
+    Convert a simple locator (id, name, class or tag name) to XPath.
+
+    Returns:
+        (by, value) locator; the original locator if it can't be converted
+    """
+    by, value = locator
+    prefix = '//' if first else './/'
+    literal = _xpath_literal(value)
+    if by == By.ID and literal:
+        return (By.XPATH, '%s*[@id=%s]' % (prefix, literal))
+    if by == By.NAME and literal:
+        return (By.XPATH, '%s*[@name=%s]' % (prefix, literal))
+    if by == By.CLASS_NAME and _CSS_IDENTIFIER.match(value):
+        return (By.XPATH, '%s*[contains(concat(" ", @class, " "), " %s ")]'
+                % (prefix, value))
+    if by == By.TAG_NAME and _CSS_IDENTIFIER.match(value):
+        return (By.XPATH, prefix + value)
+    return locator
+
+
+def compile_chain(chain):
+    """
+    Merge a chain of nested locators into as few locators as possible,
+    preferring a single CSS selector when the whole chain is expressible
+    in CSS (simple XPath steps with attribute predicates, ids, names,
+    class and tag names) and all the locators but the last one select
+    an element by its id. Otherwise simple locators are converted to XPath
+    and the chain is merged by :func:`compose_chain`.
+    The compiled chain finds the same elements as the original one
+    resolved level by level.
+
+    Parameters:
+        chain: list of (by, value) locators, see :func:`compose_chain`
+
+    Returns:
+        list of (by, value) locators
+    """
+    if not chain:
+        return []
+    fragments = [_to_css(locator, not index) for index, locator in enumerate(chain)]
+    if None not in fragments \
+            and all(_unique_css(fragment.strip()) for fragment in fragments[:-1]):
+        return [(By.CSS_SELECTOR, ''.join(fragments).strip())]
+    chain = [_to_xpath(locator, not index) for index, locator in enumerate(chain)]
+    return compose_chain(chain)
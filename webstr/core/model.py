@@ -20,11 +20,166 @@ Author: pnovotny, ltrilety
 
 
 from abc import ABCMeta, abstractproperty
-
+import collections
+from contextlib import contextmanager
+
+from selenium.common import exceptions as selenium_ex
+
+from webstr.core import config
+from webstr.core.cache import ElementCache
+from webstr.core.locators import compile_chain, compose_chain, LocatorTemplate
+from webstr.selenium import scripts
+from webstr.selenium.instrumentation import RECORDER
+from webstr.selenium.ui import exceptions as ui_exceptions
+from webstr.selenium.ui.support import wait_for_element, ELEMENT_POLL_FREQUENCY
 from webstr.selenium.webelement import FreshWebElement
 
 
-class WebstrModelBase(object):
+# kinds of page elements in the element registry besides form widget kinds
+# (see `_form_kind` of :class:`PageElement`)
+ROOT_KIND = 'root'
+ELEMENT_KIND = 'element'
+
+ElementSpec = collections.namedtuple(
+    'ElementSpec',
+    ['name', 'kind', 'by', 'locator', 'dynamic', 'helper', 'as_list', 'descriptor'])
+ElementSpec.__doc__ = """
+Entry of the page element registry of a page model class
+(see :class:`WebstrModelMeta`).
+
+Attributes:
+    name (str): attribute name of the page element
+    kind (str): :data:`ROOT_KIND` for root page elements, form widget kind
+                (e.g. 'text', 'select') or :data:`ELEMENT_KIND` otherwise
+    by: locator type
+    locator (str): locator value (template of dynamic page elements)
+    dynamic (bool): the locator is interpolated per model instance
+    helper: helper class wrapping the found element or None
+    as_list (bool): the page element is a list of elements
+    descriptor: the page element descriptor itself
+"""
+
+
+class WebstrModelMeta(ABCMeta):
+    """
+    Metaclass of page models.
+
+    When a page model class is created (or its page elements are replaced),
+    a registry of its page elements (including the inherited ones) is built:
+    `_elements` tuple of :data:`ElementSpec` entries sorted by name
+    and `_element_index` dictionary mapping the names to the entries.
+    Page objects, bulk operations and tooling iterate the registry
+    instead of inspecting the class attributes.
+
+    Moreover, when a page model class is created (or its page elements are
+    replaced), locator chains of all its static page elements, i.e. the
+    locator of the page element preceded by locators of the model root and
+    its parents, are compiled into as few locators as possible (preferably a single CSS
+    selector, see :func:`webstr.core.locators.compile_chain`). Page elements
+    are then looked up via the compiled locators without composing them
+    on every access (see `_compile_locators` of :class:`WebstrModelBase`).
+
+    Chains containing dynamic page elements or dynamic root page elements
+    are not compiled. Instead, arity of their locator templates (see
+    :class:`webstr.core.locators.LocatorTemplate`) is checked against
+    `_name_arity` and `_identifier_arity` of the model class, so that
+    a mismatch is reported when the model is defined, not at the first
+    lookup.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super(WebstrModelMeta, cls).__init__(name, bases, namespace)
+        cls._prepare()
+
+    def __setattr__(cls, name, value):
+        replaced = name in cls.__dict__.get('_element_index', ())
+        super(WebstrModelMeta, cls).__setattr__(name, value)
+        if replaced or name == '_root' or hasattr(value, '_static_chain'):
+            pending = [cls]
+            while pending:
+                klass = pending.pop()
+                klass._prepare()
+                pending.extend(type.__subclasses__(klass))
+
+    def _prepare(cls):
+        """
+        Build the page element registry and compile the locator chains.
+        """
+        descriptors = cls._descriptors()
+        cls._register_elements(descriptors)
+        cls._compile_chains(descriptors)
+
+    def _descriptors(cls):
+        """
+        Return dictionary mapping names to page element descriptors
+        (including root page elements) of the class and its bases.
+        """
+        descriptors = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in klass.__dict__.items():
+                if hasattr(value, '_static_chain'):
+                    descriptors[name] = value
+                else:
+                    descriptors.pop(name, None)
+        return descriptors
+
+    def _register_elements(cls, descriptors):
+        """
+        Build `_elements` and `_element_index` registry of the page elements.
+
+        Parameters:
+            descriptors: dictionary returned by :meth:`_descriptors`
+        """
+        elements = []
+        for name, descriptor in sorted(descriptors.items()):
+            elements.append(ElementSpec(
+                name=name,
+                kind=getattr(descriptor, '_form_kind', None) or descriptor._kind,
+                by=descriptor._by,
+                locator=descriptor._locator,
+                dynamic=bool(descriptor._templates()),
+                helper=getattr(descriptor, '_helper', None),
+                as_list=getattr(descriptor, '_as_list', False),
+                descriptor=descriptor))
+        type.__setattr__(cls, '_elements', tuple(elements))
+        type.__setattr__(cls, '_element_index',
+                         dict((spec.name, spec) for spec in elements))
+
+    def _compile_chains(cls, descriptors):
+        """
+        Compile locator chains of static page elements of the class
+        into `_compiled_chains` dictionary (mapping page element descriptors
+        to tuples of (by, value) locators) and check arity of locator
+        templates of dynamic page elements.
+
+        Parameters:
+            descriptors: dictionary returned by :meth:`_descriptors`
+
+        Throws: TypeError - locator template arity doesn't match the model
+        """
+        for name, descriptor in sorted(descriptors.items()):
+            for template, source in descriptor._templates():
+                arity = cls._name_arity if source == '_name' else cls._identifier_arity
+                if template.arity != arity:
+                    raise TypeError(
+                        "%s.%s: locator template %r has %d placeholder(s), but %s "
+                        "of the model provides %d value(s)" % (
+                            cls.__name__, name, template.locator, template.arity,
+                            source, arity))
+        compiled = {}
+        for descriptor in descriptors.values():
+            chain = descriptor._static_chain(cls)
+            if chain:
+                compiled[descriptor] = tuple(compile_chain(chain))
+        type.__setattr__(cls, '_compiled_chains', compiled)
+
+
+# base class of page models created via the metaclass call, so that
+# the metaclass applies both in python 2 and python 3
+_WebstrModelRoot = WebstrModelMeta('_WebstrModelRoot', (object,), {})
+
+
+class WebstrModelBase(_WebstrModelRoot):
     """
     Base class for page models.
 
@@ -40,8 +195,36 @@ class WebstrModelBase(object):
         _root: root page element of a page model. If defined,
                all other page elements are looked up relatively to this root element
                (i.e., inside of the root page element).
+        _cache_elements: bool; cache resolved page elements of a model instance
+                         (see :class:`webstr.core.cache.ElementCache`);
+                         None - use `config.ELEMENT_CACHE` value
+        _compile_locators: bool; look up static page elements via locator
+                           chains compiled at class creation (see
+                           :class:`WebstrModelMeta`), i.e. via one driver call
+                           when the chain merges into a single locator;
+                           None - use `config.COMPILED_LOCATORS` value
+        _name_arity: number of values of the model instance name, i.e.
+                     of placeholders of :class:`NameRootPageElement` locators
+        _identifier_arity: number of values of the model instance identifier,
+                           i.e. of placeholders of :class:`DynamicPageElement`
+                           locators
+
+    Class attributes built by :class:`WebstrModelMeta`:
+        _elements: tuple of :data:`ElementSpec` entries of all page elements
+                   (including root page elements and inherited ones)
+        _element_index: dictionary mapping page element names
+                        to :data:`ElementSpec` entries
+
+    Instance attributes:
+        _lookup_timeout: default timeout in [s] of explicit waits for page
+                         elements; None - explicit waits are disabled
+                         and the implicit wait of the driver applies
     """
     _root = None
+    _cache_elements = None
+    _compile_locators = None
+    _name_arity = 1
+    _identifier_arity = 1
 
     def __init__(self, driver):
         """
@@ -51,6 +234,158 @@ class WebstrModelBase(object):
             driver: webdriver instance
         """
         self._driver = driver
+        cache_elements = self._cache_elements
+        if cache_elements is None:
+            cache_elements = config.ELEMENT_CACHE
+        self._element_cache = ElementCache(driver) if cache_elements else None
+        compile_locators = self._compile_locators
+        if compile_locators is None:
+            compile_locators = config.COMPILED_LOCATORS
+        self._locator_chains = type(self)._compiled_chains if compile_locators else None
+        self._scope_depth = 0
+        self._scoped_roots = {}
+        self._lookup_timeout = None
+
+    @contextmanager
+    def lookup_scope(self):
+        """
+        Context manager memoizing root page elements for its lifetime,
+        so that e.g. accessing several page elements of a model with `_root`
+        defined resolves the root element only once. When the element cache
+        is enabled, the page state is checked only once in the scope too
+        (see :meth:`webstr.core.cache.ElementCache.scope`).
+        Scopes can be nested, the memoized elements are dropped when
+        the outermost scope is left.
+
+        Usage::
+            with model.lookup_scope():
+                model.header.text
+                model.footer.text
+        """
+        self._scope_depth += 1
+        try:
+            if self._element_cache is None:
+                yield self
+            else:
+                with self._element_cache.scope():
+                    yield self
+        finally:
+            self._scope_depth -= 1
+            if not self._scope_depth:
+                self._scoped_roots.clear()
+
+    @classmethod
+    def _page_elements(cls):
+        """
+        Return page elements (except for root page elements) defined
+        in this page model class and its base classes.
+
+        Returns:
+            list of (name, descriptor) pairs sorted by name
+        """
+        return [(spec.name, spec.descriptor) for spec in cls._elements
+                if spec.kind != ROOT_KIND]
+
+    def _element_chain(self, name):
+        """
+        Return locator chain of a page element of this model.
+
+        Parameters:
+            name: name of the page element attribute
+
+        Returns:
+            (chain, as_list) tuple, where chain is a list of merged (by, value)
+            locators (see :func:`webstr.core.locators.compose_chain`);
+            None if the attribute is not a page element or if its chain
+            can't be determined (the model root is not a root page element)
+        """
+        spec = type(self)._element_index.get(name)
+        if spec is None:
+            return None
+        compiled = _compiled_chain(self, spec.descriptor)
+        if compiled is not None:
+            return (list(compiled), spec.as_list)
+        chain = spec.descriptor._locator_chain(self)
+        if chain is None:
+            return None
+        return (compose_chain(chain), spec.as_list)
+
+    def snapshot_values(self, names=None):
+        """
+        Read values of form widgets of this model via one script call.
+
+        Raw values (text of inputs, list of selected option texts of select
+        boxes, checked state of checkboxes and radio buttons, text of other
+        elements) are decoded by `_decode_value` of the page element helper
+        if it defines one, so they match what the `value` property of the
+        helper would return. Page elements whose locator chain can't be
+        determined (see :meth:`_element_chain`) are read one by one.
+
+        Parameters:
+            names: names of the page elements to read; None - all page
+                   elements with `_form_kind` defined
+
+        Returns:
+            dictionary mapping the names to the values (None for missing
+            elements)
+        """
+        index = type(self)._element_index
+        if names is None:
+            names = [spec.name for spec in self._elements
+                     if spec.kind not in (ROOT_KIND, ELEMENT_KIND) and not spec.as_list]
+        entries = []
+        fallback = []
+        for name in names:
+            if name not in index:
+                raise AttributeError(
+                    "%s has no page element %s" % (type(self).__name__, name))
+            chain = self._element_chain(name)
+            if chain is None:
+                fallback.append(name)
+            else:
+                entries.append([name, chain[0]])
+        raw = {}
+        if entries:
+            raw = self._driver.execute_script(scripts.FORM_VALUES, entries)
+        values = dict((name, self._element_value(name)) for name in fallback)
+        for name in names:
+            if name in values:
+                continue
+            value = raw.get(name)
+            decode = getattr(index[name].helper, '_decode_value', None)
+            if value is not None and decode is not None:
+                value = decode(value)
+            values[name] = value
+        return values
+
+    def _element_value(self, name):
+        """
+        Read value of a page element via its helper (text of the element
+        if it has no helper) one by one, i.e. without the script call
+        of :meth:`snapshot_values`.
+
+        Parameters:
+            name: name of the page element attribute
+
+        Returns:
+            value of the page element; None if the element is missing
+        """
+        try:
+            element = getattr(self, name)
+        except (selenium_ex.NoSuchElementException,
+                ui_exceptions.ElementDoesNotExistError):
+            return None
+        if type(self)._element_index[name].helper is None:
+            return element.text
+        return element.value
+
+    @property
+    def element_cache(self):
+        """
+        Element cache of this model instance (None if caching is disabled).
+        The cache provides `hits` and `misses` counters.
+        """
+        return self._element_cache
 
     def __str__(self):
         """Return human readable page model representation."""
@@ -125,6 +460,142 @@ class DynamicWebstrModel(WebstrModelBase):
         """
 
 
+def _get_descriptor(model_cls, name):
+    """
+    Return class attribute of a page model class without invoking
+    the descriptor protocol.
+
+    Parameters:
+        model_cls: <*WebstrModel> class
+        name: attribute name
+
+    Returns:
+        attribute value or None if there is no such attribute
+    """
+    for klass in model_cls.__mro__:
+        if name in klass.__dict__:
+            return klass.__dict__[name]
+    return None
+
+
+def _locator_template(by, locator):
+    """
+    Return locator template of a dynamic page element.
+
+    Parameters:
+        by: locator type
+        locator: template string or :class:`webstr.core.locators.LocatorTemplate`
+    """
+    if isinstance(locator, LocatorTemplate):
+        return locator
+    return LocatorTemplate(by, locator)
+
+
+def _compiled_chain(model_obj, descriptor):
+    """
+    Return locator chain of a page element compiled at class creation
+    (see :class:`WebstrModelMeta`) if compiled locators are enabled
+    for the model instance.
+
+    Parameters:
+        model_obj: <*WebstrModel> instance
+        descriptor: page element descriptor
+
+    Returns:
+        tuple of (by, value) locators; None if not available
+    """
+    chains = getattr(model_obj, '_locator_chains', None)
+    if chains is None:
+        return None
+    return chains.get(descriptor)
+
+
+def _cached_lookup(model_obj, key, resolver):
+    """
+    Resolve a page element via the model element cache (if enabled).
+
+    Parameters:
+        model_obj: <*WebstrModel> instance
+        key: cache key, i.e. (descriptor, interpolated locator) tuple
+        resolver: callable performing the actual lookup
+
+    Returns:
+        resolved page element
+    """
+    cache = getattr(model_obj, '_element_cache', None)
+    if cache is None:
+        return resolver()
+    return cache.get(key, resolver)
+
+
+def _scoped_lookup(model_obj, key, resolver):
+    """
+    Resolve a root page element only once inside of a model lookup scope.
+
+    Parameters:
+        model_obj: <*WebstrModel> instance
+        key: hashable key of the root page element
+        resolver: callable performing the actual lookup
+
+    Returns:
+        resolved root page element
+    """
+    if not getattr(model_obj, '_scope_depth', 0):
+        return _cached_lookup(model_obj, key, resolver)
+    try:
+        return model_obj._scoped_roots[key]
+    except KeyError:
+        element = _cached_lookup(model_obj, key, resolver)
+        model_obj._scoped_roots[key] = element
+        return element
+
+
+def _resolve_chain(driver, chain, composed=False):
+    """
+    Find an element described by a chain of nested locators.
+
+    Parameters:
+        driver: webdriver instance
+        chain: list of (by, value) locators, see
+               :func:`webstr.core.locators.compose_chain`
+        composed: bool; the chain is already composed (or compiled)
+
+    Returns:
+        Selenium <WebElement> instance
+    """
+    context = driver
+    for by, value in (chain if composed else compose_chain(chain)):
+        context = context.find_element(by=by, value=value)
+    return context
+
+
+def _wait_for_lookup(model_obj, descriptor, lookup, locator, as_list=False):
+    """
+    Perform a page element lookup, using an explicit wait if it is enabled
+    for the model instance (see `WebstrModelBase._lookup_timeout`).
+
+    Parameters:
+        model_obj: <*WebstrModel> instance
+        descriptor: page element descriptor
+        lookup: function without arguments performing the lookup
+        locator: interpolated locator value (used in error message)
+        as_list: bool; the lookup returns list of elements
+
+    Returns:
+        result of the lookup function
+
+    Throws: ElementDoesNotExistError - element not found within timeout
+    """
+    timeout = getattr(model_obj, '_lookup_timeout', None)
+    if timeout is None:
+        return lookup()
+    if descriptor._timeout is not None:
+        timeout = descriptor._timeout
+    return wait_for_element(
+        lookup, timeout, poll=descriptor._poll, as_list=as_list,
+        message="%s: element %s=%s not found" % (model_obj, descriptor._by, locator))
+
+
 class BasePageElement(object):
     """
     *Property* of a page model representing a page element.
@@ -171,10 +642,97 @@ class RootPageElement(BasePageElement):
     For regular elements of a page model, use <*PageElement> classes
     and successors.
 
+    A root page element can be nested into another (parent) root page element,
+    e.g. a row root inside of a container root. The locators of the whole
+    chain are merged into a single compound locator whenever possible
+    (see :func:`webstr.core.locators.compose_chain`), so that the element is
+    found via one driver call instead of resolving the chain level by level.
+
+    Inside of a lookup scope (see :meth:`WebstrModelBase.lookup_scope`),
+    the root page element is resolved only once.
+
     Usage:
       class LoginWebstrModel(WebstrModel):
         _root = RootPageElement(by=By.ID, locator='LoginPopupView_loginForm')
+
+    Class Attributes:
+        _kind: kind of the page element in the element registry
+               (see :data:`ElementSpec`)
     """
+    _kind = ROOT_KIND
+
+    def __init__(self, by, locator, parent=None, timeout=None,
+                 poll=ELEMENT_POLL_FREQUENCY):
+        """
+        Save locator type, value, parent root element and wait
+        parameters to attributes.
+
+        Parameters:
+            by: element locator type; see selenium.webdriver.common.by.By
+            locator: element locator value
+            parent: parent root page element; the locator is relative
+                    to the parent element if given
+            timeout: explicit wait timeout in [s] of this page element;
+                     None - use the default timeout of the page model
+            poll: explicit wait poll interval in [s]
+                  or :class:`webstr.selenium.ui.support.PollScheduler` instance
+        """
+        super(RootPageElement, self).__init__(by, locator)
+        self._parent = parent
+        self._timeout = timeout
+        self._poll = poll
+
+    def _interpolate(self, model_obj):
+        """
+        Return locator value for given model instance.
+
+        Parameters:
+            model_obj: <*WebstrModel> instance
+        """
+        return self._locator
+
+    def _locator_chain(self, model_obj):
+        """
+        Return list of (by, value) locators from the outermost parent
+        root page element to this one.
+
+        Parameters:
+            model_obj: <*WebstrModel> instance
+        """
+        chain = []
+        if self._parent is not None:
+            chain = self._parent._locator_chain(model_obj)
+        chain.append((self._by, self._interpolate(model_obj)))
+        return chain
+
+    def _static_chain(self, model_cls):
+        """
+        Return list of (by, value) locators from the outermost parent
+        root page element to this one, if none of them is dynamic.
+
+        Parameters:
+            model_cls: <*WebstrModel> class
+
+        Returns:
+            list of locators; None if the chain is dynamic
+        """
+        chain = []
+        if self._parent is not None:
+            chain = self._parent._static_chain(model_cls)
+            if chain is None:
+                return None
+        chain.append((self._by, self._locator))
+        return chain
+
+    def _templates(self):
+        """
+        Return list of (locator template, source) pairs of this root page
+        element and its parents, where source is the name of the model
+        attribute interpolating the template ('_name').
+        """
+        if self._parent is None:
+            return []
+        return self._parent._templates()
 
     def __get__(self, model_obj, objtype=None):
         """ Property getter method.
@@ -188,10 +746,21 @@ class RootPageElement(BasePageElement):
         Returns:
             Selenium <WebElement> instance
         """
-        return model_obj._driver.find_element(by=self._by, value=self._locator)
-
-
-class NameRootPageElement(BasePageElement):
+        # access via class returns the descriptor itself, so that it could be
+        # used as a parent of another root page element
+        if model_obj is None:
+            return self
+        compiled = _compiled_chain(model_obj, self)
+        chain = compiled or self._locator_chain(model_obj)
+        return _scoped_lookup(
+            model_obj, (self, tuple(chain)),
+            lambda: _wait_for_lookup(
+                model_obj, self,
+                lambda: _resolve_chain(model_obj._driver, chain, compiled is not None),
+                chain[-1][1]))
+
+
+class NameRootPageElement(RootPageElement):
     """
     *Property* of a page model representing a root page element.
     If is accessed, it returns standard Selenium <WebElement> instance.
@@ -202,21 +771,44 @@ class NameRootPageElement(BasePageElement):
     Usage:
       class LoginWebstrModel(DynamicWebstrModel):
         _root = NameRootPageElement(by=By.XPATH, locator='//table/tbody/td[%d]')
+
+      class RowModel(DynamicWebstrModel):
+        _root = NameRootPageElement(by=By.XPATH, locator='./tr[%d]',
+                                    parent=TableModel._root)
     """
 
-    def __get__(self, model_obj, objtype=None):
-        """ Property getter method.
-        The return value is what is returned,
-        when a <*DynamicWebstrModel> attribute is accessed.
+    def __init__(self, by, locator, parent=None, timeout=None,
+                 poll=ELEMENT_POLL_FREQUENCY):
+        """
+        Parse the locator template, see :class:`RootPageElement`
+        for parameters.
 
         Parameters:
-            model_obj: <*DynamicWebstrModel> instance
-            objtype: type of the model_obj
+            locator: locator template string (see
+                     :class:`webstr.core.locators.LocatorTemplate`)
+                     or template instance
+        """
+        template = _locator_template(by, locator)
+        super(NameRootPageElement, self).__init__(
+            by, template.locator, parent=parent, timeout=timeout, poll=poll)
+        self._template = template
 
-        Returns:
-            Selenium <WebElement> instance
+    def _interpolate(self, model_obj):
         """
-        return model_obj._driver.find_element(by=self._by, value=self._locator % model_obj._name)
+        Return locator value interpolated by the model instance name.
+
+        Parameters:
+            model_obj: <*DynamicWebstrModel> instance
+        """
+        return self._template.render(model_obj._name)
+
+    def _templates(self):
+        return super(NameRootPageElement, self)._templates() \
+            + [(self._template, '_name')]
+
+    def _static_chain(self, model_cls):
+        """Dynamic root page element, its chain is never static."""
+        return None
 
 
 class PageElement(RootPageElement):
@@ -241,11 +833,18 @@ class PageElement(RootPageElement):
         _is_dynamic:
             bool; is part of the locator string dynamic
             and needs to be interpolated? false in this case
+        _form_kind:
+            kind of the form widget ('text', 'select', 'checkbox', 'radio'
+            or 'combobox') allowing to set and read its value via script
+            (see :mod:`webstr.common.form.bulk`); None - not a form widget
     """
+    _kind = ELEMENT_KIND
     _helper = None
     _is_dynamic = False
+    _form_kind = None
 
-    def __init__(self, by, locator, as_list=False):
+    def __init__(self, by, locator, as_list=False, timeout=None,
+                 poll=ELEMENT_POLL_FREQUENCY):
         """
         Save arguments to attributes.
 
@@ -253,9 +852,17 @@ class PageElement(RootPageElement):
             by: element locator type; see selenium.webdriver.common.by.By
             locator: element locator value
             as_list: bool; return single page element or a list of element(s)
+            timeout: explicit wait timeout in [s] of this page element;
+                     None - use the default timeout of the page model
+            poll: explicit wait poll interval in [s]
+                  or :class:`webstr.selenium.ui.support.PollScheduler` instance
         """
-        super(PageElement, self).__init__(by, locator)
+        template = _locator_template(by, locator) if self._is_dynamic else None
+        if template is not None:
+            locator = template.locator
+        super(PageElement, self).__init__(by, locator, timeout=timeout, poll=poll)
         self._as_list = as_list
+        self._template = template
 
     def __get__(self, model_obj, objtype=None):
         """
@@ -276,17 +883,117 @@ class PageElement(RootPageElement):
         if model_obj is None:
             return None
 
-        root_element = model_obj._root or model_obj._driver
+        compiled = _compiled_chain(model_obj, self)
+        if compiled is not None and len(compiled) == 1:
+            # the whole chain merged into one locator, look it up directly
+            by, locator = compiled[0]
+            lookup = lambda: self._lookup(model_obj, locator, by)
+        else:
+            by, locator = self._by, self._interpolate(model_obj)
+            lookup = lambda: self._lookup(model_obj, locator)
+        if RECORDER.enabled:
+            label = '%s(%s=%s)' % (type(model_obj).__name__, by, locator)
+            with RECORDER.attribute(label):
+                return _cached_lookup(model_obj, (self, locator), lookup)
+        return _cached_lookup(model_obj, (self, locator), lookup)
+
+    def _interpolate(self, model_obj):
+        """
+        Return locator value, interpolated by the model instance identifier
+        in case of a dynamic page element.
+
+        Parameters:
+            model_obj: <*WebstrModel> instance
+        """
+        if self._template is not None:
+            return self._template.render(model_obj._instance_identifier)
+        return self._locator
+
+    def _locator_chain(self, model_obj):
+        """
+        Return list of (by, value) locators from the outermost root
+        page element of the model to this page element.
+
+        Parameters:
+            model_obj: <*WebstrModel> instance
+
+        Returns:
+            list of locators; None if the model root is not a root page
+            element (e.g. a property), so the chain can't be determined
+        """
+        chain = []
+        root = type(model_obj)._element_index.get('_root')
+        if root is not None:
+            chain = root.descriptor._locator_chain(model_obj)
+        elif _get_descriptor(type(model_obj), '_root') is not None:
+            return None
+        chain.append((self._by, self._interpolate(model_obj)))
+        return chain
+
+    def _static_chain(self, model_cls):
+        """
+        Return list of (by, value) locators from the outermost root
+        page element of the model class to this page element, if none
+        of them is dynamic.
+
+        Parameters:
+            model_cls: <*WebstrModel> class
+
+        Returns:
+            list of locators; None if the chain is dynamic
+        """
+        if self._is_dynamic:
+            return None
+        chain = []
+        root = _get_descriptor(model_cls, '_root')
+        if isinstance(root, RootPageElement):
+            chain = root._static_chain(model_cls)
+            if chain is None:
+                return None
+        elif root is not None:
+            # custom root (e.g. a property), it can't be compiled
+            return None
+        chain.append((self._by, self._locator))
+        return chain
+
+    def _templates(self):
+        """
+        Return list of (locator template, source) pairs of this page
+        element, where source is the name of the model attribute
+        interpolating the template ('_instance_identifier').
+        """
+        if self._template is None:
+            return []
+        return [(self._template, '_instance_identifier')]
+
+    def _lookup(self, model_obj, locator, by=None):
+        """
+        Find the page element (relatively to the model root if defined)
+        and wrap it by the helper class.
+
+        Parameters:
+            model_obj: <*WebstrModel> instance
+            locator: already interpolated locator value
+            by: locator type of a compiled locator (see :class:`WebstrModelMeta`),
+                which is looked up via the driver; None - `_by` of the page
+                element, looked up relatively to the model root
+
+        Returns:
+            Selenium <WebElement> instance or instance of a user-defined helper
+        """
+        if by is None:
+            by = self._by
+            root_element = model_obj._root or model_obj._driver
+        else:
+            root_element = model_obj._driver
 
         lookup_method = root_element.find_element
         if self._as_list:
             lookup_method = root_element.find_elements
 
-        locator = self._locator
-        if self._is_dynamic:
-            locator = self._locator % model_obj._instance_identifier
-
-        webelement = lookup_method(by=self._by, value=locator)
+        webelement = _wait_for_lookup(
+            model_obj, self, lambda: lookup_method(by=by, value=locator),
+            locator, as_list=self._as_list)
         if self._helper:
             return self._helper(webelement)
         return webelement
@@ -298,7 +1005,10 @@ class DynamicPageElement(PageElement):
     If is accessed, it returns a <WebElement> instance or instance
     of a wrapper helper class defined as `_helper` attribute.
     Dynamic page element suppose to have part(s) of the locator string defined
-    for run-time interpolation using the '%s' formatter.
+    for run-time interpolation using the '%s' formatter. The locator is parsed
+    into a :class:`webstr.core.locators.LocatorTemplate` when the page element
+    is defined, so interpolated values are escaped (XPath string literals)
+    and the interpolated locators are cached per instance identifier.
 
     Usage:
       class VMInstanceModel(DynamicWebstrModel):
@@ -336,10 +1046,29 @@ class BaseWebElementHelper(FreshWebElement):
             self._elem = webelement._elem
             self._value = webelement._value
             self._by = webelement._by
+            self._context = webelement._context
+            self._index = webelement._index
         except AttributeError:
             self._elem = webelement
             self._value = None
             self._by = None
+            self._context = None
+            self._index = None
+
+    @classmethod
+    def _decode_value(cls, raw):
+        """
+        Decode value read in the browser by a script (see
+        :meth:`WebstrModelBase.snapshot_values`) to the `value` property
+        representation.
+
+        Parameters:
+            raw: text, list of texts or boolean
+
+        Returns:
+            decoded value
+        """
+        return raw
 
     @abstractproperty
     def value(self):
@@ -19,13 +19,22 @@ Author: pnovotny
 # limitations under the License.
 
 
+import logging
+import time
+
 from selenium.common import exceptions as selenium_ex
 
+from webstr.core import config
 from webstr.core import WebstrModel, DynamicWebstrModel
+from webstr.selenium import scripts
+from webstr.selenium.instrumentation import RECORDER
 from webstr.selenium.ui import exceptions as ui_exceptions
 from webstr.common import timeouts
 
 
+LOGGER = logging.getLogger(__name__)
+
+
 class WebstrPageBase(object):
     """
     base class for page object.
@@ -39,6 +48,14 @@ class WebstrPageBase(object):
                 and related strings)
         _label: human-readable label used for PO string representation
         _required_elems: which web elements will be checked during init validation run
+        _batch_validation: bool; check presence of all required elements
+                           via one script call per poll instead of looking
+                           them up one by one; None - use `config.BATCH_VALIDATION`
+        _validation_poll: poll interval in [s] of the batched validation
+        _explicit_wait: bool; pin implicit wait of the driver to 0 and wait
+                        for each page element explicitly, using `_timeout`
+                        as the default timeout of page elements;
+                        None - use `config.EXPLICIT_WAIT`
     """
     _driver = None
     _location = None
@@ -46,6 +63,9 @@ class WebstrPageBase(object):
     _model = None
     _label = None
     _required_elems = None
+    _batch_validation = None
+    _validation_poll = 0.5
+    _explicit_wait = None
 
     def __init__(self, driver, **kwargs):
         """
@@ -57,11 +77,20 @@ class WebstrPageBase(object):
             * kwargs - additional arguments, which are passed to <init> method
         """
         self._driver = driver
-        self._driver.implicitly_wait(self._timeout)
-        if self._location:
-            self._driver.get(self._location)
-        self.init(**kwargs)
-        self._initial_page_object_validation()
+        with RECORDER.attribute(type(self).__name__):
+            explicit_wait = self._explicit_wait
+            if explicit_wait is None:
+                explicit_wait = config.EXPLICIT_WAIT
+            if explicit_wait:
+                self._model._lookup_timeout = self._timeout
+                if getattr(self._driver, 'implicit_wait', None) != 0:
+                    self._driver.implicitly_wait(0)
+            else:
+                self._driver.implicitly_wait(self._timeout)
+            if self._location:
+                self._driver.get(self._location)
+            self.init(**kwargs)
+            self._initial_page_object_validation()
 
     def __str__(self):
         """ Return human readable page object label if available. """
@@ -120,8 +149,87 @@ class WebstrPageBase(object):
         """
         if self._required_elems is None:
             raise NotImplementedError('_required_elems list has to be defined')
-        for elem in self._required_elems:
-            getattr(self._model, elem)
+        batch_validation = self._batch_validation
+        if batch_validation is None:
+            batch_validation = config.BATCH_VALIDATION
+        required_elems = self._required_elems
+        if batch_validation:
+            required_elems = self._batch_init_validation()
+        model = self._model
+        model_cls = type(model)
+        index = model_cls._element_index
+        with model.lookup_scope():
+            for elem in required_elems:
+                spec = index.get(elem)
+                if spec is None:
+                    getattr(model, elem)
+                else:
+                    spec.descriptor.__get__(model, model_cls)
+
+    def _required_chains(self):
+        """
+        Return locator chains of required page elements.
+
+        Returns:
+            (chains, fallback) tuple; chains is a list of (locator chain,
+            as_list) pairs (see :meth:`WebstrModelBase._element_chain`),
+            fallback is a list of required element names, which are not page
+            elements
+        """
+        chains = []
+        fallback = []
+        for elem in self._required_elems or []:
+            element_chain = self._model._element_chain(elem)
+            if element_chain is None:
+                fallback.append(elem)
+            else:
+                chains.append(element_chain)
+        return chains, fallback
+
+    def _batch_init_validation(self):
+        """
+        Check presence of all required page elements via a single script
+        call per poll. Polling ends when all the elements are present
+        or when `_timeout` expires.
+
+        Throws: ElementDoesNotExistError - some of the elements are missing
+
+        Returns:
+            list of required element names, which could not be checked
+            by the script (not page elements) and must be looked up one by one
+        """
+        probes, fallback = self._required_chains()
+        if not probes:
+            return fallback
+        names = [elem for elem in self._required_elems if elem not in fallback]
+
+        deadline = time.time() + self._timeout
+        while True:
+            try:
+                present = self._driver.execute_script(scripts.PRESENCE_PROBE, probes)
+            except selenium_ex.WebDriverException as ex:
+                LOGGER.debug("Batched validation of %s failed, falling back "
+                             "to lookups one by one: %s", self, ex)
+                return self._required_elems
+            missing = [name for name, is_present in zip(names, present)
+                       if not is_present]
+            if not missing:
+                return fallback
+            if time.time() >= deadline:
+                raise ui_exceptions.ElementDoesNotExistError(missing)
+            time.sleep(self._validation_poll)
+
+    def lookup_scope(self):
+        """
+        Context manager memoizing root page elements of the page model
+        for its lifetime (see :meth:`WebstrModelBase.lookup_scope`).
+
+        Usage::
+            with page.lookup_scope():
+                page.do_something()
+                page.do_something_else()
+        """
+        return self._model.lookup_scope()
 
     @property
     def is_present(self):
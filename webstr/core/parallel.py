@@ -0,0 +1,209 @@
+"""
+Parallel execution of UI test cases across several browser sessions.
+
+Every worker thread owns its browser session (see
+:meth:`webstr.selenium.driver.Driver.get_default_driver`), test cases are
+distributed across the workers longest first according to their historical
+durations, so that all workers finish at about the same time.
+
+Usage::
+    runner = ParallelRunner(workers=4, history=DurationHistory('durations.json'))
+    results = runner.run([(test_id, test_function), ...])
+"""
+
+# Copyright 2016 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import collections
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+
+from webstr.core import config
+from webstr.selenium.driver import Driver
+
+
+LOGGER = logging.getLogger(__name__)
+
+TestResult = collections.namedtuple(
+    'TestResult', ['test_id', 'worker', 'duration', 'error'])
+
+
+class DurationHistory(object):
+    """
+    Historical durations of test cases, stored in a JSON file.
+
+    Recorded durations are smoothed (exponential moving average), so that
+    a single outlier doesn't break the scheduling.
+    """
+    DEFAULT_DURATION = 1.0
+    SMOOTHING = 0.5
+
+    def __init__(self, path=None):
+        """
+        Parameters:
+            path: JSON file with durations; None - keep durations in memory only
+        """
+        self.path = path
+        self._durations = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as fileh:
+                self._durations = json.load(fileh)
+
+    def __contains__(self, test_id):
+        return test_id in self._durations
+
+    def get(self, test_id):
+        """
+        Return expected duration of the test case in [s].
+        Unknown test cases are expected to take the median duration
+        of the known ones.
+        """
+        try:
+            return self._durations[test_id]
+        except KeyError:
+            pass
+        known = sorted(self._durations.values())
+        if not known:
+            return self.DEFAULT_DURATION
+        return known[len(known) // 2]
+
+    def record(self, test_id, duration):
+        """
+        Record duration of a test case run.
+
+        Parameters:
+            test_id (str): test case identifier
+            duration: duration in [s]
+        """
+        with self._lock:
+            previous = self._durations.get(test_id)
+            if previous is not None:
+                duration = self.SMOOTHING * previous + (1 - self.SMOOTHING) * duration
+            self._durations[test_id] = duration
+
+    def save(self):
+        """Store the durations into the JSON file (if any)."""
+        if not self.path:
+            return
+        with self._lock:
+            with open(self.path, 'w') as fileh:
+                json.dump(self._durations, fileh, indent=2, sort_keys=True)
+
+
+def schedule(test_ids, workers, history=None):
+    """
+    Split test cases into `workers` shards with balanced total duration
+    (longest processing time first heuristic).
+
+    Useful for static sharding, e.g. across several CI nodes.
+
+    Parameters:
+        test_ids: list of test case identifiers
+        workers (int): number of shards
+        history: :class:`DurationHistory` instance
+
+    Returns:
+        list of `workers` lists of test case identifiers
+    """
+    history = history or DurationHistory()
+    shards = [[] for _ in range(workers)]
+    loads = [(0.0, index) for index in range(workers)]
+    ordered = sorted(test_ids, key=history.get, reverse=True)
+    for test_id in ordered:
+        load, index = heapq.heappop(loads)
+        shards[index].append(test_id)
+        heapq.heappush(loads, (load + history.get(test_id), index))
+    return shards
+
+
+class ParallelRunner(object):
+    """
+    Run test cases in parallel worker threads, each of them using its own
+    browser session.
+
+    Workers take the test cases from a shared queue ordered by historical
+    duration (longest first), so the load is balanced dynamically even if
+    the history is not accurate.
+    """
+
+    def __init__(self, workers=None, history=None):
+        """
+        Parameters:
+            workers (int): number of workers; None - `config.PARALLEL_WORKERS`
+            history: :class:`DurationHistory` instance;
+                     None - history stored in `config.TEST_DURATIONS_FILE`
+        """
+        self.workers = workers or config.PARALLEL_WORKERS
+        self.history = history or DurationHistory(config.TEST_DURATIONS_FILE)
+
+    def _worker(self, name, queue, lock, results):
+        """
+        Run test cases from the queue until it's empty, then quit the worker's
+        browser session.
+        """
+        try:
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    test_id, test_func = queue.popleft()
+                start = time.time()
+                error = None
+                try:
+                    test_func()
+                except Exception as ex:
+                    LOGGER.error("%s: test %s failed: %s", name, test_id, ex)
+                    error = ex
+                duration = time.time() - start
+                self.history.record(test_id, duration)
+                with lock:
+                    results.append(TestResult(test_id, name, duration, error))
+        finally:
+            if Driver.has_default_driver():
+                Driver.get_default_driver().quit()
+                Driver.destroy_default_driver()
+
+    def run(self, tests):
+        """
+        Run the test cases and store their durations into the history.
+
+        Parameters:
+            tests: list of (test_id, test_function) pairs; test function
+                   is called without arguments and is expected to use
+                   :meth:`Driver.get_default_driver` (e.g. via
+                   :class:`webstr.core.test.UITestCase`)
+
+        Returns:
+            list of :class:`TestResult` in order of completion
+        """
+        queue = collections.deque(
+            sorted(tests, key=lambda test: self.history.get(test[0]), reverse=True))
+        lock = threading.Lock()
+        results = []
+        threads = [
+            threading.Thread(target=self._worker, name='webstr-worker-%d' % index,
+                             args=('webstr-worker-%d' % index, queue, lock, results))
+            for index in range(min(self.workers, len(queue)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.history.save()
+        return results
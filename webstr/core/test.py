@@ -20,11 +20,13 @@ Author: pnovotny, ltrilety
 
 
 import logging
+import os
 
 from selenium.common import exceptions as selenium_ex
 
 import webstr.selenium.ui.exceptions as ui_exceptions
 from webstr.selenium.driver import Driver
+from webstr.core import budget
 from webstr.core import config
 
 LOGGER = logging.getLogger(__name__)
@@ -37,6 +39,8 @@ class UITestCase(object):
     """
     Base class for all Selenium-based test cases.
     By default starts new browser at set_up() and quits it at tear_down().
+    The browser is owned by the current thread, so test cases can be run
+    in parallel via :class:`webstr.core.parallel.ParallelRunner`.
     """
     TEST_FAILURE_EXCEPTIONS = (ui_exceptions.GeneralException,
                                selenium_ex.WebDriverException,
@@ -45,24 +49,79 @@ class UITestCase(object):
     def __init__(self, **kwargs):
         super(UITestCase, self).__init__(**kwargs)
         self.driver = None
+        self._test_method = None
 
     def _start_browser(self):
-        """ Open new browser or get driver instance of the existing one. """
-        self.driver = Driver.get_default_driver()
-        self.driver.maximize_window()
+        """
+        Open new browser or get driver instance of the existing one.
+        If `config.DRIVER_POOL` is set, the driver is taken from the shared
+        driver pool. The window is maximized unless `config.MAXIMIZE_WINDOW`
+        is False (the window size is then given by the browser start up
+        options, see `config.BROWSER_WIDTH` and `config.BROWSER_HEIGHT`).
+        """
+        if config.DRIVER_POOL:
+            self.driver = Driver.get_pool().checkout()
+        else:
+            self.driver = Driver.get_default_driver()
+        if config.MAXIMIZE_WINDOW:
+            self.driver.maximize_window()
 
     def _quit_browser(self):
-        """ Quit browser and remove its cached driver instance. """
+        """
+        Quit browser and remove its cached driver instance.
+        If `config.DRIVER_POOL` is set, the driver is reset and returned
+        back to the shared driver pool instead.
+        """
+        if config.DRIVER_POOL:
+            Driver.get_pool().checkin(self.driver)
+            self.driver = None
+            return
         self.driver.quit()
         self.driver = None
         Driver.destroy_default_driver()
 
-    def set_up(self):
-        """ Open new browser (if not already opened). """
+    @property
+    def test_id(self):
+        """
+        Identifier of the test case run used in the round trip budget report
+        (see :mod:`webstr.core.budget`), i.e. module, class and test method
+        name. The test method is the one given to :meth:`set_up`, otherwise
+        it is taken from `id()` of unittest test cases or from the test
+        currently run by pytest.
+        """
+        method = self._test_method
+        if method is None:
+            unittest_id = getattr(self, 'id', None)
+            if callable(unittest_id):
+                return unittest_id()
+            current = os.environ.get('PYTEST_CURRENT_TEST')
+            if current:
+                # e.g. 'tests/test_hosts.py::TestHosts::test_add[1] (call)'
+                method = current.split(' ')[0].split('::')[-1]
+        test_id = '%s.%s' % (type(self).__module__, type(self).__name__)
+        if method:
+            test_id = '%s.%s' % (test_id, method)
+        return test_id
+
+    def set_up(self, method=None):
+        """
+        Open new browser (if not already opened).
+        If `config.TEST_BUDGET` is set, start collecting WebDriver round trip
+        statistics of the test case (browser start up and quit excluded).
+
+        Parameters:
+            method: test method (or its name) run by the test case,
+                    used in `test_id`
+        """
+        self._test_method = getattr(method, '__name__', method)
         self._start_browser()
+        if config.TEST_BUDGET:
+            budget.start_test()
 
     def tear_down(self):
-        """ Close browser. """
+        """ Record round trip statistics of the test case and close browser. """
+        if config.TEST_BUDGET:
+            budget.stop_test(self.test_id)
         self._quit_browser()
 
     def fail(self, *args):
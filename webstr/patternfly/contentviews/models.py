@@ -23,6 +23,13 @@ Page models for patternfly Content Views:
 from webstr.core import By, DynamicWebstrModel, PageElement, WebstrModel, RootPageElement, NameRootPageElement
 
 
+# "Next Page" link of an enabled patternfly pagination control following
+# the content view; the link is not matched on the last page
+NEXT_PAGE_XPATH = (
+    './following-sibling::*[contains(concat(" ", @class, " "), " content-view-pf-pagination ")]'
+    '//li[not(contains(concat(" ", @class, " "), " disabled "))]/a[@title="Next Page"]')
+
+
 class ListViewModel(WebstrModel):
     """
     A List View displays data in rows. Each row displays the same set of
@@ -40,6 +47,7 @@ class ListViewModel(WebstrModel):
       by=By.XPATH,
       locator=LIST_XPATH + "//*[contains(concat(' ', @class, ' '), ' list-group-item ')]",
       as_list=True)
+    next_page = PageElement(by=By.XPATH, locator=NEXT_PAGE_XPATH)
 
 
 class ListViewRowModel(DynamicWebstrModel):
@@ -65,6 +73,7 @@ class TableViewModel(WebstrModel):
       by=By.XPATH,
       locator=TABLE_XPATH + '/tbody//tr[@role="row"]',
       as_list=True)
+    next_page = PageElement(by=By.XPATH, locator=NEXT_PAGE_XPATH)
 
 
 class TableViewRowModel(DynamicWebstrModel):
@@ -20,11 +20,162 @@ Page objects for patternfly Content Views:
 # limitations under the License.
 
 
+import collections
+import logging
+
+from selenium.common import exceptions as selenium_ex
+from selenium.webdriver.support import expected_conditions
+
 from webstr.core import DynamicWebstrPage, WebstrPage
 from webstr.patternfly.contentviews import models as m_contentviews
+from webstr.selenium import scripts
+from webstr.selenium.ui.support import WebDriverWait
 import webstr.common.containers.pages as containers
 
 
+LOGGER = logging.getLogger(__name__)
+
+
+class ContentViewBase(containers.ContainerBase):
+    """
+    Base class of patternfly content views supporting streaming iteration
+    over paginated or virtually scrolled rows (see :meth:`stream`).
+
+    Class attributes:
+        _virtual_scroll: rows are rendered while scrolling (instead of
+                         pagination via "Next Page" link)
+        _page_timeout: timeout for loading the next page in [s]
+        _scroll_timeout: timeout for rendering next rows after scrolling in [s];
+                         the end of the view is reached when it expires
+    """
+    _virtual_scroll = False
+    _page_timeout = 10
+    _scroll_timeout = 2
+
+    def _first_row_text(self):
+        """
+        Return text of the first row; None if there are no rows.
+        """
+        _, records = self._read_rows(0, 1)
+        return records[0].text if records else None
+
+    def _first_row(self):
+        """
+        Return the first row as a plain WebElement, which is not refreshed
+        when it becomes stale (see
+        :class:`webstr.selenium.webelement.FreshWebElement`).
+        """
+        chain = self._rows_chain()
+        by, value = chain[0]
+        element = self.driver.find_element(by, value, auto_refresh=False)
+        for by, value in chain[1:]:
+            element = element.find_element(by=by, value=value)
+        return element
+
+    def _next_page(self):
+        """
+        Click the "Next Page" link and wait until the next page is loaded,
+        i.e. until the first row of the previous page is detached from the
+        page or its text changes (the next page re-uses the row elements).
+
+        Returns:
+            True if the next page was loaded, False on the last page
+        """
+        chain = self._model._element_chain('next_page')
+        if chain is None:
+            return False
+        first_text = self._first_row_text()
+        first = self._first_row() if first_text is not None else None
+        if not self.driver.execute_script(scripts.CLICK_IF_PRESENT, chain[0]):
+            return False
+        detached = expected_conditions.staleness_of(first)
+
+        def loaded(_):
+            """The next page replaced or re-used rows of the previous one."""
+            if first is not None and detached(None):
+                return True
+            return self._first_row_text() != first_text
+
+        wait = WebDriverWait(None, self._page_timeout, signal_driver=self.driver)
+        wait.until(loaded, "next page of %s was not loaded" % self)
+        return True
+
+    def _scroll(self):
+        """
+        Scroll the last row into view and wait until next rows are rendered.
+
+        Returns:
+            True if new rows were rendered, False at the end of the view
+        """
+        chain = self._rows_chain()
+        last = self.driver.execute_script(scripts.SCROLL_TO_LAST_ROW, chain)
+        if last is None:
+            return False
+        wait = WebDriverWait(None, self._scroll_timeout, signal_driver=self.driver)
+        try:
+            wait.until(lambda _: self.driver.execute_script(
+                scripts.SCROLL_TO_LAST_ROW, chain) != last)
+        except selenium_ex.TimeoutException:
+            return False
+        return True
+
+    def stream(self, batch_size=50, window=1000):
+        """
+        Iterate over all rows of the view, loading next pages (or scrolling
+        the view) as needed.
+
+        Rows are read in batches via one script call per batch. Pages
+        don't overlap, so all rows of every page are yielded. Rows of
+        a virtually scrolled view are deduplicated by their key (see
+        `_key_field`, required in this mode), so rows re-rendered after
+        scrolling are yielded only once. Memory use is bounded by the batch
+        size and by the deduplication window, regardless of the total number
+        of rows.
+
+        Note: the `live` handle of a yielded record refers to the row
+        position on the currently loaded page.
+
+        Parameters:
+            batch_size: number of rows read by one script call
+            window: number of most recently seen row keys remembered
+                    for deduplication
+
+        Returns:
+            generator of :class:`RowRecord` instances
+
+        Throws: TypeError - `_key_field` is not set for a virtually
+                            scrolled view
+        """
+        if self._virtual_scroll and self._key_field is None:
+            raise TypeError("%s: rows of a virtually scrolled view can't be "
+                            "deduplicated without _key_field" % self)
+        seen = set()
+        recent = collections.deque()
+        while True:
+            offset = 0
+            while True:
+                _, records = self._read_rows(offset, batch_size)
+                if not records:
+                    break
+                offset += len(records)
+                for record in records:
+                    if not self._virtual_scroll:
+                        yield record
+                        continue
+                    key = self._row_key(record)
+                    if key in seen:
+                        continue
+                    if len(recent) >= window:
+                        seen.discard(recent.popleft())
+                    recent.append(key)
+                    seen.add(key)
+                    yield record
+            advanced = self._scroll() if self._virtual_scroll else self._next_page()
+            if not advanced:
+                LOGGER.debug("End of %s reached", self)
+                return
+
+
 class ListViewRow(containers.ContainerRowBase):
     """
     Item of a List View.
@@ -34,7 +185,7 @@ class ListViewRow(containers.ContainerRowBase):
     _required_elems = ['_root']
 
 
-class ListView(containers.ContainerBase):
+class ListView(ContentViewBase):
     """
     See: https://www.patternfly.org/list-view/
     """
@@ -52,7 +203,7 @@ class TableViewRow(containers.ContainerRowBase):
     _required_elems = ['_root']
 
 
-class TableView(containers.ContainerBase):
+class TableView(ContentViewBase):
     """
     See: https://www.patternfly.org/patterns/table-view/
     """
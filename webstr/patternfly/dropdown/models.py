@@ -23,13 +23,6 @@ Author: ltrilety
 from webstr.core import WebstrModel, DynamicWebstrModel, PageElement, By, RootPageElement, NameRootPageElement
 
 
-class DropDownMenuRowModel(DynamicWebstrModel):
-    """
-    Base class model for drop down menu item.
-    """
-    _root = NameRootPageElement(by=By.XPATH, locator='./li//ul/li[%d]')
-
-
 class DropDownMenuModel(WebstrModel):
     """ Base page model for any active dropdown menu.
     NOTE for drop down menu on admin-users page for any user it can be iterated right away any <li> element is a row
@@ -38,3 +31,11 @@ class DropDownMenuModel(WebstrModel):
     _base_locator = '//*[contains(@class, "dropdown-menu")]/..'
     _root = RootPageElement(by=By.XPATH, locator=_base_locator + '/ul[./li]')
     rows = PageElement(By.XPATH, './li', as_list=True)
+
+
+class DropDownMenuRowModel(DynamicWebstrModel):
+    """
+    Base class model for drop down menu item.
+    """
+    _root = NameRootPageElement(by=By.XPATH, locator='./li//ul/li[%d]',
+                                parent=DropDownMenuModel._root)
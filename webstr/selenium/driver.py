@@ -19,13 +19,263 @@ Selenium WebDriver instance manager.
 # limitations under the License.
 
 
+import atexit
+import collections
+import logging
+import threading
+import time
+
+from selenium.common import exceptions as selenium_ex
+
 from webstr.core import config
-from webstr.selenium.webdriver import DriverFactory
+from webstr.selenium.webdriver import DriverFactory, DriverPrespawner
+
+
+LOGGER = logging.getLogger(__name__)
+
+# JavaScript clearing web storage of the current page
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+SessionKey = collections.namedtuple(
+    'SessionKey', ['browser', 'version', 'platform', 'width', 'height'])
+
+
+def get_session_key():
+    """
+    Return key of a driver session according to current configuration.
+
+    Returns:
+        :class:`SessionKey` instance
+    """
+    return SessionKey(browser=config.BROWSER,
+                      version=str(config.BROWSER_VERSION),
+                      platform=config.BROWSER_PLATFORM,
+                      width=config.BROWSER_WIDTH,
+                      height=config.BROWSER_HEIGHT)
+
+
+def create_driver(key):
+    """
+    Create new driver instance for given session key.
+
+    Parameters:
+        key: :class:`SessionKey` instance
+
+    Returns:
+        :class:`WebDriver` instance
+    """
+    capabilities = {
+      'platform': key.platform,
+      'version': key.version,
+      }
+    return DriverFactory(browser_name=key.browser,
+                         host=config.SELENIUM_SERVER,
+                         port=config.SELENIUM_PORT,
+                         desired_capabilities=capabilities)
+
+
+class PooledSession(object):
+    """
+    Driver instance managed by :class:`DriverPool` along with its metadata.
+
+    Attributes:
+        driver: :class:`WebDriver` instance
+        key: :class:`SessionKey` of the driver
+        created: creation time (as returned by `time.time()`)
+        uses: number of checkouts of the driver
+    """
+
+    def __init__(self, driver, key):
+        self.driver = driver
+        self.key = key
+        self.created = time.time()
+        self.uses = 0
+
+    @property
+    def age(self):
+        """Age of the session in [s]."""
+        return time.time() - self.created
+
+
+class DriverPool(object):
+    """
+    Pool of warm WebDriver sessions, keyed by session capabilities
+    (see :class:`SessionKey`).
+
+    A driver is taken from the pool via :meth:`checkout` and returned back
+    via :meth:`checkin`. Returned drivers are reset (cookies and web storage
+    are cleared and `about:blank` is loaded), so that the next user gets
+    a clean session without paying for a browser start up. Sessions are
+    recycled when they fail a health check or exceed `max_age` or `max_uses`.
+
+    Usage::
+        pool = DriverPool(size=2)
+        driver = pool.checkout()
+        try:
+            ...
+        finally:
+            pool.checkin(driver)
+    """
+
+    def __init__(self, size=1, max_age=None, max_uses=None, factory=create_driver):
+        """
+        Parameters:
+            size: maximal number of idle sessions kept per session key
+            max_age: maximal session age in [s]; None - unlimited
+            max_uses: maximal number of session checkouts; None - unlimited
+            factory: function creating a driver for given session key
+        """
+        self.size = size
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self._factory = factory
+        self._idle = collections.defaultdict(list)
+        self._busy = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return number of sessions (both idle and checked out)."""
+        with self._lock:
+            return len(self._busy) + sum(len(idle) for idle in self._idle.values())
+
+    def _is_expired(self, session):
+        """Return whether the session reached its max age or max uses."""
+        if self.max_age is not None and session.age >= self.max_age:
+            return True
+        if self.max_uses is not None and session.uses >= self.max_uses:
+            return True
+        return False
+
+    @staticmethod
+    def _is_healthy(session):
+        """Return whether the session still responds."""
+        try:
+            session.driver.execute_script("return 1;")
+        except selenium_ex.WebDriverException as ex:
+            LOGGER.info("Discarding unhealthy driver session: %s", ex)
+            return False
+        return True
+
+    @staticmethod
+    def _discard(session):
+        """Quit the driver of the session, ignoring all errors."""
+        try:
+            session.driver.quit()
+        except Exception as ex:
+            LOGGER.debug("Failed to quit driver session: %s", ex)
+
+    @staticmethod
+    def reset(driver):
+        """
+        Reset the driver session to a clean state: clear cookies
+        and web storage and load a blank page.
+
+        Parameters:
+            driver: :class:`WebDriver` instance
+        """
+        driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        driver.delete_all_cookies()
+        driver.get('about:blank')
+
+    def warm_up(self, count=None, key=None):
+        """
+        Create idle sessions in advance.
+
+        Parameters:
+            count: number of sessions to create; None - pool size
+            key: :class:`SessionKey`; None - key according to configuration
+        """
+        key = key or get_session_key()
+        count = self.size if count is None else count
+        for _ in range(count):
+            session = PooledSession(self._factory(key), key)
+            with self._lock:
+                self._idle[key].append(session)
+
+    def checkout(self, key=None):
+        """
+        Take a healthy driver session from the pool or create a new one.
+
+        Parameters:
+            key: :class:`SessionKey`; None - key according to configuration
+
+        Returns:
+            :class:`WebDriver` instance
+        """
+        key = key or get_session_key()
+        while True:
+            with self._lock:
+                idle = self._idle[key]
+                session = idle.pop() if idle else None
+            if session is None:
+                session = PooledSession(self._factory(key), key)
+                break
+            if not self._is_expired(session) and self._is_healthy(session):
+                break
+            self._discard(session)
+        session.uses += 1
+        with self._lock:
+            self._busy[id(session.driver)] = session
+        return session.driver
+
+    def checkin(self, driver, reset=True):
+        """
+        Return driver session back to the pool.
+        The session is quit if it's expired, unhealthy, fails to reset
+        or if there are already `size` idle sessions of the same key.
+
+        Parameters:
+            driver: :class:`WebDriver` instance taken via :meth:`checkout`
+            reset: bool; reset the session (see :meth:`reset`)
+        """
+        with self._lock:
+            session = self._busy.pop(id(driver), None)
+        if session is None:
+            raise ValueError("driver %r is not checked out from this pool" % driver)
+        if self._is_expired(session):
+            self._discard(session)
+            return
+        if reset:
+            try:
+                self.reset(driver)
+            except selenium_ex.WebDriverException as ex:
+                LOGGER.info("Discarding driver session, reset failed: %s", ex)
+                self._discard(session)
+                return
+        with self._lock:
+            idle = self._idle[session.key]
+            if len(idle) < self.size:
+                idle.append(session)
+                return
+        self._discard(session)
+
+    def close(self):
+        """Quit all driver sessions of the pool."""
+        with self._lock:
+            sessions = list(self._busy.values())
+            for idle in self._idle.values():
+                sessions.extend(idle)
+            self._busy.clear()
+            self._idle.clear()
+        for session in sessions:
+            self._discard(session)
 
 
 class Driver(object):
-    """WebDriver instance manager & cache."""
-    __driver = None
+    """
+    WebDriver instance manager & cache.
+
+    The default driver is owned by the current thread (worker), so that test
+    cases executed in parallel threads (see :mod:`webstr.core.parallel`)
+    never share a browser session. The driver pool is shared by all threads.
+    """
+    __local = threading.local()
+    __pool = None
+    __pool_lock = threading.Lock()
+    __prespawner = None
 
     def __new__(cls):
         """
@@ -40,29 +290,91 @@ class Driver(object):
         """
         Factory method, creates :class:`WebDriver` instance according
         to configuration parameters or returns existing one,
-        if called multiple times.
+        if called multiple times from the same thread.
 
         Returns:
             :class:`WebDriver` instance
         """
-        if cls.__driver:
-            return cls.__driver
+        driver = getattr(cls.__local, 'driver', None)
+        if driver:
+            return driver
+
+        cls.__local.driver = cls.__create_driver(get_session_key())
+        return cls.__local.driver
+
+    @classmethod
+    def __create_driver(cls, key):
+        """
+        Create new driver instance for given session key. If pre-spawning
+        is enabled (`config.PRESPAWN_DRIVERS`), a session booted ahead
+        of time is used for the configured session key.
+
+        Parameters:
+            key: :class:`SessionKey` instance
+        """
+        if config.PRESPAWN_DRIVERS and key == get_session_key():
+            return cls.get_prespawner().acquire()
+        return create_driver(key)
 
-        capabilities = {
-          'platform': config.BROWSER_PLATFORM,
-          'version': str(config.BROWSER_VERSION),
-          }
-        cls.__driver = DriverFactory(browser_name=config.BROWSER,
-                                     host=config.SELENIUM_SERVER,
-                                     port=config.SELENIUM_PORT,
-                                     desired_capabilities=capabilities)
-        return cls.__driver
+    @classmethod
+    def get_prespawner(cls):
+        """
+        Return shared driver prespawner, which keeps `config.PRESPAWN_DRIVERS`
+        sessions of the configured session key booted ahead of time.
+        Sessions not acquired are quit at interpreter exit.
+
+        Returns:
+            :class:`DriverPrespawner` instance
+        """
+        with cls.__pool_lock:
+            if cls.__prespawner is None:
+                cls.__prespawner = DriverPrespawner(
+                  lambda: create_driver(get_session_key()),
+                  count=config.PRESPAWN_DRIVERS)
+                atexit.register(cls.__prespawner.close)
+            return cls.__prespawner
+
+    @classmethod
+    def has_default_driver(cls):
+        """
+        Return whether the current thread has a cached driver instance.
+        """
+        return bool(getattr(cls.__local, 'driver', None))
 
     @classmethod
     def destroy_default_driver(cls):
         """
-        Remove the cached driver instance, if exists.
+        Remove the cached driver instance of the current thread, if exists.
         This step is necessary for replacing the cached driver instance with
         new one via :func:`get_default_driver()`.
         """
-        cls.__driver = None
+        cls.__local.driver = None
+
+    @classmethod
+    def get_pool(cls):
+        """
+        Return shared driver pool configured according to configuration
+        parameters (`DRIVER_POOL_SIZE`, `DRIVER_MAX_AGE`, `DRIVER_MAX_USES`).
+        All pooled sessions are quit at interpreter exit.
+
+        Returns:
+            :class:`DriverPool` instance
+        """
+        with cls.__pool_lock:
+            if cls.__pool is None:
+                cls.__pool = DriverPool(size=config.DRIVER_POOL_SIZE,
+                                        max_age=config.DRIVER_MAX_AGE,
+                                        max_uses=config.DRIVER_MAX_USES,
+                                        factory=cls.__create_driver)
+                atexit.register(cls.__pool.close)
+            return cls.__pool
+
+    @classmethod
+    def destroy_pool(cls):
+        """
+        Quit all sessions of the shared driver pool and remove the pool.
+        """
+        with cls.__pool_lock:
+            if cls.__pool is not None:
+                cls.__pool.close()
+                cls.__pool = None
@@ -0,0 +1,913 @@
+"""
+In-process fake WebDriver backend.
+
+:class:`FakeCommandExecutor` answers WebDriver commands of a regular
+selenium client from a static HTML document parsed by `lxml`, so page
+objects, page models, element proxies and containers can be exercised
+(and their WebDriver round trips counted) without any browser or Grid.
+Use it via the 'Fake' browser of :class:`webstr.selenium.webdriver.DriverFactory`
+or directly via :class:`webstr.selenium.webdriver.Fake`.
+
+Supported are XPath, CSS and all other selenium locators, element commands
+(text, click, send keys, ...), timeouts including the implicit wait, and the
+scripts of :mod:`webstr.selenium.scripts`. Staleness can be simulated
+(:meth:`FakeCommandExecutor.rerender`, :meth:`FakeCommandExecutor.invalidate_references`)
+and latency can be injected per command.
+
+The fake backend does NOT execute JavaScript and does not validate
+the scripts in any way: a script is recognized by its exact source
+and answered by a Python re-implementation (other scripts fail with
+JavascriptException). A bug in a script is therefore invisible to tests
+running on the fake backend. To keep the handlers in line with the scripts,
+:data:`SCRIPT_DIGESTS` records digests of the script sources the handlers
+were written against (checked by the unit tests), and tests marked
+`browser` compare results of the scripts in a real browser with results
+of the handlers (see tests/test_script_parity.py).
+
+Requires the optional `lxml` and `cssselect` packages
+(``pip install webstr[fake]``).
+
+Usage::
+    driver = DriverFactory('Fake', fixtures={'fake://hosts': HOSTS_HTML},
+                           latency=0.005)
+    driver.get('fake://hosts')
+    driver.fake.rerender(By.XPATH, '//table')
+"""
+
+# Copyright 2016 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import collections
+import copy
+import itertools
+import logging
+import re
+import threading
+import time
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    from cssselect import HTMLTranslator
+except ImportError:  # optional dependency, see the 'fake' extra of setup.py
+    etree = None
+
+from webstr.selenium import scripts
+from webstr.selenium.driver import CLEAR_STORAGE_SCRIPT
+
+
+LOGGER = logging.getLogger(__name__)
+
+ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+BLANK_PAGE = '<html><head><title></title></head><body></body></html>'
+# interval of polling the document while waiting (implicit wait, async scripts)
+WAIT_INTERVAL = 0.01
+# selenium atoms executed as scripts are recognized by their leading comment
+ATOM_PATTERN = re.compile(r'^/\* (\w+) \*/')
+# elements whose text is separated from the surrounding text
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'li', 'nav', 'ol', 'option', 'p', 'pre', 'section', 'table', 'tbody',
+    'td', 'tfoot', 'th', 'thead', 'tr', 'ul'])
+# elements never rendered as text
+INVISIBLE_TAGS = frozenset(['head', 'script', 'style', 'template', 'title'])
+# keys sent by send_keys which don't produce any text (Enter, Tab, ...)
+SPECIAL_KEYS = re.compile(u'[\ue000-\uf8ff\r\n]')
+# SHA-1 digests (first 12 hex digits) of the sources of the scripts
+# of webstr.selenium.scripts answered by the Python handlers; when a script
+# changes, review its handler and update the digest
+SCRIPT_DIGESTS = {
+    'CLICK_IF_PRESENT': '2ea49fd221f2',
+    'CONTAINER_COUNT': '4c11c8328767',
+    'CONTAINER_SNAPSHOT': '41fc960cb3f8',
+    'ELEMENT_VALUE': 'bbc80bcb7574',
+    'FORM_FILL': '1fd88aa275c4',
+    'FORM_VALUES': '4a0e6d321d9b',
+    'MUTATION_COUNTER': '5ec7bc8d2597',
+    'PRESENCE_PROBE': '0be1d74bebb5',
+    'SCROLL_TO_LAST_ROW': '84f27ffba852',
+    'SELECT_OPTIONS': '0ad903a1cf3d',
+    'WAIT_FOR_DISAPPEARANCE': 'a06d076fe965',
+    'WAIT_FOR_MUTATION': '7f1dc9f8238a',
+    }
+
+
+class FakeWebDriverError(Exception):
+    """
+    Error reported to the selenium client as a W3C WebDriver error.
+    """
+
+    def __init__(self, error, message):
+        """
+        Parameters:
+            error (str): W3C error code, e.g. 'no such element'
+            message (str): error message
+        """
+        super(FakeWebDriverError, self).__init__(message)
+        self.error = error
+        self.message = message
+
+
+class FakeCommandExecutor(object):
+    """
+    Command executor of the selenium client answering the commands
+    in-process from an lxml document.
+
+    Attributes:
+        fixtures: dictionary mapping URLs to HTML documents loaded by `get`
+                  (file:// URLs are read from disk)
+        latency: delay in [s] added to every command, or dictionary mapping
+                 command names to delays
+        commands: counter of executed commands by their names
+        url: URL of the current document
+    """
+
+    def __init__(self, fixtures=None, latency=0):
+        """
+        Parameters:
+            fixtures: see `fixtures` attribute
+            latency: see `latency` attribute
+        """
+        if etree is None:
+            raise ImportError("the fake WebDriver backend requires lxml and cssselect "
+                              "packages (pip install webstr[fake])")
+        self.fixtures = dict(fixtures or {})
+        self.latency = latency
+        self.commands = collections.Counter()
+        self.url = 'about:blank'
+        self.timeouts = {'implicit': 0, 'script': 30000, 'pageLoad': 300000}
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._element_ids = {}
+        self._elements = {}
+        self._click_handlers = []
+        self._history = []
+        self._position = -1
+        self._tokens = itertools.count(1)
+        self._css_cache = {}
+        self._translator = HTMLTranslator()
+        self._load(BLANK_PAGE, 'about:blank')
+        self._script_handlers = {
+            scripts.MUTATION_COUNTER: self._script_mutation_counter,
+            scripts.PRESENCE_PROBE: self._script_presence_probe,
+            scripts.CONTAINER_SNAPSHOT: self._script_container_snapshot,
+            scripts.CONTAINER_COUNT: self._script_container_count,
+            scripts.FORM_FILL: self._script_form_fill,
+            scripts.FORM_VALUES: self._script_form_values,
+            scripts.ELEMENT_VALUE: self._script_element_value,
+            scripts.SELECT_OPTIONS: self._script_select_options,
+            scripts.CLICK_IF_PRESENT: self._script_click_if_present,
+            scripts.SCROLL_TO_LAST_ROW: self._script_scroll_to_last_row,
+            CLEAR_STORAGE_SCRIPT: lambda: None,
+            }
+        self._async_script_handlers = {
+            scripts.WAIT_FOR_MUTATION: self._script_wait_for_mutation,
+            scripts.WAIT_FOR_DISAPPEARANCE: self._script_wait_for_disappearance,
+            }
+
+    # document management
+
+    def _load(self, source, url):
+        """
+        Replace the current document; all element references become stale.
+        """
+        with self._lock:
+            self._document = lxml_html.document_fromstring(source)
+            self._tree = self._document.getroottree()
+            self._page_token = 'fake-page-%d' % next(self._tokens)
+            self._mutations = 0
+            self._elements.clear()
+            self._element_ids.clear()
+            self.url = url
+
+    def load_html(self, source, url='about:blank'):
+        """
+        Load HTML document as if the browser navigated to `url`.
+        """
+        self._load(source, url)
+        del self._history[self._position + 1:]
+        self._history.append(url)
+        self._position = len(self._history) - 1
+        self.fixtures.setdefault(url, source)
+
+    def _source(self, url):
+        """
+        Return HTML of the URL (fixture or local file).
+        """
+        if url in self.fixtures:
+            return self.fixtures[url]
+        if url == 'about:blank':
+            return BLANK_PAGE
+        if url.startswith('file://'):
+            with open(url[len('file://'):]) as fileh:
+                return fileh.read()
+        raise FakeWebDriverError('unknown error', "unknown fixture URL: %s" % url)
+
+    def _mutated(self):
+        """Record a structural change of the document."""
+        self._mutations += 1
+
+    def find(self, by, value):
+        """
+        Return list of nodes of the current document matching the locator.
+        """
+        with self._lock:
+            return self._find_all(None, by, value)
+
+    def remove(self, by, value):
+        """
+        Remove elements matching the locator from the document.
+        """
+        with self._lock:
+            for node in self._find_all(None, by, value):
+                node.getparent().remove(node)
+            self._mutated()
+
+    def rerender(self, by, value):
+        """
+        Replace elements matching the locator by their copies, as a client
+        side framework re-rendering them would do; the content stays the same,
+        but references to the original elements become stale.
+        """
+        with self._lock:
+            for node in self._find_all(None, by, value):
+                node.getparent().replace(node, copy.deepcopy(node))
+            self._mutated()
+
+    def invalidate_references(self):
+        """
+        Make all element references handed out so far stale.
+        """
+        with self._lock:
+            self._elements.clear()
+            self._element_ids.clear()
+
+    def on_click(self, by, value, callback):
+        """
+        Register a callback called when an element matching the locator
+        is clicked, to simulate behaviour of the application.
+
+        Parameters:
+            by, value: locator of the elements
+            callback: callable accepting the executor and the clicked lxml node;
+                      structural changes of the document are recorded
+                      automatically
+        """
+        self._click_handlers.append((by, value, callback))
+
+    def schedule(self, delay, callback):
+        """
+        Call the callback (accepting the executor) in a background thread
+        after the delay in [s], e.g. to remove a spinner asynchronously.
+        """
+        def run():
+            with self._lock:
+                callback(self)
+                self._mutated()
+        timer = threading.Timer(delay, run)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    # element references
+
+    def _reference(self, node):
+        """Return W3C element reference of the node."""
+        key = id(node)
+        element_id = self._element_ids.get(key)
+        if element_id is None or self._elements.get(element_id) is not node:
+            element_id = 'fake-element-%d' % next(self._ids)
+            self._element_ids[key] = element_id
+            self._elements[element_id] = node
+        return {ELEMENT_KEY: element_id}
+
+    def _attached(self, node):
+        """Check that the node is part of the current document."""
+        root = node
+        parent = root.getparent()
+        while parent is not None:
+            root = parent
+            parent = root.getparent()
+        return root is self._document
+
+    def _node(self, element_id):
+        """
+        Return node of the element reference.
+
+        Throws: FakeWebDriverError - stale element reference
+        """
+        if isinstance(element_id, dict):
+            element_id = element_id[ELEMENT_KEY]
+        node = self._elements.get(element_id)
+        if node is None or not self._attached(node):
+            raise FakeWebDriverError(
+                'stale element reference',
+                "element %s is not attached to the page document" % element_id)
+        return node
+
+    def _decode(self, value):
+        """Replace element references in script arguments by nodes."""
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return self._node(value)
+            return dict((key, self._decode(item)) for key, item in value.items())
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        return value
+
+    def _encode(self, value):
+        """Replace nodes in script results by element references."""
+        if etree is not None and isinstance(value, etree._Element):
+            return self._reference(value)
+        if isinstance(value, dict):
+            return dict((key, self._encode(item)) for key, item in value.items())
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        return value
+
+    # DOM helpers mirroring webstr.selenium.scripts.LOCATOR_FUNCTIONS
+
+    def _css_to_xpath(self, css):
+        xpath = self._css_cache.get(css)
+        if xpath is None:
+            xpath = self._translator.css_to_xpath(css, prefix='descendant::')
+            self._css_cache[css] = xpath
+        return xpath
+
+    def _find_all(self, context, by, value):
+        """
+        Return list of nodes matching the locator under the context
+        (None - the document).
+        """
+        base = self._tree if context is None else context
+        if by == 'xpath':
+            try:
+                result = base.xpath(value)
+            except etree.XPathError as ex:
+                raise FakeWebDriverError('invalid selector', "%s: %s" % (value, ex))
+            if not isinstance(result, list):
+                raise FakeWebDriverError(
+                    'invalid selector', "%s doesn't select elements" % value)
+            return [node for node in result if isinstance(node, etree._Element)
+                    and isinstance(node.tag, str)]
+        if by == 'css selector':
+            return base.xpath(self._css_to_xpath(value))
+        if by == 'id':
+            return base.xpath('descendant::*[@id=$value]', value=value)
+        if by == 'name':
+            return base.xpath('descendant::*[@name=$value]', value=value)
+        if by == 'class name':
+            return base.xpath(self._css_to_xpath('.' + value))
+        if by == 'tag name':
+            return base.xpath('descendant::*[local-name()=$value]', value=value)
+        if by == 'link text':
+            return [node for node in base.xpath('descendant::a')
+                    if self._text(node) == value]
+        if by == 'partial link text':
+            return [node for node in base.xpath('descendant::a')
+                    if value in self._text(node)]
+        raise FakeWebDriverError('invalid argument', "unsupported locator: %s" % by)
+
+    def _find(self, context, by, value):
+        found = self._find_all(context, by, value)
+        return found[0] if found else None
+
+    def _resolve(self, chain, all_nodes=False):
+        """
+        Resolve locator chain (see webstrResolve in
+        :data:`webstr.selenium.scripts.LOCATOR_FUNCTIONS`).
+        """
+        context = None
+        for by, value in chain[:-1]:
+            context = self._find(context, by, value)
+            if context is None:
+                return None
+        by, value = chain[-1]
+        if all_nodes:
+            return self._find_all(context, by, value)
+        return self._find(context, by, value)
+
+    def _displayed(self, node):
+        """Approximate visibility of the node."""
+        if node.tag == 'input' and (node.get('type') or '').lower() == 'hidden':
+            return False
+        current = node
+        while current is not None:
+            if current.get('hidden') is not None:
+                return False
+            style = (current.get('style') or '').replace(' ', '').lower()
+            if 'display:none' in style or 'visibility:hidden' in style:
+                return False
+            current = current.getparent()
+        return True
+
+    def _collect_text(self, node, parts):
+        """Append visible text fragments of the node (and its subtree)."""
+        if isinstance(node.tag, str) and node.tag not in INVISIBLE_TAGS \
+                and node.get('hidden') is None \
+                and 'display:none' not in (node.get('style') or '').replace(' ', ''):
+            block = node.tag in BLOCK_TAGS
+            if block:
+                parts.append(' ')
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                self._collect_text(child, parts)
+            if block:
+                parts.append(' ')
+        if node.tail:
+            parts.append(node.tail)
+
+    def _text(self, node):
+        """
+        Visible text of the node with normalized white space (approximation
+        of `innerText`: block elements are separated by a space).
+        """
+        if not self._displayed(node):
+            return ''
+        parts = []
+        self._collect_text(node, parts)
+        if node.tail:
+            parts.pop()
+        return ' '.join(''.join(parts).split())
+
+    @staticmethod
+    def _kind(node):
+        return node.tag, (node.get('type') or '').lower()
+
+    @staticmethod
+    def _option_disabled(option):
+        group = option.getparent()
+        return option.get('disabled') is not None \
+            or (group is not None and group.tag == 'optgroup'
+                and group.get('disabled') is not None)
+
+    def _selected_options(self, select):
+        """
+        Return selected options of the select box; a single select box
+        without any option marked as selected has its first enabled option
+        selected, like in a browser.
+        """
+        options = list(select.iter('option'))
+        selected = [option for option in options if option.get('selected') is not None]
+        if select.get('multiple') is not None:
+            return selected
+        if selected:
+            return selected[-1:]
+        if (select.get('size') or '1').strip() not in ('', '0', '1'):
+            return []
+        enabled = [option for option in options if not self._option_disabled(option)]
+        return enabled[:1]
+
+    def _is_selected(self, node):
+        if node.tag != 'option':
+            return node.get('selected') is not None
+        select = next(node.iterancestors('select'), None)
+        if select is None:
+            return node.get('selected') is not None
+        return node in self._selected_options(select)
+
+    def _get_value(self, node):
+        tag, _ = self._kind(node)
+        if tag == 'textarea':
+            return node.text or ''
+        if tag == 'select':
+            selected = [option.get('value', option.text_content())
+                        for option in self._selected_options(node)]
+            return selected[0] if selected else ''
+        return node.get('value', '')
+
+    def _set_value(self, node, value):
+        if node.tag == 'textarea':
+            node.text = value
+        else:
+            node.set('value', value)
+
+    def _logical_value(self, node):
+        """Logical value of the node (see webstrValue of the scripts)."""
+        tag, kind = self._kind(node)
+        if tag == 'input' and kind in ('checkbox', 'radio'):
+            return node.get('checked') is not None
+        if tag == 'select':
+            return [self._text(option) for option in self._selected_options(node)]
+        if tag in ('input', 'textarea'):
+            return self._get_value(node)
+        return self._text(node)
+
+    def _select_option(self, option, selected=True):
+        select = next(option.iterancestors('select'), None)
+        if selected and select is not None and select.get('multiple') is None:
+            for other in select.iter('option'):
+                other.attrib.pop('selected', None)
+        if selected:
+            option.set('selected', 'selected')
+        else:
+            option.attrib.pop('selected', None)
+
+    def _click(self, node):
+        """Simulate click on the node."""
+        if node.get('disabled') is not None:
+            return
+        tag, kind = self._kind(node)
+        if tag == 'input' and kind == 'checkbox':
+            if node.get('checked') is None:
+                node.set('checked', 'checked')
+            else:
+                node.attrib.pop('checked')
+        elif tag == 'input' and kind == 'radio':
+            name = node.get('name')
+            if name:
+                for other in self._tree.xpath('//input[@type="radio"][@name=$name]',
+                                              name=name):
+                    other.attrib.pop('checked', None)
+            node.set('checked', 'checked')
+        elif tag == 'option':
+            select = next(node.iterancestors('select'), None)
+            multiple = select is not None and select.get('multiple') is not None
+            self._select_option(node, not (multiple and node.get('selected') is not None))
+        for by, value, callback in list(self._click_handlers):
+            if node in self._find_all(None, by, value):
+                callback(self, node)
+                self._mutated()
+
+    # command execution
+
+    def execute(self, command, params):
+        """
+        Execute the command (interface of the selenium RemoteConnection).
+
+        Returns:
+            W3C response dictionary
+        """
+        latency = self.latency.get(command, 0) if isinstance(self.latency, dict) \
+            else self.latency
+        if latency:
+            time.sleep(latency)
+        self.commands[command] += 1
+        handler = getattr(self, '_command_' + command, None)
+        try:
+            if handler is None:
+                raise FakeWebDriverError(
+                    'unsupported operation', "command %s is not supported" % command)
+            with self._lock:
+                value = handler(params or {})
+        except FakeWebDriverError as ex:
+            return {'status': ex.error, 'value': {'error': ex.error, 'message': ex.message}}
+        return {'status': 0, 'value': self._encode(value)}
+
+    def close(self):
+        """Interface of the selenium RemoteConnection."""
+
+    def _wait(self, condition, timeout):
+        """
+        Evaluate the condition until it's true or the timeout in [s] expires;
+        the lock is released between evaluations, so that scheduled
+        callbacks can modify the document.
+        """
+        deadline = time.time() + timeout
+        result = condition()
+        while not result and time.time() < deadline:
+            self._lock.release()
+            try:
+                time.sleep(WAIT_INTERVAL)
+            finally:
+                self._lock.acquire()
+            result = condition()
+        return result
+
+    def _command_newSession(self, params):
+        return {'sessionId': 'fake-session', 'capabilities': {
+            'browserName': 'fake', 'browserVersion': '', 'platformName': 'ANY'}}
+
+    def _command_quit(self, params):
+        return None
+
+    _command_deleteSession = _command_quit
+
+    def _command_get(self, params):
+        self.load_html(self._source(params['url']), params['url'])
+        return None
+
+    def _command_refresh(self, params):
+        self._load(self._source(self.url), self.url)
+        return None
+
+    def _navigate(self, step):
+        position = self._position + step
+        if 0 <= position < len(self._history):
+            self._position = position
+            url = self._history[position]
+            self._load(self._source(url), url)
+        return None
+
+    def _command_goBack(self, params):
+        return self._navigate(-1)
+
+    def _command_goForward(self, params):
+        return self._navigate(1)
+
+    def _command_getCurrentUrl(self, params):
+        return self.url
+
+    def _command_getTitle(self, params):
+        titles = self._tree.xpath('//title')
+        return titles[0].text_content().strip() if titles else ''
+
+    def _command_getPageSource(self, params):
+        return etree.tostring(self._document, encoding='unicode', method='html')
+
+    def _command_setTimeouts(self, params):
+        for name in ('implicit', 'script', 'pageLoad'):
+            if params.get(name) is not None:
+                self.timeouts[name] = params[name]
+        return None
+
+    def _command_getTimeouts(self, params):
+        return dict(self.timeouts)
+
+    def _command_deleteAllCookies(self, params):
+        return None
+
+    def _command_getCookies(self, params):
+        return []
+
+    def _command_setWindowRect(self, params):
+        return {'x': 0, 'y': 0, 'width': params.get('width') or 1280,
+                'height': params.get('height') or 1024}
+
+    def _command_getWindowRect(self, params):
+        return {'x': 0, 'y': 0, 'width': 1280, 'height': 1024}
+
+    _command_w3cMaximizeWindow = _command_getWindowRect
+
+    def _command_w3cGetCurrentWindowHandle(self, params):
+        return 'fake-window'
+
+    def _find_command(self, context, params, single):
+        """Find element(s) honoring the implicit wait."""
+        found = self._wait(
+            lambda: self._find_all(context, params['using'], params['value']),
+            self.timeouts['implicit'] / 1000.0)
+        if single:
+            if not found:
+                raise FakeWebDriverError(
+                    'no such element', "Unable to locate element: %s=%s"
+                    % (params['using'], params['value']))
+            return found[0]
+        return found
+
+    def _command_findElement(self, params):
+        return self._find_command(None, params, True)
+
+    def _command_findElements(self, params):
+        return self._find_command(None, params, False)
+
+    def _command_findChildElement(self, params):
+        return self._find_command(self._node(params['id']), params, True)
+
+    def _command_findChildElements(self, params):
+        return self._find_command(self._node(params['id']), params, False)
+
+    def _command_getElementText(self, params):
+        return self._text(self._node(params['id']))
+
+    def _command_getElementTagName(self, params):
+        return self._node(params['id']).tag
+
+    def _command_clickElement(self, params):
+        self._click(self._node(params['id']))
+        return None
+
+    def _command_clearElement(self, params):
+        self._set_value(self._node(params['id']), '')
+        return None
+
+    def _command_sendKeysToElement(self, params):
+        node = self._node(params['id'])
+        text = SPECIAL_KEYS.sub('', params.get('text') or ''.join(params.get('value', [])))
+        self._set_value(node, self._get_value(node) + text)
+        return None
+
+    def _command_isElementSelected(self, params):
+        node = self._node(params['id'])
+        return node.get('checked') is not None or self._is_selected(node)
+
+    def _command_isElementEnabled(self, params):
+        return self._node(params['id']).get('disabled') is None
+
+    def _command_getElementAttribute(self, params):
+        return self._node(params['id']).get(params['name'])
+
+    def _command_getElementProperty(self, params):
+        node = self._node(params['id'])
+        name = params['name']
+        if name == 'value':
+            return self._get_value(node)
+        if name == 'selected':
+            return self._is_selected(node)
+        if name == 'checked':
+            return node.get(name) is not None
+        if name in ('innerText', 'textContent'):
+            return self._text(node)
+        if name == 'tagName':
+            return node.tag.upper()
+        return node.get(name)
+
+    def _command_getElementRect(self, params):
+        size = 20 if self._displayed(self._node(params['id'])) else 0
+        return {'x': 0, 'y': 0, 'width': size * 5, 'height': size}
+
+    def _command_getElementValueOfCssProperty(self, params):
+        return ''
+
+    def _command_w3cExecuteScript(self, params):
+        script = params['script']
+        args = self._decode(params.get('args', []))
+        handler = self._script_handlers.get(script)
+        if handler is not None:
+            return handler(*args)
+        atom = ATOM_PATTERN.match(script)
+        if atom and atom.group(1) == 'isDisplayed':
+            return self._displayed(args[0])
+        if atom and atom.group(1) == 'getAttribute':
+            node, name = args
+            if name in ('value', 'checked', 'selected'):
+                return self._command_getElementProperty(
+                    {'id': self._reference(node), 'name': name}) or None
+            return node.get(name)
+        raise FakeWebDriverError('javascript error',
+                                 "script is not supported by the fake backend")
+
+    def _command_w3cExecuteScriptAsync(self, params):
+        script = params['script']
+        handler = self._async_script_handlers.get(script)
+        if handler is None:
+            raise FakeWebDriverError('javascript error',
+                                     "script is not supported by the fake backend")
+        return handler(*self._decode(params.get('args', [])))
+
+    # handlers of webstr.selenium.scripts
+
+    def _script_mutation_counter(self):
+        return [self._page_token, self._mutations]
+
+    def _script_presence_probe(self, probes):
+        return [self._resolve(chain, as_list) is not None for chain, as_list in probes]
+
+    def _script_container_snapshot(self, chain, fields, offset, limit):
+        rows = self._resolve(chain, True) or []
+        offset = offset or 0
+        end = len(rows) if limit is None else min(len(rows), offset + limit)
+        records = []
+        for index in range(offset, end):
+            values = {}
+            for name, by, value in fields:
+                node = self._find(rows[index], by, value)
+                values[name] = self._logical_value(node) if node is not None else None
+            records.append({'index': index + 1, 'text': self._text(rows[index]),
+                            'fields': values})
+        return {'count': len(rows), 'rows': records}
+
+    def _script_container_count(self, chain, criteria):
+        count = 0
+        for row in self._resolve(chain, True) or []:
+            matches = True
+            for by, value, expected in criteria or []:
+                if by is None:
+                    actual = self._text(row)
+                else:
+                    node = self._find(row, by, value)
+                    actual = self._logical_value(node) if node is not None else None
+                if _js_string(actual) != _js_string(expected):
+                    matches = False
+                    break
+            if matches:
+                count += 1
+        return count
+
+    def _script_form_fill(self, entries):
+        errors = {}
+        for name, chain, kind, value in entries:
+            node = self._resolve(chain)
+            if node is None:
+                errors[name] = 'missing'
+            elif kind == 'text':
+                self._set_value(node, '' if value is None else _js_string(value))
+            elif kind == 'select':
+                values = value if isinstance(value, list) else [value]
+                options = [option for option in node.iter('option')
+                           if option.get('value', option.text_content())
+                           in [_js_string(item) for item in values]]
+                if not options:
+                    errors[name] = 'no option'
+                if node.get('multiple') is None:
+                    options = options[:1]
+                for option in node.iter('option'):
+                    if option in options:
+                        self._select_option(option)
+                    elif node.get('multiple') is None:
+                        option.attrib.pop('selected', None)
+            elif kind == 'checkbox':
+                if value is not None and (node.get('checked') is not None) != bool(value):
+                    self._click(node)
+            elif kind == 'radio':
+                if value is True and node.get('checked') is None:
+                    self._click(node)
+            elif kind == 'combobox':
+                target = node if node.tag == 'input' else self._find(node, 'tag name', 'input')
+                if target is None:
+                    errors[name] = 'missing'
+                else:
+                    self._set_value(target, _js_string(value))
+        return errors
+
+    def _script_form_values(self, entries):
+        values = {}
+        for name, chain in entries:
+            node = self._resolve(chain)
+            values[name] = self._logical_value(node) if node is not None else None
+        return values
+
+    def _script_element_value(self, node):
+        return self._logical_value(node)
+
+    def _script_select_options(self, select, attribute, mode, pattern, flags=''):
+        matched = 0
+        regex = None
+        if mode == 'regex':
+            regex = re.compile(pattern, sum(
+                re_flag for js_flag, re_flag in (
+                    ('i', re.IGNORECASE), ('m', re.MULTILINE), ('s', re.DOTALL))
+                if js_flag in flags))
+        for option in select.iter('option'):
+            if self._option_disabled(option):
+                continue
+            if attribute == 'value':
+                subject = option.get('value', option.text_content())
+            else:
+                subject = ' '.join(option.text_content().split())
+            if (mode == 'exact' and subject == pattern) \
+                    or (mode == 'prefix' and subject.startswith(pattern)) \
+                    or (regex is not None and regex.search(subject)):
+                matched += 1
+                self._select_option(option)
+                if select.get('multiple') is None:
+                    break
+        selected = [option.get('value', option.text_content())
+                    for option in self._selected_options(select)]
+        return [matched, selected]
+
+    def _script_click_if_present(self, chain):
+        node = self._resolve(chain)
+        if node is None:
+            return False
+        self._click(node)
+        return True
+
+    def _script_scroll_to_last_row(self, chain):
+        rows = self._resolve(chain, True) or []
+        return self._text(rows[-1]) if rows else None
+
+    def _script_wait_for_mutation(self, timeout):
+        mutations = self._mutations
+        return bool(self._wait(lambda: self._mutations != mutations, timeout / 1000.0))
+
+    def _script_wait_for_disappearance(self, targets, mode, timeout):
+        def gone(target):
+            chain, as_list = target
+            node = self._resolve(chain, as_list)
+            if node is None:
+                return True
+            return not as_list and not self._displayed(node)
+
+        def check():
+            count = len([target for target in targets if gone(target)])
+            return count > 0 if mode == 'any' else count == len(targets)
+
+        return bool(self._wait(check, timeout / 1000.0))
+
+
+def _js_string(value):
+    """Convert value to string the way JavaScript `String()` does."""
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if value is None:
+        return 'null'
+    if isinstance(value, list):
+        return ','.join(_js_string(item) for item in value)
+    return '%s' % value
@@ -0,0 +1,442 @@
+"""
+Instrumentation of WebDriver commands.
+
+When enabled, every command sent by :class:`webstr.selenium.webdriver.WebDriverExtension`
+(find element, click, execute script, ...) is timed and attributed to the
+page object, page model or page element which issued it. The events are
+passed to pluggable sinks: :class:`MemorySink` (latency histograms and
+per-origin aggregates), :class:`JsonLinesSink` and :class:`LoggingSink`.
+
+When disabled (default), the only cost per command is one attribute check.
+
+Usage::
+    from webstr.selenium import instrumentation
+
+    sink = instrumentation.MemorySink()
+    instrumentation.enable(sink)
+    ...
+    print(sink.histograms['findElement'].to_dict())
+    instrumentation.disable()
+"""
+
+# Copyright 2016 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import bisect
+import collections
+from contextlib import contextmanager
+import json
+import logging
+import threading
+import time
+
+
+LOGGER = logging.getLogger(__name__)
+
+# upper bounds of histogram buckets in [s]; the last bucket is unbounded
+BUCKET_BOUNDS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5,
+                 1, 2, 5, 10, 30)
+
+CommandEvent = collections.namedtuple(
+    'CommandEvent', ['command', 'duration', 'origin', 'timestamp', 'error'])
+CommandEvent.__doc__ = """
+Single WebDriver command.
+
+Attributes:
+    command (str): WebDriver command name (e.g. 'findElement')
+    duration (float): duration of the round trip in [s]
+    origin (tuple): attribution labels, outermost first (e.g. page object,
+                    page model, page element)
+    timestamp (float): time of the command start
+    error (str): name of the exception raised by the command; None on success
+"""
+
+
+class Histogram(object):
+    """
+    Latency histogram with fixed (roughly logarithmic) buckets.
+
+    Attributes:
+        count: number of recorded values
+        total: sum of recorded values in [s]
+        min: minimal recorded value in [s]
+        max: maximal recorded value in [s]
+        buckets: list of counts per bucket (see :data:`BUCKET_BOUNDS`)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def record(self, value):
+        """
+        Record a value in [s].
+        """
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, value)] += 1
+
+    def percentile(self, percent):
+        """
+        Return approximate percentile (upper bound of the bucket
+        containing it) in [s]; None if there are no values.
+        """
+        if not self.count:
+            return None
+        rank = percent / 100.0 * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                if index < len(BUCKET_BOUNDS):
+                    return min(BUCKET_BOUNDS[index], self.max)
+                return self.max
+        return self.max
+
+    def to_dict(self):
+        """
+        Return the histogram as a JSON serializable dictionary.
+        """
+        buckets = {}
+        for index, count in enumerate(self.buckets):
+            if not count:
+                continue
+            if index < len(BUCKET_BOUNDS):
+                buckets['<=%gs' % BUCKET_BOUNDS[index]] = count
+            else:
+                buckets['>%gs' % BUCKET_BOUNDS[-1]] = count
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'buckets': buckets,
+            }
+
+
+class Sink(object):
+    """
+    Base class of instrumentation sinks.
+    """
+
+    def emit(self, event):
+        """
+        Process a :data:`CommandEvent`.
+        """
+        raise NotImplementedError
+
+    def increment(self, counter, origin, amount=1):
+        """
+        Process an increment of a named counter (e.g. stale element refreshes).
+
+        Parameters:
+            counter (str): counter name
+            origin (tuple): attribution labels
+            amount: value of the increment
+        """
+
+    def close(self):
+        """
+        Release resources held by the sink.
+        """
+
+
+class MemorySink(Sink):
+    """
+    Sink aggregating the events in memory.
+
+    Attributes:
+        histograms: dictionary mapping command names to :class:`Histogram`
+        origins: dictionary mapping origin labels (the innermost one)
+                 to :class:`Histogram` of all their commands
+        counters: dictionary mapping counter names to their values
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = collections.defaultdict(Histogram)
+        self.origins = collections.defaultdict(Histogram)
+        self.counters = collections.Counter()
+
+    def emit(self, event):
+        with self._lock:
+            self.histograms[event.command].record(event.duration)
+            self.origins[event.origin[-1] if event.origin else None].record(
+                event.duration)
+
+    def increment(self, counter, origin, amount=1):
+        with self._lock:
+            self.counters[counter] += amount
+
+    def reset(self):
+        """Drop all the aggregated data."""
+        with self._lock:
+            self.histograms.clear()
+            self.origins.clear()
+            self.counters.clear()
+
+    def to_dict(self):
+        """
+        Return the aggregated data as a JSON serializable dictionary.
+        """
+        with self._lock:
+            return {
+                'commands': dict((command, histogram.to_dict())
+                                 for command, histogram in self.histograms.items()),
+                'origins': dict((str(origin), histogram.to_dict())
+                                for origin, histogram in self.origins.items()),
+                'counters': dict(self.counters),
+                }
+
+
+class JsonLinesSink(Sink):
+    """
+    Sink writing every event as a JSON object on a separate line of a file.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+            path: output file (appended)
+        """
+        self._lock = threading.Lock()
+        self._file = open(path, 'a')
+
+    def _write(self, record):
+        line = json.dumps(record, sort_keys=True)
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def emit(self, event):
+        self._write(event._asdict())
+
+    def increment(self, counter, origin, amount=1):
+        self._write({'counter': counter, 'origin': origin, 'amount': amount,
+                     'timestamp': time.time()})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class LoggingSink(Sink):
+    """
+    Sink logging every event.
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        """
+        Parameters:
+            logger: logger instance; None - logger of this module
+            level: log level of the messages
+        """
+        self._logger = logger or LOGGER
+        self._level = level
+
+    def emit(self, event):
+        self._logger.log(self._level, "%s %.1f ms%s [%s]", event.command,
+                         event.duration * 1000,
+                         ' (%s)' % event.error if event.error else '',
+                         ' > '.join(event.origin))
+
+    def increment(self, counter, origin, amount=1):
+        self._logger.log(self._level, "%s +%g [%s]", counter, amount,
+                         ' > '.join(origin))
+
+
+class ThreadStatsSink(Sink):
+    """
+    Sink summing up the commands of every thread separately, e.g. per test
+    case run in the thread (see :class:`webstr.core.budget.BudgetReport`).
+
+    Usage::
+        sink.start()
+        ...
+        stats = sink.stop()
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _stats(self):
+        return getattr(self._local, 'stats', None)
+
+    def start(self):
+        """Start collecting statistics of the current thread."""
+        self._local.stats = {
+            'round_trips': 0,
+            'wire_time': 0.0,
+            'stale_refreshes': 0,
+            'implicit_wait_time': 0.0,
+            }
+
+    def stop(self):
+        """
+        Stop collecting statistics of the current thread.
+
+        Returns:
+            dictionary with number of round trips, total wire time in [s],
+            number of stale element refreshes and time spent in implicit
+            waits for missing elements in [s]; None if not started
+        """
+        stats = self._stats()
+        self._local.stats = None
+        return stats
+
+    def emit(self, event):
+        stats = self._stats()
+        if stats is not None:
+            stats['round_trips'] += 1
+            stats['wire_time'] += event.duration
+
+    def increment(self, counter, origin, amount=1):
+        stats = self._stats()
+        if stats is None:
+            return
+        if counter == 'stale_refresh':
+            stats['stale_refreshes'] += amount
+        elif counter == 'implicit_wait':
+            stats['implicit_wait_time'] += amount
+
+
+class Recorder(object):
+    """
+    Dispatcher of the instrumentation events to the sinks.
+
+    Attributes:
+        enabled (bool): True if any sink is registered
+    """
+
+    def __init__(self):
+        self._sinks = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.enabled = False
+
+    def add_sink(self, sink):
+        """Register a sink and enable the instrumentation."""
+        with self._lock:
+            self._sinks = self._sinks + [sink]
+            self.enabled = True
+
+    def remove_sink(self, sink):
+        """Unregister a sink; the instrumentation is disabled with the last one."""
+        with self._lock:
+            self._sinks = [item for item in self._sinks if item is not sink]
+            self.enabled = bool(self._sinks)
+
+    def clear(self):
+        """Unregister (and close) all the sinks."""
+        with self._lock:
+            sinks, self._sinks = self._sinks, []
+            self.enabled = False
+        for sink in sinks:
+            sink.close()
+
+    def _stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def origin(self):
+        """
+        Return attribution labels of the current thread, outermost first.
+        """
+        return tuple(self._stack())
+
+    @contextmanager
+    def attribute(self, label):
+        """
+        Context manager attributing commands sent within it to the label.
+        Labels are nested, e.g. page object > page model > page element.
+
+        Parameters:
+            label (str): e.g. name of a page object or a page element
+        """
+        if not self.enabled:
+            yield
+            return
+        stack = self._stack()
+        stack.append(label)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def record(self, command, duration, start, error=None):
+        """
+        Pass a command event to all the sinks.
+
+        Parameters:
+            command (str): WebDriver command name
+            duration: duration in [s]
+            start: time of the command start
+            error: exception raised by the command or None
+        """
+        event = CommandEvent(command, duration, self.origin(), start,
+                             type(error).__name__ if error is not None else None)
+        for sink in self._sinks:
+            sink.emit(event)
+
+    def increment(self, counter, amount=1):
+        """
+        Pass an increment of a named counter to all the sinks.
+
+        Parameters:
+            counter (str): counter name, e.g. 'stale_refresh' or
+                           'implicit_wait' (time in [s] spent waiting
+                           for missing elements)
+            amount: value of the increment
+        """
+        origin = self.origin()
+        for sink in self._sinks:
+            sink.increment(counter, origin, amount)
+
+
+RECORDER = Recorder()
+
+
+def enable(*sinks):
+    """
+    Enable instrumentation, passing the events to the sinks.
+    """
+    for sink in sinks:
+        RECORDER.add_sink(sink)
+
+
+def disable():
+    """
+    Disable instrumentation and close all the sinks.
+    """
+    RECORDER.clear()
+
+
+def attribute(label):
+    """
+    Shortcut for :meth:`Recorder.attribute` of the global recorder.
+    """
+    return RECORDER.attribute(label)
@@ -0,0 +1,500 @@
+"""
+JavaScript snippets executed in the browser via `execute_script`.
+
+Keeping the scripts in one place allows to reuse them across page models,
+page objects and helpers.
+"""
+
+# Copyright 2016 Red Hat
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+# Install (once per document) a MutationObserver counting structural changes
+# of the DOM and return a [page token, mutation count] pair. The page token
+# changes with every newly loaded document, so the pair can be compared
+# across navigations as well.
+MUTATION_COUNTER = """
+var w = window;
+if (typeof w.__webstrMutations !== 'number') {
+    w.__webstrMutations = 0;
+    w.__webstrPageToken = String(new Date().getTime()) + ':' + String(Math.random());
+    new MutationObserver(function () { w.__webstrMutations++; }).observe(
+        document, {childList: true, subtree: true});
+}
+return [w.__webstrPageToken, w.__webstrMutations];
+"""
+
+
+# Element lookup functions shared by other scripts. Locators are passed
+# as [by, value] pairs using the selenium.webdriver.common.by.By values,
+# chains of locators are resolved from the document, each locator relatively
+# to the element found by the previous one.
+LOCATOR_FUNCTIONS = """
+function webstrText(node) {
+    return (node.innerText || node.textContent || '').replace(/^\\s+|\\s+$/g, '');
+}
+function webstrMatcher(by, value) {
+    if (by === 'id') {
+        return function (node) { return node.id === value; };
+    }
+    if (by === 'name') {
+        return function (node) { return node.getAttribute('name') === value; };
+    }
+    if (by === 'link text') {
+        return function (node) { return webstrText(node) === value; };
+    }
+    if (by === 'partial link text') {
+        return function (node) { return webstrText(node).indexOf(value) !== -1; };
+    }
+    throw new Error('unsupported locator type: ' + by);
+}
+function webstrFindAll(context, by, value) {
+    var result = [], nodes, snapshot, matcher, i;
+    if (by === 'xpath') {
+        snapshot = document.evaluate(value, context, null,
+                                     XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (i = 0; i < snapshot.snapshotLength; i++) {
+            result.push(snapshot.snapshotItem(i));
+        }
+        return result;
+    }
+    if (by === 'css selector') {
+        nodes = context.querySelectorAll(value);
+    } else if (by === 'class name') {
+        nodes = context.getElementsByClassName(value);
+    } else if (by === 'tag name') {
+        nodes = context.getElementsByTagName(value);
+    } else {
+        matcher = webstrMatcher(by, value);
+        nodes = context.getElementsByTagName(
+            by === 'link text' || by === 'partial link text' ? 'a' : '*');
+        for (i = 0; i < nodes.length; i++) {
+            if (matcher(nodes[i])) {
+                result.push(nodes[i]);
+            }
+        }
+        return result;
+    }
+    for (i = 0; i < nodes.length; i++) {
+        result.push(nodes[i]);
+    }
+    return result;
+}
+function webstrFind(context, by, value) {
+    if (by === 'xpath') {
+        return document.evaluate(value, context, null,
+                                 XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    if (by === 'css selector') {
+        return context.querySelector(value);
+    }
+    return webstrFindAll(context, by, value)[0] || null;
+}
+function webstrResolve(chain, all) {
+    var context = document, last = chain[chain.length - 1], i;
+    for (i = 0; i < chain.length - 1; i++) {
+        context = webstrFind(context, chain[i][0], chain[i][1]);
+        if (!context) {
+            return null;
+        }
+    }
+    if (all) {
+        return webstrFindAll(context, last[0], last[1]);
+    }
+    return webstrFind(context, last[0], last[1]);
+}
+"""
+
+
+# Check presence of several elements at once.
+# arguments[0]: list of [locator chain, as_list] pairs
+# Returns list of booleans; a list element is present if its chain (except
+# for the last locator) can be resolved.
+PRESENCE_PROBE = LOCATOR_FUNCTIONS + """
+var probes = arguments[0], result = [], i;
+for (i = 0; i < probes.length; i++) {
+    result.push(webstrResolve(probes[i][0], probes[i][1]) !== null);
+}
+return result;
+"""
+
+
+# Asynchronous script; wait until the DOM changes or the timeout expires.
+# arguments[0]: timeout in [ms]
+# Returns true if a mutation was observed, false on timeout.
+WAIT_FOR_MUTATION = """
+var done = arguments[arguments.length - 1], timeout = arguments[0];
+var finished = false, timer = null, observer;
+function finish(changed) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(changed);
+}
+observer = new MutationObserver(function () { finish(true); });
+observer.observe(document, {childList: true, subtree: true,
+                            attributes: true, characterData: true});
+timer = setTimeout(function () { finish(false); }, timeout);
+"""
+
+
+# Asynchronous script; wait until elements are detached from the DOM
+# or hidden. Uses MutationObserver (and IntersectionObserver if available)
+# so that no polling is needed.
+# arguments[0]: list of [locator chain, as_list] pairs (see PRESENCE_PROBE)
+# arguments[1]: 'any' - wait until any of the elements disappears,
+#               'all' - wait until all of them disappear
+# arguments[2]: timeout in [ms]
+# Returns true if the elements disappeared, false on timeout.
+WAIT_FOR_DISAPPEARANCE = LOCATOR_FUNCTIONS + """
+var targets = arguments[0], mode = arguments[1], timeout = arguments[2];
+var done = arguments[arguments.length - 1];
+var finished = false, timer = null, observer, intersection = null, found, i;
+function webstrVisible(node) {
+    if (!document.documentElement.contains(node)) {
+        return false;
+    }
+    if (window.getComputedStyle(node).visibility === 'hidden') {
+        return false;
+    }
+    return node.offsetWidth > 0 || node.offsetHeight > 0 ||
+        node.getClientRects().length > 0;
+}
+function gone(target) {
+    var node = webstrResolve(target[0], target[1]);
+    if (node === null) {
+        return true;
+    }
+    return !target[1] && !webstrVisible(node);
+}
+function check() {
+    var count = 0, j;
+    for (j = 0; j < targets.length; j++) {
+        if (gone(targets[j])) {
+            count++;
+        }
+    }
+    return mode === 'any' ? count > 0 : count === targets.length;
+}
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    if (intersection) {
+        intersection.disconnect();
+    }
+    clearTimeout(timer);
+    done(result);
+}
+function recheck() {
+    if (!finished && check()) {
+        finish(true);
+    }
+}
+if (check()) {
+    done(true);
+    return;
+}
+observer = new MutationObserver(recheck);
+observer.observe(document, {childList: true, subtree: true, attributes: true,
+                            attributeFilter: ['style', 'class', 'hidden']});
+if (window.IntersectionObserver) {
+    intersection = new IntersectionObserver(recheck);
+    for (i = 0; i < targets.length; i++) {
+        found = targets[i][1] ? null : webstrResolve(targets[i][0], false);
+        if (found) {
+            intersection.observe(found);
+        }
+    }
+}
+timer = setTimeout(function () { finish(false); }, timeout);
+"""
+
+
+# Functions reading logical value of an element: checked state of checkboxes
+# and radio buttons, texts of selected options of select boxes, value
+# of other form inputs and visible text of any other element.
+VALUE_FUNCTIONS = """
+function webstrValue(node) {
+    var tag = node.tagName.toLowerCase(), type = (node.type || '').toLowerCase();
+    var result = [], i;
+    if (tag === 'input' && (type === 'checkbox' || type === 'radio')) {
+        return node.checked;
+    }
+    if (tag === 'select') {
+        for (i = 0; i < node.options.length; i++) {
+            if (node.options[i].selected) {
+                result.push(webstrText(node.options[i]));
+            }
+        }
+        return result;
+    }
+    if (tag === 'input' || tag === 'textarea') {
+        return node.value;
+    }
+    return webstrText(node);
+}
+"""
+
+
+# Read rows of a container along with values of their fields.
+# arguments[0]: locator chain of the rows
+# arguments[1]: list of [field name, by, value] triplets; field locators are
+#               relative to the row element
+# arguments[2]: index of the first row to read (0 based)
+# arguments[3]: maximal number of rows to read; null - all rows
+# Returns {count: total number of rows, rows: [{index: 1 based row index,
+#          text: row text, fields: {field name: field value}}, ...]}
+CONTAINER_SNAPSHOT = LOCATOR_FUNCTIONS + VALUE_FUNCTIONS + """
+var rows = webstrResolve(arguments[0], true) || [], fields = arguments[1];
+var offset = arguments[2] || 0, limit = arguments[3];
+var end = (limit === null || limit === undefined) ?
+    rows.length : Math.min(rows.length, offset + limit);
+var records = [], values, node, i, j;
+for (i = offset; i < end; i++) {
+    values = {};
+    for (j = 0; j < fields.length; j++) {
+        node = webstrFind(rows[i], fields[j][1], fields[j][2]);
+        values[fields[j][0]] = node ? webstrValue(node) : null;
+    }
+    records.push({index: i + 1, text: webstrText(rows[i]), fields: values});
+}
+return {count: rows.length, rows: records};
+"""
+
+
+# Click a pagination control (e.g. "Next Page" link) if it is present.
+# arguments[0]: locator chain of the control
+# Returns true if the control was clicked.
+CLICK_IF_PRESENT = LOCATOR_FUNCTIONS + """
+var node = webstrResolve(arguments[0], false);
+if (!node) {
+    return false;
+}
+node.click();
+return true;
+"""
+
+
+# Scroll the last row of a (virtually scrolled) container into view,
+# so that the next rows are rendered.
+# arguments[0]: locator chain of the rows
+# Returns text of the last row before scrolling; null if there are no rows.
+SCROLL_TO_LAST_ROW = LOCATOR_FUNCTIONS + """
+var rows = webstrResolve(arguments[0], true) || [];
+if (!rows.length) {
+    return null;
+}
+rows[rows.length - 1].scrollIntoView(false);
+return webstrText(rows[rows.length - 1]);
+"""
+
+
+# Count rows of a container, optionally only those matching given criteria.
+# arguments[0]: locator chain of the rows
+# arguments[1]: list of [by, value, expected] criteria; the value of the
+#               element found relatively to the row (see webstrValue) must
+#               equal the expected value, by === null matches text of the row
+# Returns number of (matching) rows.
+CONTAINER_COUNT = LOCATOR_FUNCTIONS + VALUE_FUNCTIONS + """
+var rows = webstrResolve(arguments[0], true) || [], criteria = arguments[1] || [];
+var count = 0, matches, node, value, i, j;
+for (i = 0; i < rows.length; i++) {
+    matches = true;
+    for (j = 0; j < criteria.length && matches; j++) {
+        if (criteria[j][0] === null) {
+            value = webstrText(rows[i]);
+        } else {
+            node = webstrFind(rows[i], criteria[j][0], criteria[j][1]);
+            value = node ? webstrValue(node) : null;
+        }
+        matches = String(value) === String(criteria[j][2]);
+    }
+    if (matches) {
+        count++;
+    }
+}
+return count;
+"""
+
+
+# Set values of several form widgets at once, firing the events a real user
+# interaction would fire (input and change; click for checkboxes and radio
+# buttons; Enter key for combo boxes).
+# arguments[0]: list of [name, locator chain, kind, value] entries, kind is
+#               one of 'text', 'select', 'checkbox', 'radio', 'combobox'
+# Returns object mapping names of failed entries to the reason of the failure
+# ('missing' - element not found, 'no option' - no option with the value).
+FORM_FILL = LOCATOR_FUNCTIONS + """
+function webstrFire(node, type) {
+    var event = document.createEvent('HTMLEvents');
+    event.initEvent(type, true, true);
+    node.dispatchEvent(event);
+}
+function webstrKey(node, type) {
+    var event = document.createEvent('Event');
+    event.initEvent(type, true, true);
+    event.key = 'Enter';
+    event.keyCode = event.which = 13;
+    node.dispatchEvent(event);
+}
+function webstrSetValue(node, value) {
+    // use the native setter, so that frameworks tracking the value notice
+    var descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(node), 'value');
+    if (descriptor && descriptor.set) {
+        descriptor.set.call(node, value);
+    } else {
+        node.value = value;
+    }
+    webstrFire(node, 'input');
+    webstrFire(node, 'change');
+}
+function webstrSelect(node, value) {
+    var values = value instanceof Array ? value : [value], matched = 0, i, j;
+    for (i = 0; i < node.options.length; i++) {
+        var selected = false;
+        for (j = 0; j < values.length; j++) {
+            if (node.options[i].value === String(values[j]) && (node.multiple || !matched)) {
+                selected = true;
+            }
+        }
+        if (selected) {
+            matched++;
+        }
+        if (selected || !node.multiple) {
+            node.options[i].selected = selected;
+        }
+    }
+    if (!matched) {
+        return false;
+    }
+    webstrFire(node, 'input');
+    webstrFire(node, 'change');
+    return true;
+}
+var entries = arguments[0], errors = {}, node, input, i;
+for (i = 0; i < entries.length; i++) {
+    var name = entries[i][0], kind = entries[i][2], value = entries[i][3];
+    node = webstrResolve(entries[i][1], false);
+    if (!node) {
+        errors[name] = 'missing';
+        continue;
+    }
+    if (kind === 'text') {
+        webstrSetValue(node, value === null ? '' : String(value));
+    } else if (kind === 'select') {
+        if (!webstrSelect(node, value)) {
+            errors[name] = 'no option';
+        }
+    } else if (kind === 'checkbox') {
+        if (value !== null && node.checked !== Boolean(value)) {
+            node.click();
+        }
+    } else if (kind === 'radio') {
+        if (value === true && !node.checked) {
+            node.click();
+        }
+    } else if (kind === 'combobox') {
+        input = node.tagName.toLowerCase() === 'input' ? node : node.querySelector('input');
+        if (!input) {
+            errors[name] = 'missing';
+            continue;
+        }
+        webstrSetValue(input, String(value));
+        webstrKey(input, 'keydown');
+        webstrKey(input, 'keypress');
+        webstrKey(input, 'keyup');
+    }
+}
+return errors;
+"""
+
+
+# Read logical values (see webstrValue) of several elements at once.
+# arguments[0]: list of [name, locator chain] pairs
+# Returns object mapping the names to the values; null for missing elements.
+FORM_VALUES = LOCATOR_FUNCTIONS + VALUE_FUNCTIONS + """
+var entries = arguments[0], values = {}, node, i;
+for (i = 0; i < entries.length; i++) {
+    node = webstrResolve(entries[i][1], false);
+    values[entries[i][0]] = node ? webstrValue(node) : null;
+}
+return values;
+"""
+
+
+# Read logical value (see webstrValue) of an element.
+# arguments[0]: the element
+ELEMENT_VALUE = LOCATOR_FUNCTIONS + VALUE_FUNCTIONS + """
+return webstrValue(arguments[0]);
+"""
+
+
+# Select options of a select box matching a pattern; change event is fired
+# once after all the options are selected.
+# arguments[0]: the select element
+# arguments[1]: 'value' - match option values, 'text' - match option texts
+#               (with normalized white space)
+# arguments[2]: 'exact', 'prefix' or 'regex' (JavaScript regular expression
+#               searched in the value or text)
+# arguments[3]: the pattern
+# arguments[4]: flags of the regular expression (optional)
+# Returns [number of matched options, values of all selected options];
+# only the first matching option is selected in a single select box,
+# disabled options are skipped.
+SELECT_OPTIONS = """
+var select = arguments[0], attribute = arguments[1], mode = arguments[2];
+var pattern = arguments[3];
+var regex = mode === 'regex' ? new RegExp(pattern, arguments[4] || '') : null;
+var matched = 0, selected = [], option, subject, i;
+function normalize(text) {
+    return text.replace(/\\s+/g, ' ').replace(/^ | $/g, '');
+}
+for (i = 0; i < select.options.length; i++) {
+    option = select.options[i];
+    if (option.disabled || (option.parentNode.tagName === 'OPTGROUP' &&
+                            option.parentNode.disabled)) {
+        continue;
+    }
+    subject = attribute === 'value' ? option.value : normalize(option.text);
+    if ((mode === 'exact' && subject === pattern) ||
+            (mode === 'prefix' && subject.indexOf(pattern) === 0) ||
+            (regex && regex.test(subject))) {
+        matched++;
+        option.selected = true;
+        if (!select.multiple) {
+            break;
+        }
+    }
+}
+if (matched) {
+    var event = document.createEvent('HTMLEvents');
+    event.initEvent('input', true, true);
+    select.dispatchEvent(event);
+    event = document.createEvent('HTMLEvents');
+    event.initEvent('change', true, true);
+    select.dispatchEvent(event);
+}
+for (i = 0; i < select.options.length; i++) {
+    if (select.options[i].selected) {
+        selected.push(select.options[i].value);
+    }
+}
+return [matched, selected];
+"""
@@ -19,10 +19,44 @@ Author: pnovotny
 # limitations under the License.
 
 
+import re
+
 from selenium.common import exceptions as selenium_ex
 from selenium.webdriver.support.ui import Select as _SelectBase
 
-from webstr.core import By, BaseWebElementHelper
+from webstr.core import By, BaseWebElementHelper, config
+from webstr.selenium import scripts
+
+
+# flags of python regular expressions expressible in JavaScript ones
+_JS_REGEX_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+# python specific syntax of regular expressions unknown to JavaScript
+# (named groups, comments, \A and \Z anchors and inline flags)
+_PYTHON_REGEX_SYNTAX = re.compile(r'\(\?P[<=]|\(\?#|(?<!\\)\\[AZ]|\(\?[aiLmsux]+[):-]')
+
+
+def _js_regex(pattern):
+    """
+    Translate a compiled python regular expression to a JavaScript one.
+
+    Parameters:
+        pattern: compiled python regular expression
+
+    Returns:
+        (source, flags) tuple of the JavaScript regular expression
+
+    Throws: ValueError - the expression can't be expressed in JavaScript
+    """
+    flags = ''
+    remaining = pattern.flags & ~re.UNICODE
+    for flag, js_flag in _JS_REGEX_FLAGS:
+        if remaining & flag:
+            flags += js_flag
+            remaining &= ~flag
+    if remaining or _PYTHON_REGEX_SYNTAX.search(pattern.pattern):
+        raise ValueError("regular expression %r can't be matched in the browser, "
+                         "use a JavaScript regular expression string" % pattern.pattern)
+    return pattern.pattern, flags
 
 
 class Checkbox(BaseWebElementHelper):
@@ -101,7 +135,39 @@ class Checkbox(BaseWebElementHelper):
 
 
 class Select(_SelectBase):
-    """A SELECT element wrapper with extended functionality."""
+    """
+    A SELECT element wrapper with extended functionality.
+
+    Options can be matched and selected inside the page via one script call
+    (see :meth:`select_matching`), so the cost doesn't grow with the number
+    of options. The script sets the options and dispatches `input` and
+    `change` events instead of clicking them; disabled options are skipped.
+
+    Class attributes:
+        _scripted: select options and read the value via script in
+                   `value`, `select_by_value_starting_with` and
+                   `select_by_visible_text_starting_with`; False - click every
+                   matching option (one round trip per option);
+                   None - use `config.SCRIPTED_SELECT` value
+    """
+    _scripted = None
+
+    def __init__(self, webelement):
+        """
+        Parameters:
+            webelement: SELECT element (selenium web element or FreshWebElement)
+        """
+        super(Select, self).__init__(webelement)
+        if self._scripted is None:
+            self._scripted = config.SCRIPTED_SELECT
+        # scripts need the selenium web element itself
+        self._script_el = getattr(webelement, '_elem', webelement)
+
+    def _execute(self, script, *args):
+        """
+        Execute the script with the select element as the first argument.
+        """
+        return self._el.parent.execute_script(script, self._script_el, *args)
 
     @property
     def value(self):
@@ -111,6 +177,8 @@ class Select(_SelectBase):
         Returns:
             text of the selected options
         """
+        if self._scripted:
+            return self._execute(scripts.ELEMENT_VALUE)
         return [elem.text for elem in self.all_selected_options]
 
     @value.setter
@@ -122,8 +190,66 @@ class Select(_SelectBase):
             value:
                 value used in assignment
         """
+        if self._scripted:
+            self.select_matching(str(value))
+            return
         self.select_by_value(str(value))
 
+    @classmethod
+    def _decode_value(cls, raw):
+        """
+        Decode value read in the browser by a script to the `value`
+        property representation.
+
+        Parameters:
+            raw: list of texts of the selected options
+
+        Returns:
+            list of texts of the selected options
+        """
+        return list(raw)
+
+    def select_matching(self, pattern, attribute='value', mode='exact'):
+        """
+        Select options matching the pattern inside the page; the change
+        event is dispatched once after all the options are selected.
+        Only the first matching option is selected in a single select box,
+        disabled options are never selected.
+
+        Usage::
+            hosts.select_matching('node-', mode='prefix')
+            hosts.select_matching('^node-[0-9]+$', attribute='text', mode='regex')
+
+        Parameters:
+            pattern (str): value or text to match; JavaScript regular
+                           expression in the 'regex' mode, a compiled python
+                           regular expression is translated if possible
+            attribute (str): 'value' - match option values,
+                             'text' - match option texts
+            mode (str): 'exact', 'prefix' or 'regex'
+
+        Returns:
+            list of values of all selected options
+
+        Throws:
+            NoSuchElementException - no enabled option matches the pattern
+            TypeError - compiled regular expression outside of the 'regex' mode
+            ValueError - the regular expression can't be used in JavaScript
+        """
+        flags = ''
+        if hasattr(pattern, 'pattern'):
+            if mode != 'regex':
+                raise TypeError("compiled regular expression can be used only "
+                                "in the 'regex' mode")
+            pattern, flags = _js_regex(pattern)
+        matched, selected = self._execute(
+            scripts.SELECT_OPTIONS, attribute, mode, pattern, flags)
+        if not matched:
+            raise selenium_ex.NoSuchElementException(
+              "Cannot locate option with %s matching (%s): %s"
+              % (attribute, mode, pattern))
+        return selected
+
     def select_by_value_starting_with(self, value):
         """
         Select all options that have a value starting with the `value` argument.
@@ -140,6 +266,9 @@ class Select(_SelectBase):
         Parameters:
             value (str): start of the value string to match against
         """
+        if self._scripted:
+            self.select_matching(value, mode='prefix')
+            return
         css = "option[value^=%s]" % self._escapeString(value)
         opts = self._el.find_elements(By.CSS_SELECTOR, css)
         matched = False
@@ -168,6 +297,9 @@ class Select(_SelectBase):
         Parameters:
             text (str): start of the visible text to match against
         """
+        if self._scripted:
+            self.select_matching(text, attribute='text', mode='prefix')
+            return
         xpath = (".//option[starts-with(normalize-space(.), %s)]"
                  % self._escapeString(text))
         opts = self._el.find_elements(By.XPATH, xpath)
@@ -25,13 +25,210 @@ import time
 from selenium.common import exceptions as selenium_ex
 from selenium.webdriver.support.ui import WebDriverWait as BaseWebDriverWait
 
+from webstr.core import config
+from webstr.selenium import scripts
 import webstr.selenium.ui.exceptions as ui_exceptions
 
 
 LOGGER = logging.getLogger(__name__)
 
 POLL_FREQUENCY = 1
+ELEMENT_POLL_FREQUENCY = 0.2
 SELENIUM_GRID_TIMEOUT = 60
+# default script timeout of WebDriver (W3C specification)
+SCRIPT_TIMEOUT = 30
+
+
+class PollScheduler(object):
+    """
+    Poll scheduler with a constant poll interval.
+
+    Poll schedulers define how long to sleep between two polls
+    of a wait condition (see :class:`WebDriverWait`).
+    """
+
+    def __init__(self, interval=POLL_FREQUENCY):
+        """
+        Parameters:
+            interval: poll interval in [s]
+        """
+        self.interval = interval
+
+    def intervals(self):
+        """
+        Return new iterator of poll intervals for a single wait.
+        """
+        while True:
+            yield self.interval
+
+
+class BackoffPollScheduler(PollScheduler):
+    """
+    Poll scheduler with exponentially growing poll interval.
+    The interval is multiplied by `factor` after each poll until it reaches
+    the `cap` value.
+    """
+
+    def __init__(self, initial=0.05, factor=2, cap=POLL_FREQUENCY):
+        """
+        Parameters:
+            initial: first poll interval in [s]
+            factor: multiplier of the poll interval
+            cap: maximal poll interval in [s]
+        """
+        super(BackoffPollScheduler, self).__init__(cap)
+        self.initial = initial
+        self.factor = factor
+
+    def intervals(self):
+        interval = self.initial
+        while True:
+            yield min(interval, self.interval)
+            interval *= self.factor
+
+
+class FastFirstPollScheduler(PollScheduler):
+    """
+    Poll scheduler doing `fast_polls` polls with a short interval first
+    and continuing with the regular interval then.
+    Suitable for conditions, which are usually fulfilled quickly.
+    """
+
+    def __init__(self, fast_polls=5, fast_interval=0.1, interval=POLL_FREQUENCY):
+        """
+        Parameters:
+            fast_polls: number of the fast polls
+            fast_interval: poll interval in [s] of the fast polls
+            interval: regular poll interval in [s]
+        """
+        super(FastFirstPollScheduler, self).__init__(interval)
+        self.fast_polls = fast_polls
+        self.fast_interval = fast_interval
+
+    def intervals(self):
+        for _ in range(self.fast_polls):
+            yield self.fast_interval
+        while True:
+            yield self.interval
+
+
+def page_poll_scheduler():
+    """
+    Return default poll scheduler of page object waits:
+    :class:`FastFirstPollScheduler` if `config.FAST_FIRST_POLL` is set,
+    constant :class:`PollScheduler` otherwise.
+    """
+    if config.FAST_FIRST_POLL:
+        return FastFirstPollScheduler()
+    return PollScheduler()
+
+
+def get_poll_scheduler(poll):
+    """
+    Return poll scheduler for given poll specification.
+
+    Parameters:
+        poll: :class:`PollScheduler` instance or poll interval in [s]
+    """
+    if isinstance(poll, PollScheduler):
+        return poll
+    return PollScheduler(poll)
+
+
+def wait_for_element(lookup, timeout, poll=ELEMENT_POLL_FREQUENCY,
+                     as_list=False, message=None):
+    """
+    Explicit wait for a page element.
+
+    Calls the `lookup` function until it finds the element(s)
+    or until the timeout expires. This is meant to be used with implicit
+    wait of the driver set to 0, so that each lookup returns immediately.
+
+    Parameters:
+        lookup: function without arguments returning found element(s)
+        timeout: timeout in [s]
+        poll: poll interval in [s] or :class:`PollScheduler` instance
+        as_list: bool; the lookup returns list of elements, an empty list
+                 is returned after the timeout expires
+        message: error message
+
+    Returns:
+        result of the lookup function
+
+    Throws: ElementDoesNotExistError - element not found within timeout
+    """
+    deadline = time.time() + timeout
+    intervals = get_poll_scheduler(poll).intervals()
+    while True:
+        try:
+            result = lookup()
+            if result or not as_list:
+                return result
+        except selenium_ex.NoSuchElementException as ex:
+            result = ex
+        if time.time() >= deadline:
+            if as_list:
+                return result
+            raise ui_exceptions.ElementDoesNotExistError(
+              "%s (timeout %s seconds expired)" % (message or result.msg, timeout))
+        time.sleep(min(next(intervals), max(deadline - time.time(), 0)))
+
+
+def get_script_timeout(driver):
+    """
+    Return current asynchronous script timeout of the driver in [s].
+
+    Parameters:
+        driver: webdriver instance
+    """
+    script_timeout = getattr(driver, 'script_timeout', None)
+    if script_timeout is not None:
+        return script_timeout
+    try:
+        return driver.timeouts.script
+    except (AttributeError, selenium_ex.WebDriverException):
+        return SCRIPT_TIMEOUT
+
+
+def wait_for_disappearance(driver, targets, timeout, mode='any'):
+    """
+    Wait until page elements disappear (are detached or hidden).
+
+    The wait is done in the browser within a single asynchronous script call,
+    which observes DOM mutations, so it returns as soon as the elements
+    disappear without any polling. The script timeout of the driver is
+    extended for the call and restored afterwards.
+
+    Parameters:
+        driver: webdriver instance
+        targets: list of (locator chain, as_list) pairs,
+                 see :meth:`WebstrModelBase._element_chain`
+        timeout: timeout in [s]
+        mode: 'any' - wait until any of the elements disappears,
+              'all' - wait until all of them disappear
+
+    Returns:
+        True - elements disappeared / False - timeout expired /
+        None - asynchronous scripts are not available,
+        the caller needs to fall back to polling
+    """
+    original_timeout = get_script_timeout(driver)
+    try:
+        driver.set_script_timeout(timeout + SCRIPT_TIMEOUT)
+    except selenium_ex.WebDriverException as ex:
+        LOGGER.debug("Unable to set script timeout: %s", ex)
+        return None
+    try:
+        return bool(driver.execute_async_script(
+          scripts.WAIT_FOR_DISAPPEARANCE, targets, mode, int(timeout * 1000)))
+    except selenium_ex.TimeoutException:
+        return False
+    except selenium_ex.WebDriverException as ex:
+        LOGGER.debug("Waiting for disappearance failed, "
+                     "falling back to polling: %s", ex)
+        return None
+    finally:
+        driver.set_script_timeout(original_timeout)
 
 
 class WebDriverUtils(object):
@@ -74,11 +271,98 @@ class WebDriverUtils(object):
 class WebDriverWait(BaseWebDriverWait):
     """
     Overridden :class:`selenium.webdriver.support.ui.WebDriverWait` class.
-    The only difference is updated `POLL_FREQUENCY` from 0.5 to 1 second.
+
+    Differences from the original class:
+
+    * default `POLL_FREQUENCY` is updated from 0.5 to 1 second,
+    * poll intervals are defined by a pluggable poll scheduler
+      (see :class:`PollScheduler` and its subclasses),
+    * optionally, the wait between two polls is done in the browser
+      via asynchronous script which returns as soon as the DOM changes,
+      so the condition is re-evaluated within milliseconds after the page
+      is updated (the `signal_driver` parameter).
     """
 
-    def __init__(self, driver, timeout, poll_frequency=POLL_FREQUENCY, **kwargs):
+    def __init__(self, driver, timeout, poll_frequency=POLL_FREQUENCY,
+                 scheduler=None, signal_driver=None, **kwargs):
+        """
+        Parameters:
+            driver: object passed to the wait condition
+            timeout: timeout in [s]
+            poll_frequency: poll interval in [s]; used only if no scheduler
+                            is given
+            scheduler: :class:`PollScheduler` instance
+            signal_driver: webdriver instance used for waiting for DOM changes
+                           between polls; None - sleep between polls
+            kwargs: other arguments of the original WebDriverWait
+        """
         super(WebDriverWait, self).__init__(driver, timeout, poll_frequency, **kwargs)
+        self._scheduler = scheduler or PollScheduler(poll_frequency)
+        self._signal_driver = signal_driver
+
+    def _pause(self, interval):
+        """
+        Wait between two polls.
+        If signal driver is available, the wait ends as soon as the DOM of the
+        current page changes. If the asynchronous script fails, the signal
+        driver is not used anymore and the wait falls back to sleeping.
+
+        Parameters:
+            interval: maximal pause in [s]
+        """
+        if self._signal_driver is not None:
+            try:
+                self._signal_driver.execute_async_script(
+                  scripts.WAIT_FOR_MUTATION, int(interval * 1000))
+                return
+            except selenium_ex.WebDriverException as ex:
+                LOGGER.debug("Waiting for DOM mutation failed, "
+                             "falling back to polling: %s", ex)
+                self._signal_driver = None
+        time.sleep(interval)
+
+    def _wait_for(self, method, expected, message):
+        """
+        Poll the condition until its (boolean) value matches `expected`.
+
+        Returns:
+            value of the condition (True for ignored exceptions
+            when `expected` is False)
+        Throws: TimeoutException - timeout expired
+        """
+        screen = None
+        stacktrace = None
+        end_time = time.time() + self._timeout
+        intervals = self._scheduler.intervals()
+        while True:
+            try:
+                value = method(self._driver)
+                if bool(value) == expected:
+                    return value
+            except self._ignored_exceptions as exc:
+                if not expected:
+                    return True
+                screen = getattr(exc, 'screen', None)
+                stacktrace = getattr(exc, 'stacktrace', None)
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                break
+            self._pause(min(next(intervals), remaining))
+        raise selenium_ex.TimeoutException(message, screen, stacktrace)
+
+    def until(self, method, message=''):
+        """
+        Calls the method provided with the driver as an argument until the
+        return value is not False.
+        """
+        return self._wait_for(method, True, message)
+
+    def until_not(self, method, message=''):
+        """
+        Calls the method provided with the driver as an argument until the
+        return value is False.
+        """
+        return self._wait_for(method, False, message)
 
 
 class WaitForWebstrPage(object):
@@ -96,11 +380,23 @@ class WaitForWebstrPage(object):
     __IGNORED_EXCEPTIONS = ui_exceptions.InitPageValidationError
     __DISAPPEAR_TIMEOUT = 1
 
-    def __init__(self, page_object, timeout=None):
+    def __init__(self, page_object, timeout=None, scheduler=None, signal=False):
+        """
+        Parameters:
+            page_object: page object instance
+            timeout: timeout in [s]
+            scheduler: :class:`PollScheduler` instance;
+                       None - :func:`page_poll_scheduler` is used
+            signal: bool; re-evaluate the condition as soon as the DOM
+                    of the page changes instead of sleeping between polls
+        """
         timeout = timeout or 0
         self.__page_object = page_object
+        self.__timeout = timeout
         self.__wait = WebDriverWait(
           driver=self, timeout=timeout,
+          scheduler=scheduler or page_poll_scheduler(),
+          signal_driver=page_object.driver if signal else None,
           ignored_exceptions=self.__IGNORED_EXCEPTIONS)
 
     @property
@@ -111,20 +407,39 @@ class WaitForWebstrPage(object):
 
     def to_disappear(self, message=None):
         """
-        Waits until the page object is no longer present on the page.
+        Waits until the page object is no longer present on the page,
+        i.e. until any of its required elements disappears.
+        The wait is event driven (see :func:`wait_for_disappearance`),
+        unless some of the required elements are not page elements
+        or asynchronous scripts are not available, then the initial
+        validation of the page object is polled.
 
         Parameters:
             message (str): error message
         """
         message = message or '%s is still present' % self.__page_object
-        original_timeout = self.__page_object._timeout
-        self.__page_object.driver.implicitly_wait(self.__DISAPPEAR_TIMEOUT)
+        targets, fallback = self.__page_object._required_chains()
+        if targets and not fallback:
+            disappeared = wait_for_disappearance(
+              self.__page_object.driver, targets, self.__timeout)
+            if disappeared:
+                return
+            if disappeared is False:
+                raise selenium_ex.TimeoutException(message)
+        model = self.__page_object._model
+        explicit_wait = model._lookup_timeout is not None
+        if explicit_wait:
+            model._lookup_timeout = self.__DISAPPEAR_TIMEOUT
+        else:
+            self.__page_object.driver.implicitly_wait(self.__DISAPPEAR_TIMEOUT)
         try:
             self.__wait.until_not(lambda self: self.__validated_page_object,
                                   message=message)
-        except selenium_ex.TimeoutException as ex:
-            self.__page_object.driver.implicitly_wait(original_timeout)
-            raise ex
+        finally:
+            if explicit_wait:
+                model._lookup_timeout = self.__page_object._timeout
+            else:
+                self.__page_object.driver.implicitly_wait(self.__page_object._timeout)
 
     def status(self, status_prop, message=None):
         """
@@ -25,13 +25,20 @@ in all browser driver classes.
 import base64
 import logging
 import tempfile
+import threading
 import time
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
 from selenium import webdriver
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 from selenium.webdriver.remote.remote_connection import RemoteConnection
 from selenium.common import exceptions as selenium_ex
 
+from webstr.selenium.instrumentation import RECORDER
 from webstr.selenium.webelement import FreshWebElement
 from webstr.core import config
 
@@ -42,7 +49,95 @@ LOGGER = logging.getLogger(__name__)
 class WebDriverExtension(object):
     """
     WebDriver extension providing additional functionality.
+
+    Attributes:
+        cache_epoch (int): counter bumped whenever cached page elements
+            (see :class:`webstr.core.cache.ElementCache`) can't be trusted
+            anymore, i.e. on navigation or stale element detection
+        implicit_wait (float): last implicit wait timeout set via
+            `implicitly_wait`; None if unknown
+        script_timeout (float): last script timeout set via
+            `set_script_timeout`; None if unknown
     """
+    cache_epoch = 0
+    implicit_wait = None
+    script_timeout = None
+    _FIND_COMMANDS = frozenset(['findElement', 'findElements',
+                                'findChildElement', 'findChildElements'])
+
+    def execute(self, driver_command, params=None):
+        """
+        Overridden method. Sends the command and records its duration
+        if the instrumentation is enabled
+        (see :mod:`webstr.selenium.instrumentation`).
+        """
+        if not RECORDER.enabled:
+            return super(WebDriverExtension, self).execute(driver_command, params)
+        start = time.time()
+        error = None
+        response = None
+        try:
+            response = super(WebDriverExtension, self).execute(driver_command, params)
+            return response
+        except Exception as ex:
+            error = ex
+            raise
+        finally:
+            duration = time.time() - start
+            RECORDER.record(driver_command, duration, start, error)
+            if self.implicit_wait and driver_command in self._FIND_COMMANDS:
+                # the lookup of a missing element waited the implicit timeout
+                if isinstance(error, selenium_ex.NoSuchElementException) \
+                        or (response is not None and not response.get('value')):
+                    RECORDER.increment('implicit_wait', duration)
+
+    def set_script_timeout(self, time_to_wait):
+        """
+        Overridden method. Sets the script timeout and remembers it.
+        """
+        super(WebDriverExtension, self).set_script_timeout(time_to_wait)
+        self.script_timeout = time_to_wait
+
+    def implicitly_wait(self, time_to_wait):
+        """
+        Overridden method. Sets the implicit wait timeout and remembers it.
+        """
+        super(WebDriverExtension, self).implicitly_wait(time_to_wait)
+        self.implicit_wait = time_to_wait
+
+    def invalidate_element_caches(self):
+        """
+        Invalidate all page element caches bound to this driver instance.
+        """
+        self.cache_epoch += 1
+
+    def get(self, *args, **kwargs):
+        """
+        Overridden method. Loads a URL and invalidates element caches.
+        """
+        self.invalidate_element_caches()
+        super(WebDriverExtension, self).get(*args, **kwargs)
+
+    def back(self):
+        """
+        Overridden method. Goes back in history and invalidates element caches.
+        """
+        self.invalidate_element_caches()
+        super(WebDriverExtension, self).back()
+
+    def forward(self):
+        """
+        Overridden method. Goes forward in history and invalidates element caches.
+        """
+        self.invalidate_element_caches()
+        super(WebDriverExtension, self).forward()
+
+    def refresh(self):
+        """
+        Overridden method. Refreshes the page and invalidates element caches.
+        """
+        self.invalidate_element_caches()
+        super(WebDriverExtension, self).refresh()
 
     def _parse_ui_map_locator(self, locator):
         """
@@ -98,8 +193,17 @@ class WebDriverExtension(object):
                                                               value=value)
         if not auto_refresh:
             return elems
-        return [FreshWebElement(element=elem, by=by, value=value) for
-                elem in elems]
+        return [FreshWebElement(element=elem, by=by, value=value, index=index)
+                for index, elem in enumerate(elems)]
+
+    def _wrap_value(self, value):
+        """
+        Overridden method. Passes elements wrapped by FreshWebElement
+        to scripts as the original WebElement instances.
+        """
+        if isinstance(value, FreshWebElement):
+            value = value._elem
+        return super(WebDriverExtension, self)._wrap_value(value)
 
     def find_element_by_ui_map(self, locator):
         """
@@ -260,6 +364,33 @@ class Remote(WebDriverExtension, webdriver.Remote):
             self.__ie_confirm_cert_exception()
 
 
+class Fake(WebDriverExtension, webdriver.Remote):
+    """
+    Extended driver backed by the in-process fake WebDriver
+    (see :mod:`webstr.selenium.fake`); requires the optional `lxml`
+    and `cssselect` packages.
+
+    Attributes:
+        fake: <FakeCommandExecutor> instance holding the document, command
+              counters and the staleness simulation API
+    """
+
+    def __init__(self, fixtures=None, latency=0, **params):
+        """
+        Calling original Remote init with the fake command executor.
+
+        Parameters:
+            fixtures: dictionary mapping URLs to HTML documents
+            latency: delay in [s] added to every command, or dictionary
+                     mapping command names to delays
+        """
+        from webstr.selenium.fake import FakeCommandExecutor
+        from selenium.webdriver.common.options import ArgOptions
+        self.fake = FakeCommandExecutor(fixtures=fixtures, latency=latency)
+        params.setdefault('options', ArgOptions())
+        super(Fake, self).__init__(command_executor=self.fake, **params)
+
+
 class DriverFactory(object):
     """
     WebDriver instance factory.
@@ -269,14 +400,27 @@ class DriverFactory(object):
             according to the browser name
         __desired_capabilities_map (dict): mapping of desired capabilities
             according to the browser name
+        __options_map_local (dict): mapping of local browser options classes
+            according to the browser name
+        __window_size_map (dict): mapping of browser name to the capability
+            holding browser command line arguments and to the arguments
+            setting the initial window size (formatted with width and height);
+            browsers not listed here get the window size set after start up
     """
     __driver_map_local = {'Firefox': Firefox,
                           'Chrome': Chrome,
-                          'Internet Explorer': Ie}
+                          'Internet Explorer': Ie,
+                          'Fake': Fake}
     __desired_capabilities_map = {'Firefox': DesiredCapabilities.FIREFOX,
                                   'Chrome': DesiredCapabilities.CHROME,
                                   'Internet Explorer':
                                     DesiredCapabilities.INTERNETEXPLORER}
+    __options_map_local = {'Firefox': webdriver.FirefoxOptions,
+                           'Chrome': webdriver.ChromeOptions}
+    __window_size_map = {'Firefox': ('moz:firefoxOptions',
+                                     ('--width=%d', '--height=%d')),
+                         'Chrome': ('goog:chromeOptions',
+                                    ('--window-size=%d,%d',))}
 
     def __new__(cls, browser_name, host=None, port=None,
                 desired_capabilities=None, **kwargs):
@@ -320,6 +464,13 @@ class DriverFactory(object):
             raise ex
         if desired_capabilities:
             capabilities.update(desired_capabilities)
+        window_size_args = cls.__get_window_size_arguments(browser_name)
+        if window_size_args:
+            options_key = cls.__window_size_map[browser_name][0]
+            browser_options = dict(capabilities.get(options_key) or {})
+            browser_options['args'] = list(browser_options.get('args', [])) \
+                + window_size_args
+            capabilities[options_key] = browser_options
 
         return Remote(command_executor=command_executor,
                       desired_capabilities=capabilities,
@@ -340,6 +491,148 @@ class DriverFactory(object):
             ex.args = ("unknown browser: '%s' (valid browsers: %s)"\
               % (browser_name, ', '.join(cls.__driver_map_local.keys())),)
             raise ex
+        window_size_args = cls.__get_window_size_arguments(browser_name)
+        if window_size_args:
+            options = kwargs.get('options')
+            if options is None:
+                options = cls.__options_map_local[browser_name]()
+                kwargs['options'] = options
+            for argument in window_size_args:
+                options.add_argument(argument)
         driver = driver_cls(**kwargs)
-        driver.set_window_size(config.BROWSER_WIDTH, config.BROWSER_HEIGHT)
+        if not window_size_args:
+            driver.set_window_size(config.BROWSER_WIDTH, config.BROWSER_HEIGHT)
         return driver
+
+    @classmethod
+    def __get_window_size_arguments(cls, browser_name):
+        """
+        Return browser command line arguments setting initial window size
+        according to configuration.
+
+        Parameters:
+            browser_name (str): browser name
+        Return: list of arguments; empty list if the browser doesn't support
+            setting the window size via command line arguments
+        """
+        try:
+            arguments = cls.__window_size_map[browser_name][1]
+        except KeyError:
+            return []
+        size = (config.BROWSER_WIDTH, config.BROWSER_HEIGHT)
+        if len(arguments) == 1:
+            return [arguments[0] % size]
+        return [argument % value for argument, value in zip(arguments, size)]
+
+
+class DriverPrespawner(object):
+    """
+    Starts driver sessions in background threads ahead of time,
+    so that acquiring a session (e.g. at the beginning of the next test case)
+    doesn't wait for the browser start up.
+
+    Usage::
+        prespawner = DriverPrespawner(lambda: DriverFactory('Firefox'), count=1)
+        prespawner.prespawn()
+        ...
+        driver = prespawner.acquire()  # starts booting the next one
+
+    Attributes:
+        boot_times (list): browser start up durations in [s]
+        wait_times (list): durations in [s] of waiting for a session in `acquire`
+    """
+
+    def __init__(self, factory, count=1):
+        """
+        Parameters:
+            factory: function without arguments creating new driver instance
+            count (int): number of sessions kept booted ahead of time
+        """
+        self._factory = factory
+        self.count = count
+        self._ready = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.boot_times = []
+        self.wait_times = []
+
+    def _spawn(self):
+        """Create new session and put it (or the error) into the ready queue."""
+        start = time.time()
+        try:
+            result = self._factory()
+        except Exception as ex:
+            LOGGER.error("Failed to start driver session: %s", ex)
+            result = ex
+        boot_time = time.time() - start
+        with self._lock:
+            self.boot_times.append(boot_time)
+            self._pending -= 1
+        LOGGER.debug("Driver session booted in %.2f s", boot_time)
+        self._ready.put(result)
+
+    def prespawn(self):
+        """
+        Start booting sessions in background so that `count` sessions
+        are ready or booting.
+        """
+        with self._lock:
+            missing = self.count - self._ready.qsize() - self._pending
+            self._pending += max(missing, 0)
+        for _ in range(missing):
+            thread = threading.Thread(target=self._spawn, name='webstr-prespawn')
+            thread.daemon = True
+            thread.start()
+
+    def acquire(self):
+        """
+        Return a booted session (waiting for one if none is ready yet)
+        and start booting the next one in background.
+
+        Returns:
+            driver instance
+        Throws: exception risen by the factory
+        """
+        start = time.time()
+        with self._lock:
+            spawn_now = self._ready.empty() and not self._pending
+            if spawn_now:
+                self._pending += 1
+        if spawn_now:
+            threading.Thread(target=self._spawn, name='webstr-prespawn').start()
+        result = self._ready.get()
+        self.wait_times.append(time.time() - start)
+        self.prespawn()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def stats(self):
+        """
+        Return boot time metrics.
+
+        Returns:
+            dict with number of booted sessions, mean and max boot time
+            and mean time spent waiting for a session (all in [s])
+        """
+        boot_times = list(self.boot_times)
+        wait_times = list(self.wait_times)
+        return {
+          'sessions': len(boot_times),
+          'boot_time_mean': sum(boot_times) / len(boot_times) if boot_times else None,
+          'boot_time_max': max(boot_times) if boot_times else None,
+          'wait_time_mean': sum(wait_times) / len(wait_times) if wait_times else None,
+          }
+
+    def close(self):
+        """
+        Quit all sessions booted ahead of time, which were not acquired.
+        Sessions still booting are not waited for.
+        """
+        while True:
+            try:
+                result = self._ready.get_nowait()
+            except queue.Empty:
+                return
+            if not isinstance(result, Exception):
+                result.quit()
@@ -19,74 +19,239 @@ Author: pnovotny
 # limitations under the License.
 
 
+import collections
 from functools import wraps
 import logging
+import threading
+import time
 import types
 
 from selenium.common import exceptions as selenium_ex
+from selenium.webdriver.remote.webelement import WebElement
+
+from webstr.selenium.instrumentation import RECORDER
 
 
 LOGGER = logging.getLogger(__name__)
 
+STALE_ATTEMPTS = 5
+STALE_ELEM_MSG = "Detected stale element '%s=%s', refreshing (#%s)..."
+# pause before the n-th refresh attempt is STALE_BACKOFF * 2 ** (n - 2) [s]
+# (no pause before the first one), at most STALE_BACKOFF_CAP
+STALE_BACKOFF = 0.05
+STALE_BACKOFF_CAP = 0.5
+
+_REFRESH_COUNTS = collections.Counter()
+_REFRESH_LOCK = threading.Lock()
+
+
+def get_refresh_counts():
+    """
+    Return numbers of stale element refreshes per locator, useful for finding
+    flapping elements.
+
+    Returns:
+        dictionary mapping (by, value) locators to refresh counts
+    """
+    with _REFRESH_LOCK:
+        return dict(_REFRESH_COUNTS)
+
+
+def reset_refresh_counts():
+    """Reset the stale element refresh counters."""
+    with _REFRESH_LOCK:
+        _REFRESH_COUNTS.clear()
+
+
+def _retry_stale(proxy, name, args=None, kwargs=None):
+    """
+    Refresh the stale element of the proxy and access the attribute `name`
+    (call the method with `args` and `kwargs` unless `args` is None) again.
+    """
+    for attempt in range(1, max(STALE_ATTEMPTS, 2)):
+        proxy._refresh_element(attempt)
+        try:
+            attr = getattr(proxy._elem, name)
+            return attr if args is None else attr(*args, **kwargs)
+        except selenium_ex.StaleElementReferenceException:
+            if attempt >= STALE_ATTEMPTS - 1:
+                raise
+
+
+def _stale_safe_method(name, doc):
+    """
+    Create FreshWebElement method delegating to the WebElement method `name`.
+    """
+    def method(self, *args, **kwargs):
+        try:
+            return getattr(self._elem, name)(*args, **kwargs)
+        except selenium_ex.StaleElementReferenceException:
+            return _retry_stale(self, name, args, kwargs)
+    method.__name__ = name
+    method.__doc__ = doc
+    return method
+
+
+def _stale_safe_property(name, doc):
+    """
+    Create FreshWebElement property delegating to the WebElement property `name`.
+    """
+    def getter(self):
+        try:
+            return getattr(self._elem, name)
+        except selenium_ex.StaleElementReferenceException:
+            return _retry_stale(self, name)
+    return property(getter, doc=doc)
+
 
 class FreshWebElement(object):
     """
     Selenium WebElement proxy/wrapper watching over errors
     due to element staleness.
+
+    The proxy remembers how the element was found - the context (the driver
+    or the parent element proxy), the locator and the position in the list
+    of found elements - so a stale element is looked up again relatively
+    to its context. A stale context refreshes itself the same way, so only
+    the stale part of the lookup chain is resolved again.
+
+    Public methods and properties of WebElement are delegated via wrappers
+    generated once for the class (see :func:`_install_wrappers`), so no
+    wrapper is created on attribute access. Other attributes are delegated
+    via `__getattr__`.
     """
-    __ATTEMPTS = 5
-    __STALE_ELEM_MSG = "Detected stale element '%s=%s', refreshing (#%s)..."
+    __slots__ = ('_elem', '_by', '_value', '_context', '_index')
 
-    def __init__(self, element, by, value):
+    def __init__(self, element, by, value, context=None, index=None):
         """
         Parameters:
             element (WebElement): page element
             by (str): location method
             value (str): locator value
+            context: FreshWebElement the element was found from;
+                     None - found from the driver
+            index (int): position of the element in the list returned
+                         by `find_elements`; None - found by `find_element`
         """
         self._by = by
         self._value = value
         self._elem = element
+        self._context = context
+        self._index = index
 
     def __dir__(self):
-        return list(self.__dict__.keys()) + dir(self._elem)
+        return list(getattr(self, '__dict__', {}).keys()) + dir(self._elem)
+
+    def _refresh_element(self, attempt=1):
+        """
+        Find the element on the page again, relatively to its context.
+        Element caches of the driver are invalidated as well, because other
+        cached elements are likely stale too.
 
-    def __refresh_element(self):
-        """Find the element on the page again."""
+        Parameters:
+            attempt: number of the refresh attempt; repeated attempts
+                     are delayed (bounded exponential backoff)
+        """
+        LOGGER.debug(STALE_ELEM_MSG, self._by, self._value, attempt)
+        with _REFRESH_LOCK:
+            _REFRESH_COUNTS[(self._by, self._value)] += 1
+        if RECORDER.enabled:
+            RECORDER.increment('stale_refresh')
+        if attempt > 1:
+            time.sleep(min(STALE_BACKOFF * 2 ** (attempt - 2), STALE_BACKOFF_CAP))
         driver = self._elem.parent
-        self._elem = driver.find_element(by=self._by,
-                                         value=self._value,
-                                         auto_refresh=False)
+        invalidate_caches = getattr(driver, 'invalidate_element_caches', None)
+        if invalidate_caches is not None:
+            invalidate_caches()
+        context = self._context
+        if context is None:
+            if self._index is None:
+                self._elem = driver.find_element(
+                    by=self._by, value=self._value, auto_refresh=False)
+                return
+            elements = driver.find_elements(
+                by=self._by, value=self._value, auto_refresh=False)
+        else:
+            # stale context is refreshed by its own wrappers
+            if self._index is None:
+                self._elem = context.find_element(by=self._by, value=self._value)._elem
+                return
+            elements = [elem._elem for elem in
+                        context.find_elements(by=self._by, value=self._value)]
+        if self._index >= len(elements):
+            raise selenium_ex.NoSuchElementException(
+                "Element #%d of '%s=%s' does not exist anymore"
+                % (self._index, self._by, self._value))
+        self._elem = elements[self._index]
+
+    def find_element(self, by='id', value=None):
+        """
+        Find child element; returned proxy refreshes the child relatively
+        to this element.
+        """
+        try:
+            elem = self._elem.find_element(by, value)
+        except selenium_ex.StaleElementReferenceException:
+            elem = _retry_stale(self, 'find_element', (by, value), {})
+        return FreshWebElement(elem, by, value, context=self)
+
+    def find_elements(self, by='id', value=None):
+        """
+        Find child elements; returned proxies refresh the children relatively
+        to this element.
+        """
+        try:
+            elems = self._elem.find_elements(by, value)
+        except selenium_ex.StaleElementReferenceException:
+            elems = _retry_stale(self, 'find_elements', (by, value), {})
+        return [FreshWebElement(elem, by, value, context=self, index=index)
+                for index, elem in enumerate(elems)]
 
     def __getattr__(self, name):
         """
-        Delegates all attribute lookups and method calls to the original
-        WebElement and watches for StaleElementReferenceException.
+        Delegates attribute lookups and method calls not covered by the
+        generated wrappers to the original WebElement and watches
+        for StaleElementReferenceException.
         If caught, the WebElement is "refreshed", i.e., it's looked up
         on the page again and the attribute lookup or (decorated) method call
         is executed again on the "fresh" element.
         """
-        for attempt in range(1, self.__ATTEMPTS + 1):
-            try:
-                attr = getattr(self._elem, name)
-                break
-            except selenium_ex.StaleElementReferenceException:
-                LOGGER.debug(self.__STALE_ELEM_MSG, self._by,
-                             self._value, attempt)
-                self.__refresh_element()
+        if name in FreshWebElement.__slots__:
+            # slot not initialized yet
+            raise AttributeError(name)
+        try:
+            attr = getattr(self._elem, name)
+        except selenium_ex.StaleElementReferenceException:
+            attr = _retry_stale(self, name)
 
         if isinstance(attr, types.MethodType):
             @wraps(attr)
             def safe_elem_method(*args, **kwargs):
                 """ safe element """
-                for attempt in range(1, self.__ATTEMPTS + 1):
-                    try:
-                        attr = getattr(self._elem, name)
-                        return attr(*args, **kwargs)
-                    except selenium_ex.StaleElementReferenceException:
-                        LOGGER.debug(self.__STALE_ELEM_MSG, self._by,
-                                     self._value, attempt)
-                        self.__refresh_element()
+                try:
+                    return getattr(self._elem, name)(*args, **kwargs)
+                except selenium_ex.StaleElementReferenceException:
+                    return _retry_stale(self, name, args, kwargs)
 
             return safe_elem_method
         return attr
+
+
+def _install_wrappers(proxy_class, element_class):
+    """
+    Define stale-safe wrappers of public methods and properties
+    of `element_class` on `proxy_class` (unless already defined there).
+    """
+    attributes = {}
+    for klass in reversed(element_class.__mro__):
+        attributes.update(klass.__dict__)
+    for name, attr in attributes.items():
+        if name.startswith('_') or name in proxy_class.__dict__:
+            continue
+        if isinstance(attr, property):
+            setattr(proxy_class, name, _stale_safe_property(name, attr.__doc__))
+        elif isinstance(attr, types.FunctionType):
+            setattr(proxy_class, name, _stale_safe_method(name, attr.__doc__))
+
+
+_install_wrappers(FreshWebElement, WebElement)